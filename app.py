@@ -23,12 +23,14 @@ cols = st.columns(3)
 with cols[0]:
     st.page_link("pages/01_Data_Explorer.py", label="Data Explorer", icon="🗂️")
     st.page_link("pages/02_Control_Charts.py", label="Control Charts", icon="📈")
+    st.page_link("pages/08_Stability_Dashboard.py", label="Stability Dashboard", icon="🚦")
 with cols[1]:
     st.page_link("pages/03_Capability.py", label="Capability (Cp/Cpk/Pp/Ppk)", icon="🎯")
     st.page_link("pages/04_Pareto.py", label="Pareto", icon="📊")
 with cols[2]:
     st.page_link("pages/05_Regression.py", label="Regression", icon="📉")
     st.page_link("pages/06_Gage_RR.py", label="Gage R&R (Crossed)", icon="🧪")
+    st.page_link("pages/09_Session_Snapshots.py", label="Session Snapshots", icon="💾")
 
 st.divider()
 st.markdown("### Quick jump")
@@ -36,10 +38,12 @@ q = st.text_input("Search tool names (e.g., xbar, p-chart, grr, pareto)")
 tools = [
     ("Data Explorer", "pages/01_Data_Explorer.py"),
     ("Control Charts", "pages/02_Control_Charts.py"),
+    ("Stability Dashboard", "pages/08_Stability_Dashboard.py"),
     ("Capability", "pages/03_Capability.py"),
     ("Pareto", "pages/04_Pareto.py"),
     ("Regression", "pages/05_Regression.py"),
     ("Gage R&R", "pages/06_Gage_RR.py"),
+    ("Session Snapshots", "pages/09_Session_Snapshots.py"),
 ]
 if q:
     qq = q.lower().strip()
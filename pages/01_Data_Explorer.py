@@ -1,13 +1,78 @@
 # pages/01_Data_Explorer.py
 from __future__ import annotations
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
 
-from processiq.ui import set_page, df_preview, warn_empty
-from processiq.data import load_table, infer_numeric_columns, coerce_numeric
+from processiq.ui import set_page, df_preview, warn_empty, kpi_row
+from processiq.data import load_tables, MultiLoadedData, SOURCE_FILE_COL, infer_numeric_columns, coerce_numeric, array_fingerprint
 from processiq.state import set_df, get_df, clear_df
+from processiq.shared import loading_panel, load_upload
 from processiq.sample import load_sample_quality, load_sample_grr
+from processiq.sketch import SUMMARY_QUANTILES, QuantileSketch, box_stats
+from processiq.sources import DatabaseSource
+from processiq.columns import dataset_key, datetime_columns
+from processiq.resample import INTERVALS, resample
+from processiq.profiling import PROFILE_SAMPLE, DataProfile, profile_frame
+from processiq.expressions import FUNCTIONS, ExpressionError, add_calculated_column, calculated_columns, drop_calculated_column
+from processiq.reporting import Report
+from processiq.report_builder import ReportSection, add_section
+
+SKETCH_ROWS = 100_000  # above this, box plots are drawn from per-group quantile sketches
+BOX_GROUPS = 60
+
+
+def _sketch_box(plot_df, x: str, y: str) -> go.Figure:
+    # Five-number summaries only: the browser never receives the raw points
+    groups = plot_df.groupby(x, sort=True, observed=True)[y] if plot_df[x].nunique() <= BOX_GROUPS else None
+    fig = go.Figure()
+    items = groups if groups is not None else [(y, plot_df[y])]
+    for name, vals in items:
+        sk = QuantileSketch.from_array(vals.to_numpy(dtype=float))
+        if sk.n == 0:
+            continue
+        b = box_stats(sk)
+        fig.add_trace(go.Box(name=str(name), **{k: [v] for k, v in b.items()}))
+    fig.update_layout(xaxis_title=x if groups is not None else "", yaxis_title=y, showlegend=False)
+    return fig
+
+
+@st.cache_data(show_spinner="Profiling…", max_entries=4)
+def _profile(key: str, _df) -> DataProfile:
+    return profile_frame(_df)
+
+
+@st.cache_data(max_entries=16)
+def _exact_quantiles(fingerprint: str, _y: np.ndarray) -> pd.DataFrame:
+    # The data is in memory, so exact order statistics; cached so reruns only hash the column
+    y = _y[np.isfinite(_y)]
+    values = np.quantile(y, SUMMARY_QUANTILES) if y.size else np.full(len(SUMMARY_QUANTILES), np.nan)
+    return pd.DataFrame({"quantile": [f"P{100 * q:g}" for q in SUMMARY_QUANTILES], "value": values, "n": y.size})
+
+
+# Catalog lookups are cached per file version (path + modification time)
+@st.cache_data(max_entries=16)
+def _db_tables(path: str, mtime: float) -> list[str]:
+    return DatabaseSource(path).tables()
+
+
+@st.cache_data(max_entries=64)
+def _db_columns(path: str, mtime: float, table: str) -> list[str]:
+    return [c for c, _ in DatabaseSource(path).columns(table)]
+
+
+@st.cache_data(max_entries=64)
+def _db_time_range(path: str, mtime: float, table: str, col: str):
+    return DatabaseSource(path).time_range(table, col)
+
+
+@st.cache_data(max_entries=64)
+def _db_distinct(path: str, mtime: float, table: str, col: str) -> list:
+    return DatabaseSource(path).distinct_values(table, col)
+
 
 set_page("Data Explorer", icon="🗂️")
 
@@ -38,11 +103,84 @@ with c3:
         st.info("Cleared shared dataset.")
         st.rerun()
 
+# ---------------------------
+# Local database (SQLite / DuckDB) with pushdown
+# ---------------------------
+with st.expander("Load from a local database file (SQLite / DuckDB)"):
+    db_path = st.text_input(
+        "Database file path",
+        value="",
+        placeholder="/data/mes_archive.sqlite",
+        key="de_db_path",
+        help="A file on the machine running ProcessIQ. Only the chosen columns and filtered rows are read.",
+    )
+    if db_path.strip():
+        try:
+            src = DatabaseSource(db_path.strip())
+            db = (str(src.path), src.path.stat().st_mtime)
+            tables = _db_tables(*db)
+        except Exception as e:
+            st.error(f"Could not open database: {e}")
+            tables = []
+
+        if tables:
+            table = st.selectbox("Table", tables, key="de_db_table")
+            db_cols = _db_columns(*db, table)
+            pick_cols = st.multiselect("Columns (empty = all)", db_cols, key="de_db_columns")
+
+            d1, d2 = st.columns(2)
+            with d1:
+                time_col = st.selectbox("Time column", ["(none)"] + db_cols, key="de_db_time_col")
+            start = end = None
+            if time_col != "(none)":
+                lo, hi = _db_time_range(*db, table, time_col)
+                if lo is not None:
+                    with d2:
+                        picked = st.date_input(
+                            "Date range", value=(lo.date(), hi.date()), min_value=lo.date(), max_value=hi.date(), key="de_db_dates"
+                        )
+                    if isinstance(picked, (tuple, list)) and len(picked) == 2:
+                        start, end = pd.Timestamp(picked[0]), pd.Timestamp(picked[1]) + pd.Timedelta(days=1)
+
+            f1, f2 = st.columns(2)
+            with f1:
+                cat_col = st.selectbox("Filter column", ["(none)"] + db_cols, key="de_db_filter_col")
+            filters = {}
+            if cat_col != "(none)":
+                with f2:
+                    keep = st.multiselect("Keep values", _db_distinct(*db, table, cat_col), key="de_db_filter_values")
+                if keep:
+                    filters[cat_col] = keep
+
+            row_limit = int(st.number_input("Row limit (0 = none)", min_value=0, value=0, step=10_000, key="de_db_limit"))
+            if st.button("Load from database", type="primary", key="de_db_load"):
+                columns = list(pick_cols) or None
+                if columns is not None:
+                    # Filter / time columns stay in the result so the tools can use them
+                    extra = [c for c in (time_col, cat_col) if c != "(none)" and c not in columns]
+                    columns += extra
+                with st.spinner("Querying…"):
+                    db_df = src.read(
+                        table,
+                        columns=columns,
+                        time_col=None if time_col == "(none)" else time_col,
+                        start=start,
+                        end=end,
+                        filters=filters,
+                        limit=row_limit or None,
+                    )
+                set_df(db_df, f"{src.name}:{table}")
+                st.success(f"Loaded {len(db_df):,} rows × {db_df.shape[1]} columns from {src.name}:{table} (saved for other tools).")
+                st.rerun()
+
 st.divider()
 
 # ---------------------------
 # Data source: shared OR upload
 # ---------------------------
+if loading_panel("de"):
+    st.stop()
+
 shared_df, shared_name = get_df()
 
 use_shared = False
@@ -54,8 +192,22 @@ if use_shared and shared_df is not None:
     df = shared_df.copy()
     source_name = shared_name
 else:
-    uploaded = st.file_uploader("Upload CSV or Excel", type=["csv", "xlsx", "xls"], key="de_uploader")
-    loaded = load_table(uploaded)
+    uploaded = st.file_uploader(
+        "Upload CSV or Excel (several files are stacked into one dataset)",
+        type=["csv", "xlsx", "xls"],
+        accept_multiple_files=True,
+        key="de_uploader",
+    )
+    if len(uploaded) > 1:
+        # Parse each set of files once; reruns reuse the stacked result
+        upload_key = tuple(f.file_id for f in uploaded)
+        if st.session_state.get("de_multi_key") != upload_key:
+            with st.spinner(f"Parsing {len(uploaded)} files…"):
+                st.session_state["de_multi"] = load_tables(uploaded)
+            st.session_state["de_multi_key"] = upload_key
+        loaded = st.session_state["de_multi"]
+    else:
+        loaded = load_upload(uploaded[0] if uploaded else None, "de")
     if not loaded:
         warn_empty("Upload a dataset above, or click a sample dataset button.")
         st.stop()
@@ -67,8 +219,123 @@ else:
     set_df(df, source_name)
     st.success(f"Loaded dataset: {source_name} (saved for other tools)")
 
+    if isinstance(loaded, MultiLoadedData):
+        with st.expander(f"Files ({len(loaded.timings)}) — parse times and schema check", expanded=bool(loaded.notes)):
+            st.dataframe(loaded.timings, use_container_width=True, hide_index=True)
+            st.caption(f"Parsed in parallel; total parse time {loaded.timings['parse_s'].sum():.2f} s. Each row's file is in '{SOURCE_FILE_COL}'.")
+            for note in loaded.notes:
+                st.warning(note)
+
 df_preview(df, max_rows=50)
 
+# ---------------------------
+# Calculated columns
+# ---------------------------
+with st.expander(f"Calculated columns ({len(calculated_columns(df))})"):
+    st.caption(
+        "Define a column from an expression over existing columns, e.g. `defectives / sample_size_n` or "
+        "``where(`pressure_kPa` > 40, measurement, nan)``. Use backticks around names with spaces or symbols. "
+        f"Functions: {', '.join(FUNCTIONS)}. The column is added to the shared dataset, so every tool can pick it."
+    )
+    c1, c2 = st.columns([1, 3])
+    with c1:
+        calc_name = st.text_input("New column name", key="de_calc_name")
+    with c2:
+        calc_expr = st.text_input("Expression", key="de_calc_expr")
+    if st.button("Add calculated column", key="de_calc_add"):
+        # Modify the shared frame itself: only the new column is allocated
+        target, target_name = get_df()
+        try:
+            add_calculated_column(target, calc_name, calc_expr)
+        except ExpressionError as e:
+            st.error(str(e))
+        else:
+            set_df(target, target_name)
+            st.rerun()
+
+    defs = calculated_columns(df)
+    for i, (name, text) in enumerate(defs.items()):
+        r1, r2 = st.columns([5, 1])
+        r1.markdown(f"**{name}** = `` {text} ``")
+        if r2.button("Remove", key=f"de_calc_rm_{i}"):
+            target, target_name = get_df()
+            set_df(drop_calculated_column(target, name), target_name)
+            st.rerun()
+
+# ---------------------------
+# Profile
+# ---------------------------
+st.divider()
+st.subheader("Profile")
+
+if st.toggle("Profile every column (nulls, ranges, outliers, top values, histograms)", key="de_profile"):
+    prof = _profile(dataset_key(df), df)
+    n_out = int((prof.numeric["IQR outliers"] > 0).sum())
+    kpi_row(
+        [
+            ("Rows", f"{prof.rows:,}"),
+            ("Columns", f"{prof.columns:,}"),
+            ("Missing cells", f"{100 * prof.null_rate:.2f}%"),
+            ("Columns with IQR outliers", f"{n_out}"),
+        ]
+    )
+    if len(prof.numeric):
+        st.dataframe(
+            prof.numeric,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "histogram": st.column_config.BarChartColumn("histogram", help="Sampled distribution over min..max"),
+                "null %": st.column_config.NumberColumn(format="%.2f"),
+                "outlier %": st.column_config.NumberColumn(format="%.2f"),
+            },
+        )
+    if len(prof.other):
+        st.dataframe(prof.other, use_container_width=True, hide_index=True)
+    st.caption(
+        f"Profiled in {prof.seconds:.2f} s. Counts, ranges and moments are exact; outlier fences "
+        f"(1.5·IQR and modified z > 3.5) and histograms use a stratified sample of up to {PROFILE_SAMPLE:,} rows."
+    )
+
+    prof_inputs = f"<b>Rows:</b> {prof.rows:,}<br/><b>Columns:</b> {prof.columns:,}"
+    prof_interp = (
+        f"{100 * prof.null_rate:.2f}% of cells are missing; {n_out} numeric column(s) have values "
+        f"outside the 1.5·IQR fences."
+    )
+    prof_kpis = [("Rows", f"{prof.rows:,}"), ("Columns", f"{prof.columns:,}"),
+                 ("Missing cells", f"{100 * prof.null_rate:.2f}%"), ("Columns with IQR outliers", f"{n_out}")]
+    prof_rep = Report(title="ProcessIQ Report — Data Profile", subtitle="Tool: Data Explorer", dataset_name=source_name or "(unknown)")
+    prof_rep.add_card("Inputs", prof_inputs)
+    prof_rep.add_card("Interpretation", prof_interp)
+    prof_rep.add_kpis("Overview", prof_kpis)
+    for title, table in prof.report_tables():
+        prof_rep.add_table(title, table)
+
+    colA, colB = st.columns(2)
+    with colA:
+        st.download_button(
+            "Download HTML profile",
+            data=prof_rep.render_html().encode("utf-8"),
+            file_name=prof_rep.file_name("processiq_data_profile"),
+            mime="text/html",
+            use_container_width=True,
+            key="de_profile_dl_html",
+        )
+    with colB:
+        if st.button("Add to Report Builder", use_container_width=True, key="de_profile_add_rb"):
+            add_section(
+                ReportSection(
+                    tool="Data Profile",
+                    subtitle=f"{prof.columns} columns × {prof.rows:,} rows",
+                    dataset_name=source_name or "(unknown)",
+                    inputs_html=prof_inputs,
+                    interpretation_html=prof_interp,
+                    kpis=prof_kpis,
+                    tables=prof.report_tables(),
+                )
+            )
+            st.success("Added Data Profile section to Report Builder.")
+
 # ---------------------------
 # Filter
 # ---------------------------
@@ -108,6 +375,13 @@ if chart == "Scatter":
     fig = px.scatter(plot_df, x=x, y=y)
 elif chart == "Line":
     fig = px.line(plot_df, x=x, y=y)
+elif chart == "Box" and len(plot_df) > SKETCH_ROWS:
+    fig = _sketch_box(plot_df, x, y)
+    st.caption(
+        f"{len(plot_df):,} rows: boxes drawn from quantile sketches (whiskers at the 1.5·IQR fences"
+        + ("" if plot_df[x].nunique() <= BOX_GROUPS else f"; more than {BOX_GROUPS} X values, so one box")
+        + ")."
+    )
 elif chart == "Box":
     fig = px.box(plot_df, x=x, y=y)
 else:
@@ -115,6 +389,54 @@ else:
 
 st.plotly_chart(fig, use_container_width=True)
 
+if st.toggle(f"Quantile summary — {y}", key="de_quantiles"):
+    y_vals = plot_df[y].to_numpy(dtype=float, na_value=np.nan)
+    q_table = _exact_quantiles(array_fingerprint(y_vals), y_vals)
+    n_vals = int(q_table["n"].iloc[0])
+    if n_vals:
+        st.dataframe(q_table.drop(columns="n"), use_container_width=True, hide_index=True)
+        st.caption(f"Exact quantiles over {n_vals:,} values.")
+    else:
+        st.caption("No numeric values.")
+
+# ---------------------------
+# Time buckets
+# ---------------------------
+time_cols = datetime_columns(df_filt)
+if time_cols and numeric_cols:
+    st.subheader("Time buckets")
+    st.caption("Aggregate by calendar interval instead of plotting every row: mean with a 5–95% band, plus range, std and count per bucket.")
+    b1, b2, b3 = st.columns(3)
+    with b1:
+        rs_time = st.selectbox("Time column", time_cols, key="de_rs_time")
+    with b2:
+        rs_interval = st.selectbox("Interval", list(INTERVALS), index=2, key="de_rs_interval")
+    with b3:
+        rs_val = st.selectbox("Value", numeric_cols, index=numeric_cols.index(y) if y in numeric_cols else 0, key="de_rs_val")
+
+    rs = resample(df_filt, rs_time, [rs_val], INTERVALS[rs_interval])
+    rs = rs[rs[f"{rs_val}_count"] > 0]
+    fig_rs = go.Figure()
+    fig_rs.add_trace(go.Scatter(x=rs["bucket"], y=rs[f"{rs_val}_p95"], mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip"))
+    fig_rs.add_trace(
+        go.Scatter(x=rs["bucket"], y=rs[f"{rs_val}_p5"], mode="lines", line=dict(width=0), fill="tonexty", name="5–95%", hoverinfo="skip")
+    )
+    fig_rs.add_trace(
+        go.Scatter(
+            x=rs["bucket"],
+            y=rs[f"{rs_val}_mean"],
+            mode="lines+markers",
+            name="mean",
+            customdata=rs[[f"{rs_val}_count", f"{rs_val}_range", f"{rs_val}_std"]].to_numpy(),
+            hovertemplate="%{x}<br>mean %{y:.4g}<br>n %{customdata[0]}<br>range %{customdata[1]:.4g}<br>std %{customdata[2]:.4g}<extra></extra>",
+        )
+    )
+    fig_rs.update_layout(title=f"{rs_val} by {rs_interval.lower()}", xaxis_title=rs_time, yaxis_title=rs_val)
+    st.plotly_chart(fig_rs, use_container_width=True)
+    st.caption(f"{len(rs):,} buckets from {int(rs[f'{rs_val}_count'].sum()):,} values.")
+    with st.expander("Bucket table"):
+        st.dataframe(rs, use_container_width=True, hide_index=True)
+
 # ---------------------------
 # Export
 # ---------------------------
@@ -1,18 +1,22 @@
 # pages/02_Control_Charts.py
 from __future__ import annotations
 
+import numpy as np
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 
-from processiq.ui import set_page, df_preview, warn_empty
+from processiq.ui import set_page, df_preview, warn_empty, require_numeric
 from processiq.data import coerce_numeric
 from processiq.spc import (
     imr,
-    xbar_r,
-    p_chart,
+    subgroup_chart,
     nelson_rules_1_2_3_4,
     imr_sigma_from_mrbar,
+    ewma,
+    cusum,
+    phase1_imr,
+    phase1_xbar_r,
 )
 from processiq.shared import get_working_df
 from processiq.columns import (
@@ -20,16 +24,188 @@ from processiq.columns import (
     count_like_columns,
     positive_numeric_like_columns,
     subgroup_columns_xbarr,
+    datetime_columns,
 )
+from processiq.resample import INTERVALS, time_subgroup_stats
 from processiq.reporting import Report
 from processiq.report_builder import ReportSection, add_section
+from processiq.charts import minmax_decimate
+from processiq.attribute import attribute_chart
+from processiq.multivariate import t2_chart
+from processiq.live import LiveMonitor, tail_csv, read_socket, poll_sqlite
 
 set_page("Control Charts", icon="📈")
 
 st.title("Control Charts")
-st.caption("I-MR, Xbar-R, and attribute charts for quick stability checks.")
+st.caption("I-MR, Xbar-R/S, EWMA/CUSUM, Hotelling T², and attribute charts for quick stability checks.")
 st.caption("Only compatible columns are shown for each chart type.")
 
+LIVE_WINDOW = 500  # points kept on the live chart
+
+
+def _live_monitor(kind: str, target: str, table: str, columns: tuple[str, ...], baseline: int) -> LiveMonitor:
+    # One monitor per session, so Start / Stop never touch another user's chart;
+    # a changed feed or setting stops the previous monitor before replacing it
+    config = (kind, target, table, columns, baseline)
+    held = st.session_state.get("cc_live_monitor")
+    if held is not None and held[0] == config:
+        return held[1]
+    if held is not None:
+        held[1].stop()
+    if kind == "CSV file (tail)":
+        factory = lambda: tail_csv(target)
+    elif kind == "Socket (NDJSON)":
+        host, _, port = target.rpartition(":")
+        factory = lambda: read_socket(host or "127.0.0.1", int(port))
+    else:
+        factory = lambda: poll_sqlite(target, table)
+    mon = LiveMonitor(factory, columns=list(columns) or None, baseline=baseline)
+    st.session_state["cc_live_monitor"] = (config, mon)
+    return mon
+
+
+def _live_view() -> None:
+    l1, l2, l3 = st.columns([1, 2, 1])
+    with l1:
+        kind = st.selectbox("Feed", ["CSV file (tail)", "Socket (NDJSON)", "SQLite table"], key="cc_live_kind")
+    with l2:
+        hint = {"CSV file (tail)": "/data/line1.csv", "Socket (NDJSON)": "127.0.0.1:9000", "SQLite table": "/data/gateway.db"}
+        target = st.text_input("Path or host:port", placeholder=hint[kind], key="cc_live_target")
+    with l3:
+        table = st.text_input("Table (SQLite)", value="", key="cc_live_table", disabled=kind != "SQLite table")
+    m1, m2 = st.columns([3, 1])
+    with m1:
+        cols_in = st.text_input("Columns to monitor (comma-separated, blank = all numeric)", key="cc_live_cols")
+    with m2:
+        baseline = st.number_input("Baseline points", 5, 1000, 25, key="cc_live_baseline")
+
+    if not target.strip() or (kind == "SQLite table" and not table.strip()):
+        st.info("Point the monitor at a feed to start.")
+        return
+
+    if kind == "Socket (NDJSON)":
+        port = target.strip().rpartition(":")[2]
+        if not port.isdigit() or not 0 < int(port) < 65536:
+            st.error("Enter the socket as host:port with a port from 1 to 65535, e.g. 127.0.0.1:9000.")
+            return
+
+    columns = tuple(c.strip() for c in cols_in.split(",") if c.strip())
+    mon = _live_monitor(kind, target.strip(), table.strip(), columns, int(baseline))
+
+    b1, b2, _ = st.columns([1, 1, 3])
+    with b1:
+        if st.button("Start", disabled=mon.running, use_container_width=True, key="cc_live_start"):
+            mon.start()
+            st.rerun()
+    with b2:
+        if st.button("Stop", disabled=not mon.running, use_container_width=True, key="cc_live_stop"):
+            mon.stop()
+            st.rerun()
+
+    @st.fragment(run_every=1.0 if mon.running else None)
+    def _live_panel() -> None:
+        if mon.error:
+            st.error(f"Feed stopped: {mon.error}")
+        cols = mon.columns()
+        if not cols:
+            st.caption("Waiting for data…")
+            return
+        col = st.selectbox("Characteristic", cols, key="cc_live_col")
+
+        # Pull only what this session has not drawn yet
+        bufs = st.session_state.setdefault("cc_live_buf", {})
+        key = (id(mon), mon.generation, col)
+        buf = bufs.get(key, pd.DataFrame(columns=["seq", "X", "MR"]))
+        next_seq = int(buf["seq"].iloc[-1]) + 1 if len(buf) else 0
+        new, xline, mrline = mon.since(col, next_seq)
+        if len(new):
+            buf = pd.concat([buf, new], ignore_index=True).tail(LIVE_WINDOW) if len(buf) else new.tail(LIVE_WINDOW)
+            bufs[key] = buf
+
+        alarms = mon.alarms(col)
+        last = f"{pd.Timestamp(mon.last_update, unit='s'):%H:%M:%S}" if mon.last_update else "—"
+        kpi_cols = st.columns(4)
+        kpi_cols[0].metric("Rows ingested", f"{mon.rows:,}")
+        kpi_cols[1].metric("Points (this column)", f"{next_seq + len(new):,}")
+        kpi_cols[2].metric("Alarms", f"{len(alarms):,}")
+        kpi_cols[3].metric("Last update", last)
+
+        if xline is None:
+            st.caption(f"Collecting baseline ({len(buf)}/{int(baseline)} points) before limits are frozen.")
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=buf["seq"], y=buf["X"], mode="lines+markers", name="X"))
+        flagged = buf[buf["seq"].isin(alarms["seq"])] if len(alarms) else buf.iloc[0:0]
+        fig.add_trace(go.Scatter(x=flagged["seq"], y=flagged["X"], mode="markers", name="Alarms", marker=dict(size=10)))
+        if xline is not None:
+            fig.add_hline(y=xline.center, line_dash="dash", annotation_text="CL")
+            if xline.ucl is not None:
+                fig.add_hline(y=xline.ucl, line_dash="dot", annotation_text="UCL")
+                fig.add_hline(y=xline.lcl, line_dash="dot", annotation_text="LCL")
+        fig.update_layout(title=f"Live Individuals — {col}", xaxis_title="Sequence", yaxis_title=col)
+        st.plotly_chart(fig, use_container_width=True)
+
+        if mrline is not None:
+            fig2 = go.Figure()
+            fig2.add_trace(go.Scatter(x=buf["seq"], y=buf["MR"], mode="lines", name="MR"))
+            fig2.add_hline(y=mrline.center, line_dash="dash", annotation_text="CL")
+            fig2.add_hline(y=mrline.ucl, line_dash="dot", annotation_text="UCL")
+            fig2.update_layout(title="Live Moving Range", xaxis_title="Sequence", yaxis_title="MR", height=280)
+            st.plotly_chart(fig2, use_container_width=True)
+
+        t2_key = (id(mon), mon.generation, None)
+        t2_buf = bufs.get(t2_key, pd.DataFrame(columns=["seq", "T2", "UCL"]))
+        t2_new, t2_cols, t2_error = mon.t2_since(int(t2_buf["seq"].iloc[-1]) + 1 if len(t2_buf) else 0)
+        if len(t2_new):
+            t2_buf = pd.concat([t2_buf, t2_new], ignore_index=True).tail(LIVE_WINDOW) if len(t2_buf) else t2_new.tail(LIVE_WINDOW)
+            bufs[t2_key] = t2_buf
+        if t2_cols:
+            st.subheader(f"Live Hotelling T² ({len(t2_cols)} variables)")
+            if t2_error:
+                st.warning(t2_error)
+            elif t2_buf.empty:
+                st.caption("Collecting baseline rows before the covariance is frozen.")
+            else:
+                above = t2_buf[t2_buf["T2"] > t2_buf["UCL"]]
+                fig3 = go.Figure()
+                fig3.add_trace(go.Scatter(x=t2_buf["seq"], y=t2_buf["T2"], mode="lines", name="T²"))
+                fig3.add_trace(go.Scatter(x=above["seq"], y=above["T2"], mode="markers", name="Signals", marker=dict(size=8)))
+                fig3.add_trace(go.Scatter(x=t2_buf["seq"], y=t2_buf["UCL"], mode="lines", name="UCL", line=dict(dash="dot")))
+                fig3.update_layout(title="Live T² — " + ", ".join(t2_cols), xaxis_title="Sequence", yaxis_title="T²", height=300)
+                st.plotly_chart(fig3, use_container_width=True)
+
+        st.subheader("Recent alarms")
+        if len(alarms):
+            st.dataframe(alarms.head(50), use_container_width=True)
+        else:
+            st.write("No Nelson rule alarms (R1–R4).")
+
+        with st.expander("Stream quantiles (all points so far)"):
+            st.dataframe(mon.quantiles(col), use_container_width=True, hide_index=True)
+
+    _live_panel()
+
+
+def _phase1_history(p1, unit: str) -> pd.DataFrame:
+    """Show the pass-by-pass exclusion table; returns it for the report."""
+    st.subheader("Phase I limit revision")
+    n_out = int(p1.data["excluded"].sum())
+    if p1.converged:
+        st.success(f"Limits converged after {len(p1.history)} pass(es); {n_out} {unit}(s) excluded.")
+    elif p1.history.empty:
+        st.warning(f"Too many {unit}s are flagged to revise the limits; they stay as computed from all data.")
+    else:
+        st.warning(f"Stopped before convergence (pass limit or too few {unit}s left); {n_out} {unit}(s) excluded.")
+    hist = p1.history.rename(columns={"excluded_at": f"excluded {unit}s"})
+    st.dataframe(hist, use_container_width=True, hide_index=True)
+    return hist
+
+
+if st.toggle("Live monitoring (tail a feed)", key="cc_live"):
+    st.caption("Limits are set from the first baseline points, then new points are checked as they arrive.")
+    _live_view()
+    st.stop()
+
 df, dataset_name = get_working_df(key_prefix="control_charts")
 if df is None:
     warn_empty("Upload a dataset here OR load one in Data Explorer and use the shared dataset.")
@@ -40,7 +216,7 @@ st.divider()
 
 chart_type = st.radio(
     "Chart type",
-    ["I-MR (Individuals)", "Xbar-R (Subgroup)", "p-chart (Attribute)", "np-chart", "c-chart", "u-chart"],
+    ["I-MR (Individuals)", "Xbar-R / Xbar-S (Subgroup)", "EWMA", "CUSUM", "Hotelling T² (Multivariate)", "p-chart (Attribute)", "np-chart", "c-chart", "u-chart"],
     horizontal=True,
 )
 
@@ -61,13 +237,47 @@ if chart_type == "I-MR (Individuals)":
         st.stop()
 
     col = st.selectbox("Measurement column", num_cols, key="cc_imr_col")
-    x = coerce_numeric(df[col]).dropna()
+    require_numeric(df, col)
+
+    # Stream filter handed over by the Stability Dashboard drill-down
+    imr_filter = {c: v for c, v in (st.session_state.get("cc_imr_filter") or {}).items() if c in df.columns}
+    if imr_filter:
+        keep = pd.Series(True, index=df.index)
+        for c, v in imr_filter.items():
+            keep &= df[c].astype("string").fillna("(blank)") == v
+        f1, f2 = st.columns([4, 1])
+        with f1:
+            st.info("Filtered to " + ", ".join(f"{c} = {v}" for c, v in imr_filter.items()) + f" ({int(keep.sum())} rows)")
+        with f2:
+            if st.button("Clear filter", key="cc_imr_clear_filter"):
+                st.session_state.pop("cc_imr_filter", None)
+                st.rerun()
+        x = coerce_numeric(df.loc[keep, col]).dropna()
+    else:
+        x = coerce_numeric(df[col]).dropna()
 
     if len(x) < 3:
         st.warning("Not enough numeric data points for I-MR (need at least 3).")
         st.stop()
 
-    dd, xline, mrline = imr(x)
+    p1c1, p1c2 = st.columns([2, 3])
+    with p1c1:
+        phase1 = st.checkbox("Phase I: exclude out-of-control points and recompute limits", key="cc_imr_phase1")
+    with p1c2:
+        phase1_rules = st.multiselect(
+            "Exclude points flagged by",
+            ["R1", "R2", "R3", "R4"],
+            default=["R1"],
+            key="cc_imr_phase1_rules",
+            disabled=not phase1,
+        )
+
+    p1 = None
+    if phase1 and phase1_rules:
+        p1 = phase1_imr(x, rules=tuple(phase1_rules))
+        dd, xline, mrline = p1.data[["X", "MR"]], p1.x_line, p1.spread_line
+    else:
+        dd, xline, mrline = imr(x)
     sigma = imr_sigma_from_mrbar(mrline.center)
     viol = nelson_rules_1_2_3_4(dd["X"], center=xline.center, sigma=sigma if sigma else float("nan"))
     viol_idx = set(viol["index"].astype(int).tolist()) if len(viol) else set()
@@ -76,6 +286,10 @@ if chart_type == "I-MR (Individuals)":
         "<b>Chart:</b> I-MR",
         f"<b>Measurement:</b> {col}",
     ]
+    if imr_filter:
+        report_inputs.append("<b>Filter:</b> " + ", ".join(f"{c} = {v}" for c, v in imr_filter.items()))
+    if p1 is not None:
+        report_inputs.append(f"<b>Phase I:</b> excluded {int(p1.data['excluded'].sum())} point(s) flagged by {', '.join(phase1_rules)}")
 
     if len(viol):
         st.error(f"Unstable: {len(viol)} run rule violation(s) detected. Investigate special cause before capability.")
@@ -111,6 +325,13 @@ if chart_type == "I-MR (Individuals)":
         name="Rule violations",
     ))
 
+    if p1 is not None and p1.data["excluded"].any():
+        ex = p1.data.index[p1.data["excluded"]]
+        fig1.add_trace(go.Scatter(
+            x=ex, y=p1.data.loc[ex, "X"], mode="markers", name="Excluded (Phase I)",
+            marker=dict(symbol="x", size=10),
+        ))
+
     fig1.add_hline(y=xline.center, line_dash="dash", annotation_text="CL")
     if xline.ucl is not None:
         fig1.add_hline(y=xline.ucl, line_dash="dot", annotation_text="UCL")
@@ -136,219 +357,435 @@ if chart_type == "I-MR (Individuals)":
     else:
         st.write("No Nelson rule violations detected (R1–R4).")
 
+    if p1 is not None:
+        report_tables.append(("Phase I exclusion history", _phase1_history(p1, "point")))
+
     report_figs += [("Individuals (I) Chart", fig1), ("Moving Range (MR) Chart", fig2)]
     if len(viol):
         report_tables.append(("Run rule violations", viol))
 
 # ========================= Xbar-R =========================
-elif chart_type == "Xbar-R (Subgroup)":
+elif chart_type == "Xbar-R / Xbar-S (Subgroup)":
     value_cols = numeric_like_columns(df)
-    group_cols = subgroup_columns_xbarr(df)
+    group_cols = subgroup_columns_xbarr(df, max_size=None, require_equal=False)
+    time_cols = datetime_columns(df)
 
     if not value_cols:
         st.warning("No numeric-like measurement columns found for Xbar-R.")
         st.stop()
-    if not group_cols:
-        st.warning("No valid subgroup columns found (need consistent subgroup sizes 2..10).")
+    if not group_cols and not time_cols:
+        st.warning("No valid subgroup columns found (every subgroup needs 2+ rows).")
         st.stop()
 
     value_col = st.selectbox("Measurement column", value_cols, key="cc_xbarr_val")
-    subgroup_col = st.selectbox("Subgroup column", group_cols, key="cc_xbarr_grp")
+    require_numeric(df, value_col)
+    sources = (["Subgroup column"] if group_cols else []) + (["Time buckets"] if time_cols else [])
+    subgroup_source = st.radio("Subgroups from", sources, horizontal=True, key="cc_xbarr_source")
+    sub_stats = None
+    if subgroup_source == "Time buckets":
+        t1, t2 = st.columns(2)
+        with t1:
+            time_col = st.selectbox("Time column", time_cols, key="cc_xbarr_time")
+        with t2:
+            interval = st.selectbox("Interval", list(INTERVALS), index=2, key="cc_xbarr_interval")
+        # One subgroup per calendar bucket, aggregated once and cached
+        sub_stats = time_subgroup_stats(df, time_col, value_col, INTERVALS[interval])
+        subgroup_col = f"{time_col} ({interval.lower()})"
+    else:
+        subgroup_col = st.selectbox("Subgroup column", group_cols, key="cc_xbarr_grp")
+    spread = st.radio(
+        "Spread chart",
+        ["R", "S"],
+        horizontal=True,
+        key="cc_xbar_spread",
+        help="S is preferred for larger subgroups (roughly n > 10).",
+    )
 
-    out, xbar_line, r_line, n = xbar_r(df, value_col=value_col, subgroup_col=subgroup_col)
-    st.caption(f"Detected subgroup size: n = {n}")
+    phase1 = st.checkbox(
+        "Phase I: exclude out-of-limit subgroups and recompute limits",
+        key="cc_xbarr_phase1",
+    )
+    p1 = None
+    try:
+        if phase1:
+            p1, n = phase1_xbar_r(df, value_col=value_col, subgroup_col=subgroup_col, spread=spread, stats=sub_stats)
+            out = p1.data
+        else:
+            ch = subgroup_chart(df, value_col=value_col, subgroup_col=subgroup_col, spread=spread, stats=sub_stats)
+            out = ch.table
+            n = int(out["n"].mode().iloc[0])
+    except ValueError as e:
+        st.warning(str(e))
+        st.stop()
+
+    sizes_vary = out["n"].nunique() > 1
+    if sizes_vary:
+        st.caption(f"Subgroup sizes vary ({int(out['n'].min())}–{int(out['n'].max())}); limits are set per subgroup.")
+    else:
+        st.caption(f"Detected subgroup size: n = {n}")
 
+    spread_name = "Range" if spread == "R" else "Std dev"
     report_inputs += [
-        "<b>Chart:</b> Xbar-R",
+        f"<b>Chart:</b> Xbar-{spread}",
         f"<b>Measurement:</b> {value_col}",
-        f"<b>Subgroup:</b> {subgroup_col} (n={n})",
+        f"<b>Subgroup:</b> {subgroup_col} (n={int(out['n'].min())}–{int(out['n'].max())})" if sizes_vary else f"<b>Subgroup:</b> {subgroup_col} (n={n})",
     ]
-    badge_text = "Xbar-R chart generated (interpret stability visually)"
-    badge_level = "warn"
+    if p1 is not None:
+        report_inputs.append(f"<b>Phase I:</b> excluded {int(p1.data['excluded'].sum())} subgroup(s) outside the Xbar or {spread} limits")
+
+    beyond = int(((out["Xbar"] > out["X_UCL"]) | (out["Xbar"] < out["X_LCL"])).sum())
+    beyond_sp = int(((out[spread] > out[f"{spread}_UCL"]) | (out[spread] < out[f"{spread}_LCL"])).sum())
+    if beyond or beyond_sp:
+        badge_text = f"Xbar-{spread}: {beyond} mean(s) and {beyond_sp} {spread} value(s) beyond limits"
+        badge_level = "error"
+    else:
+        badge_text = f"Xbar-{spread}: all subgroups within limits"
+        badge_level = "success"
+    report_interp.append(badge_text)
+
+    # Long runs of subgroups are thinned for drawing; limits/flags use every subgroup
+    keep = np.union1d(minmax_decimate(out["Xbar"].to_numpy()), minmax_decimate(out[spread].to_numpy()))
+    view = out.iloc[keep]
+    if len(view) < len(out):
+        st.caption(f"Showing {len(view):,} of {len(out):,} subgroups (min/max preserved).")
+
+    def _limit_lines(fig, center, lcl, ucl):
+        if sizes_vary:
+            # Per-subgroup limits drawn as steps
+            for name, y, dash in (("CL", center, "dash"), ("UCL", ucl, "dot"), ("LCL", lcl, "dot")):
+                fig.add_trace(go.Scatter(x=view.index, y=y, mode="lines", name=name, line=dict(dash=dash, shape="hv")))
+        else:
+            fig.add_hline(y=float(center.iloc[0]), line_dash="dash", annotation_text="CL")
+            fig.add_hline(y=float(ucl.iloc[0]), line_dash="dot", annotation_text="UCL")
+            fig.add_hline(y=float(lcl.iloc[0]), line_dash="dot", annotation_text="LCL")
 
     fig1 = go.Figure()
-    fig1.add_trace(go.Scatter(y=out["Xbar"], mode="lines+markers", name="Xbar"))
-    fig1.add_hline(y=xbar_line.center, line_dash="dash", annotation_text="CL")
-    fig1.add_hline(y=xbar_line.ucl, line_dash="dot", annotation_text="UCL")
-    fig1.add_hline(y=xbar_line.lcl, line_dash="dot", annotation_text="LCL")
+    fig1.add_trace(go.Scatter(x=view.index, y=view["Xbar"], mode="lines+markers", name="Xbar"))
+    if p1 is not None and view["excluded"].any():
+        ex = view.index[view["excluded"]]
+        fig1.add_trace(go.Scatter(x=ex, y=view.loc[ex, "Xbar"], mode="markers", name="Excluded (Phase I)", marker=dict(symbol="x", size=10)))
+    _limit_lines(fig1, (view["X_LCL"] + view["X_UCL"]) / 2, view["X_LCL"], view["X_UCL"])
     fig1.update_layout(title="Xbar Chart", xaxis_title="Subgroup order", yaxis_title=f"Mean({value_col})")
     st.plotly_chart(fig1, use_container_width=True)
 
     fig2 = go.Figure()
-    fig2.add_trace(go.Scatter(y=out["R"], mode="lines+markers", name="R"))
-    fig2.add_hline(y=r_line.center, line_dash="dash", annotation_text="CL")
-    fig2.add_hline(y=r_line.ucl, line_dash="dot", annotation_text="UCL")
-    fig2.add_hline(y=r_line.lcl, line_dash="dot", annotation_text="LCL")
-    fig2.update_layout(title="R Chart", xaxis_title="Subgroup order", yaxis_title="Range")
+    fig2.add_trace(go.Scatter(x=view.index, y=view[spread], mode="lines+markers", name=spread))
+    if p1 is not None and view["excluded"].any():
+        fig2.add_trace(go.Scatter(x=ex, y=view.loc[ex, spread], mode="markers", name="Excluded (Phase I)", marker=dict(symbol="x", size=10)))
+    _limit_lines(fig2, view[f"{spread}_CL"], view[f"{spread}_LCL"], view[f"{spread}_UCL"])
+    fig2.update_layout(title=f"{spread} Chart", xaxis_title="Subgroup order", yaxis_title=spread_name)
     st.plotly_chart(fig2, use_container_width=True)
 
-    report_figs += [("Xbar Chart", fig1), ("R Chart", fig2)]
+    if p1 is not None:
+        report_tables.append(("Phase I exclusion history", _phase1_history(p1, "subgroup")))
 
-# ========================= p-chart =========================
-elif chart_type == "p-chart (Attribute)":
-    count_cols = count_like_columns(df)
-    n_cols = positive_numeric_like_columns(df)
+    report_figs += [("Xbar Chart", fig1), (f"{spread} Chart", fig2)]
 
-    if not count_cols:
-        st.warning("No count-like columns found for defectives.")
-        st.stop()
-    if not n_cols:
-        st.warning("No positive numeric-like columns found for sample size n.")
+# ========================= EWMA =========================
+elif chart_type == "EWMA":
+    num_cols = numeric_like_columns(df)
+    if not num_cols:
+        st.warning("No numeric-like columns detected for EWMA.")
         st.stop()
 
-    defect_col = st.selectbox("Defectives column (count)", count_cols, key="cc_p_def")
-    n_col = st.selectbox("Sample size column (n)", n_cols, key="cc_p_n")
-
-    out, pbar = p_chart(df, defect_col=defect_col, n_col=n_col)
+    col = st.selectbox("Measurement column", num_cols, key="cc_ewma_col")
+    require_numeric(df, col)
+    e1, e2, e3 = st.columns(3)
+    with e1:
+        lam = st.slider("λ (weight)", 0.05, 1.0, 0.2, step=0.05, key="cc_ewma_lam")
+    with e2:
+        L = st.slider("L (limit width, σ)", 2.0, 3.5, 3.0, step=0.05, key="cc_ewma_L")
+    with e3:
+        tgt_in = st.text_input("Target (optional, default = mean)", value="", key="cc_ewma_tgt")
+
+    try:
+        target = float(tgt_in) if tgt_in.strip() else None
+        dd, eline = ewma(df[col], lam=lam, L=L, target=target)
+    except ValueError as e:
+        st.warning(str(e))
+        st.stop()
 
+    n_sig = int(dd["signal"].sum())
     report_inputs += [
-        "<b>Chart:</b> p-chart",
-        f"<b>Defectives:</b> {defect_col}",
-        f"<b>n:</b> {n_col}",
+        "<b>Chart:</b> EWMA",
+        f"<b>Measurement:</b> {col}",
+        f"<b>λ / L:</b> {lam:g} / {L:g}",
+        f"<b>Target:</b> {eline.center:.5g}",
     ]
-    badge_text = "p-chart generated (interpret stability visually)"
-    badge_level = "warn"
+    if n_sig:
+        st.error(f"Shift detected: {n_sig} point(s) beyond the EWMA limits.")
+        report_interp.append(f"Shift detected: {n_sig} EWMA point(s) beyond limits.")
+        badge_text = f"EWMA: SHIFT ({n_sig} signal(s))"
+        badge_level = "error"
+    else:
+        st.success("No EWMA signals: no sustained shift detected.")
+        report_interp.append("No EWMA signals: no sustained shift detected.")
+        badge_text = "EWMA: no signals"
+        badge_level = "success"
+
+    keep = minmax_decimate(dd["EWMA"].to_numpy())
+    if len(keep) < len(dd):
+        st.caption(f"Plot shows {len(keep):,} of {len(dd):,} points (min/max per bucket); signals are always drawn.")
+    sig = dd.index[dd["signal"]]
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(y=out["p"], mode="lines+markers", name="p"))
-    fig.add_trace(go.Scatter(y=out["UCL"], mode="lines", name="UCL"))
-    fig.add_trace(go.Scatter(y=out["LCL"], mode="lines", name="LCL"))
-    fig.add_hline(y=pbar, line_dash="dash", annotation_text="CL")
-    fig.update_layout(title="p-chart", xaxis_title="Order", yaxis_title="Fraction defective")
+    fig.add_trace(go.Scatter(x=keep, y=dd["EWMA"].to_numpy()[keep], mode="lines", name="EWMA"))
+    fig.add_trace(go.Scatter(x=keep, y=dd["UCL"].to_numpy()[keep], mode="lines", name="UCL", line=dict(dash="dot")))
+    fig.add_trace(go.Scatter(x=keep, y=dd["LCL"].to_numpy()[keep], mode="lines", name="LCL", line=dict(dash="dot")))
+    fig.add_trace(go.Scatter(x=sig, y=dd.loc[sig, "EWMA"], mode="markers", name="Signals"))
+    fig.add_hline(y=eline.center, line_dash="dash", annotation_text="Target")
+    fig.update_layout(title="EWMA Chart", xaxis_title="Order", yaxis_title=f"EWMA({col})")
     st.plotly_chart(fig, use_container_width=True)
 
-    report_figs.append(("p-chart", fig))
-
-# ========================= np-chart =========================
-elif chart_type == "np-chart":
-    count_cols = count_like_columns(df)
-    n_cols = positive_numeric_like_columns(df)
+    report_figs.append(("EWMA Chart", fig))
 
-    if not count_cols:
-        st.warning("No count-like columns found for defectives.")
-        st.stop()
-    if not n_cols:
-        st.warning("No positive numeric-like columns found for sample size n.")
+# ========================= CUSUM =========================
+elif chart_type == "CUSUM":
+    num_cols = numeric_like_columns(df)
+    if not num_cols:
+        st.warning("No numeric-like columns detected for CUSUM.")
         st.stop()
 
-    defect_col = st.selectbox("Defectives column (count)", count_cols, key="cc_np_def")
-    n_col = st.selectbox("Sample size column (n)", n_cols, key="cc_np_n")
-
-    d = df[[defect_col, n_col]].copy()
-    d[defect_col] = pd.to_numeric(d[defect_col], errors="coerce")
-    d[n_col] = pd.to_numeric(d[n_col], errors="coerce")
-    d = d.dropna()
-    d = d[(d[n_col] > 0) & (d[defect_col] >= 0)]
-    if d.empty:
-        st.warning("No valid rows after cleaning.")
+    col = st.selectbox("Measurement column", num_cols, key="cc_cusum_col")
+    require_numeric(df, col)
+    u1, u2, u3 = st.columns(3)
+    with u1:
+        k = st.slider("k (slack, σ)", 0.25, 1.5, 0.5, step=0.05, key="cc_cusum_k")
+    with u2:
+        h = st.slider("h (decision interval, σ)", 2.0, 8.0, 5.0, step=0.5, key="cc_cusum_h")
+    with u3:
+        tgt_in = st.text_input("Target (optional, default = mean)", value="", key="cc_cusum_tgt")
+
+    try:
+        target = float(tgt_in) if tgt_in.strip() else None
+        dd, H = cusum(df[col], k=k, h=h, target=target)
+    except ValueError as e:
+        st.warning(str(e))
         st.stop()
 
-    pbar = d[defect_col].sum() / d[n_col].sum()
-    npbar = pbar * d[n_col]
-    sigma = (d[n_col] * pbar * (1 - pbar)) ** 0.5
-    d["np"] = d[defect_col]
-    d["UCL"] = (npbar + 3 * sigma).clip(lower=0)
-    d["LCL"] = (npbar - 3 * sigma).clip(lower=0)
-
+    n_sig = int(dd["signal"].sum())
     report_inputs += [
-        "<b>Chart:</b> np-chart",
-        f"<b>Defectives:</b> {defect_col}",
-        f"<b>n:</b> {n_col}",
+        "<b>Chart:</b> Tabular CUSUM",
+        f"<b>Measurement:</b> {col}",
+        f"<b>k / h:</b> {k:g}σ / {h:g}σ",
     ]
-    badge_text = "np-chart generated (interpret stability visually)"
-    badge_level = "warn"
+    if n_sig:
+        first = int(dd.index[dd["signal"]][0])
+        st.error(f"Shift detected: {n_sig} point(s) beyond H (first at order {first}).")
+        report_interp.append(f"Shift detected: {n_sig} CUSUM point(s) beyond H, first at order {first}.")
+        badge_text = f"CUSUM: SHIFT ({n_sig} signal(s))"
+        badge_level = "error"
+    else:
+        st.success("No CUSUM signals: no sustained shift detected.")
+        report_interp.append("No CUSUM signals: no sustained shift detected.")
+        badge_text = "CUSUM: no signals"
+        badge_level = "success"
+
+    keep = np.union1d(minmax_decimate(dd["C_plus"].to_numpy()), minmax_decimate(dd["C_minus"].to_numpy()))
+    if len(keep) < len(dd):
+        st.caption(f"Plot shows {len(keep):,} of {len(dd):,} points (min/max per bucket).")
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(y=d["np"], mode="lines+markers", name="np"))
-    fig.add_trace(go.Scatter(y=d["UCL"], mode="lines", name="UCL"))
-    fig.add_trace(go.Scatter(y=d["LCL"], mode="lines", name="LCL"))
-    fig.update_layout(title="np-chart", xaxis_title="Order", yaxis_title="Number defective")
+    fig.add_trace(go.Scatter(x=keep, y=dd["C_plus"].to_numpy()[keep], mode="lines", name="C+"))
+    fig.add_trace(go.Scatter(x=keep, y=-dd["C_minus"].to_numpy()[keep], mode="lines", name="−C−"))
+    fig.add_hline(y=H, line_dash="dot", annotation_text="H")
+    fig.add_hline(y=-H, line_dash="dot", annotation_text="−H")
+    fig.add_hline(y=0, line_dash="dash")
+    fig.update_layout(title="Tabular CUSUM", xaxis_title="Order", yaxis_title="Cumulative sum")
     st.plotly_chart(fig, use_container_width=True)
 
-    report_figs.append(("np-chart", fig))
+    report_figs.append(("CUSUM Chart", fig))
 
-# ========================= c-chart =========================
-elif chart_type == "c-chart":
-    count_cols = count_like_columns(df)
-    if not count_cols:
-        st.warning("No count-like columns found for c-chart.")
+# ========================= Hotelling T² =========================
+elif chart_type == "Hotelling T² (Multivariate)":
+    num_cols = numeric_like_columns(df)
+    if len(num_cols) < 2:
+        st.warning("Need at least two numeric-like columns for a multivariate chart.")
         st.stop()
 
-    c_col = st.selectbox("Defects column (count)", count_cols, key="cc_c_col")
-    c = pd.to_numeric(df[c_col], errors="coerce").dropna().reset_index(drop=True)
-    if c.empty:
-        st.warning("No valid rows after cleaning.")
+    t2_cols = st.multiselect("Process variables", num_cols, key="cc_t2_cols")
+    m1, m2, m3 = st.columns(3)
+    with m1:
+        t2_mode = st.radio(
+            "Limits from",
+            ["All rows (Phase I)", "First N rows (Phase II)"],
+            key="cc_t2_mode",
+        )
+    with m2:
+        t2_base = st.number_input(
+            "Baseline rows N", min_value=3, value=100, step=10, key="cc_t2_base",
+            disabled=t2_mode.startswith("All"),
+        )
+    with m3:
+        t2_alpha = st.select_slider("False-alarm rate α", [0.001, 0.0027, 0.005, 0.01, 0.05], value=0.0027, key="cc_t2_alpha")
+
+    if len(t2_cols) < 2:
+        st.info("Pick two or more correlated process variables.")
         st.stop()
 
-    cbar = float(c.mean())
-    ucl = cbar + 3 * (cbar**0.5)
-    lcl = max(cbar - 3 * (cbar**0.5), 0.0)
+    try:
+        ch, Xm = t2_chart(df, t2_cols, baseline=None if t2_mode.startswith("All") else int(t2_base), alpha=t2_alpha)
+    except ValueError as e:
+        st.warning(str(e))
+        st.stop()
 
+    sig = np.flatnonzero(ch.signal)
     report_inputs += [
-        "<b>Chart:</b> c-chart",
-        f"<b>Defects:</b> {c_col}",
+        "<b>Chart:</b> Hotelling T²",
+        f"<b>Variables ({len(t2_cols)}):</b> {', '.join(t2_cols)}",
+        f"<b>Limits:</b> Phase {ch.phase}, baseline {ch.baseline} rows, α = {t2_alpha:g}",
     ]
-    badge_text = "c-chart generated (interpret stability visually)"
-    badge_level = "warn"
+    if ch.phase == "I":
+        ucl_text = f"UCL = {ch.ucl:.2f}"
+    else:
+        ucl_text = f"UCL = {ch.baseline_ucl:.2f} baseline, {ch.ucl:.2f} monitoring"
+    if len(sig):
+        st.error(f"{len(sig)} multivariate signal(s) above the UCL ({ucl_text}).")
+        report_interp.append(f"{len(sig)} of {len(ch.t2)} rows exceed the T² UCL ({ucl_text}).")
+        badge_text = f"T²: {len(sig)} signal(s)"
+        badge_level = "error"
+    else:
+        st.success(f"No multivariate signals ({ucl_text}).")
+        report_interp.append(f"No rows exceed the T² UCL ({ucl_text}).")
+        badge_text = "T²: no signals"
+        badge_level = "success"
 
+    keep = np.union1d(minmax_decimate(ch.t2), sig[:2000])
+    if len(keep) < len(ch.t2):
+        st.caption(f"Plot shows {len(keep):,} of {len(ch.t2):,} points (min/max per bucket plus signals).")
     fig = go.Figure()
-    fig.add_trace(go.Scatter(y=c, mode="lines+markers", name="c"))
-    fig.add_hline(y=cbar, line_dash="dash", annotation_text="CL")
-    fig.add_hline(y=ucl, line_dash="dot", annotation_text="UCL")
-    fig.add_hline(y=lcl, line_dash="dot", annotation_text="LCL")
-    fig.update_layout(title="c-chart", xaxis_title="Order", yaxis_title="Defect count")
+    fig.add_trace(go.Scatter(x=keep, y=ch.t2[keep], mode="lines", name="T²"))
+    if len(sig):
+        shown = sig[:2000]
+        fig.add_trace(go.Scatter(x=shown, y=ch.t2[shown], mode="markers", name="Signals", marker=dict(size=8)))
+    if ch.phase == "I":
+        fig.add_hline(y=ch.ucl, line_dash="dot", annotation_text="UCL")
+    else:
+        # Phase I limit over the baseline, Phase II limit over the monitored rows
+        edge, last = ch.baseline - 0.5, len(ch.t2) - 1
+        fig.add_trace(
+            go.Scatter(
+                x=[0, edge, edge, last],
+                y=[ch.baseline_ucl, ch.baseline_ucl, ch.ucl, ch.ucl],
+                mode="lines",
+                name="UCL",
+                line=dict(dash="dot"),
+            )
+        )
+        fig.add_vline(x=ch.baseline - 0.5, line_dash="dash", annotation_text="baseline | monitoring")
+    fig.update_layout(title="Hotelling T² Chart", xaxis_title="Order (complete rows)", yaxis_title="T²")
     st.plotly_chart(fig, use_container_width=True)
+    report_figs.append(("Hotelling T² Chart", fig))
+
+    if len(sig):
+        st.subheader("Signal decomposition")
+        st.caption("Contribution = drop in T² when the variable is left out. Large values point at the variables driving the signal.")
+        top = sig[np.argsort(ch.t2[sig])[::-1][:500]]
+        contrib = ch.contributions(Xm[top])
+        contrib.index = top
+
+        pick = st.selectbox(
+            "Signal (highest T² first)",
+            top.tolist(),
+            format_func=lambda i: f"order {i} • row {ch.rows[i]} • T² = {ch.t2[i]:.1f}",
+            key="cc_t2_pick",
+        )
+        one = contrib.loc[pick].sort_values(ascending=False)
+        figc = go.Figure(go.Bar(x=one.index, y=one.values))
+        figc.update_layout(title=f"Contributions at order {pick}", xaxis_title="Variable", yaxis_title="Contribution to T²")
+        st.plotly_chart(figc, use_container_width=True)
+
+        lead = contrib.idxmax(axis=1)
+        summary = (
+            lead.value_counts()
+            .rename_axis("variable")
+            .reset_index(name="signals led")
+        )
+        summary["mean contribution"] = summary["variable"].map(contrib.mean())
+        st.dataframe(summary, use_container_width=True, hide_index=True)
 
-    report_figs.append(("c-chart", fig))
+        sig_table = pd.DataFrame({"order": top, "row": ch.rows[top], "T2": ch.t2[top], "top variable": lead.to_numpy()})
+        report_figs.append((f"T² contributions at order {pick}", figc))
+        report_tables += [("T² signals by leading variable", summary), ("Top T² signals", sig_table.head(50))]
 
-# ========================= u-chart =========================
-elif chart_type == "u-chart":
+# ========================= Attribute charts =========================
+elif chart_type in ("p-chart (Attribute)", "np-chart", "c-chart", "u-chart"):
+    kind = {"p-chart (Attribute)": "p", "np-chart": "np", "c-chart": "c", "u-chart": "u"}[chart_type]
     count_cols = count_like_columns(df)
     n_cols = positive_numeric_like_columns(df)
 
     if not count_cols:
-        st.warning("No count-like columns found for defects.")
+        st.warning("No count-like columns found for " + ("defectives." if kind in ("p", "np") else "defects."))
         st.stop()
-    if not n_cols:
-        st.warning("No positive numeric-like columns found for units/area (n).")
+    if kind != "c" and not n_cols:
+        st.warning("No positive numeric-like columns found for " + ("sample size n." if kind in ("p", "np") else "units/area (n)."))
         st.stop()
 
-    c_col = st.selectbox("Defects column (count)", count_cols, key="cc_u_c")
-    n_col = st.selectbox("Units/area column (n)", n_cols, key="cc_u_n")
+    count_label = "Defectives column (count)" if kind in ("p", "np") else "Defects column (count)"
+    count_col = st.selectbox(count_label, count_cols, key={"p": "cc_p_def", "np": "cc_np_def", "c": "cc_c_col", "u": "cc_u_c"}[kind])
+    require_numeric(df, count_col)
+    n_col = None
+    if kind != "c":
+        n_label = "Sample size column (n)" if kind in ("p", "np") else "Units/area column (n)"
+        n_col = st.selectbox(n_label, n_cols, key={"p": "cc_p_n", "np": "cc_np_n", "u": "cc_u_n"}[kind])
+    laney = False
+    if kind in ("p", "u"):
+        laney = st.checkbox(
+            f"Laney {kind}′ (widen limits for between-sample variation)",
+            key=f"cc_{kind}_laney",
+            help="For large samples the classical limits get very tight; Laney scales them by σz, the spread of the z-scores.",
+        )
 
-    d = df[[c_col, n_col]].copy()
-    d[c_col] = pd.to_numeric(d[c_col], errors="coerce")
-    d[n_col] = pd.to_numeric(d[n_col], errors="coerce")
-    d = d.dropna()
-    d = d[(d[n_col] > 0) & (d[c_col] >= 0)]
-    if d.empty:
+    counts = pd.to_numeric(df[count_col], errors="coerce").to_numpy(dtype=float)
+    sizes = pd.to_numeric(df[n_col], errors="coerce").to_numpy(dtype=float) if n_col else None
+    try:
+        ch = attribute_chart(kind, counts, sizes, laney=laney)
+    except ValueError:
         st.warning("No valid rows after cleaning.")
         st.stop()
 
-    u = d[c_col] / d[n_col]
-    ubar = float(d[c_col].sum() / d[n_col].sum())
-    se = (ubar / d[n_col]) ** 0.5
-    d["u"] = u
-    d["UCL"] = ubar + 3 * se
-    d["LCL"] = (ubar - 3 * se).clip(lower=0.0)
-
-    report_inputs += [
-        "<b>Chart:</b> u-chart",
-        f"<b>Defects:</b> {c_col}",
-        f"<b>Units/area:</b> {n_col}",
-    ]
-    badge_text = "u-chart generated (interpret stability visually)"
-    badge_level = "warn"
+    if kind in ("p", "u") and not laney:
+        sz = attribute_chart(kind, counts, sizes, laney=True).sigma_z
+        if sz > 1.5:
+            st.info(f"σz = {sz:.2f}: samples vary {sz:.1f}× more than the {kind}-chart assumes. Consider the Laney {kind}′ chart.")
+    if laney:
+        st.caption(f"σz = {ch.sigma_z:.3f} (1.0 = no extra between-sample variation)")
+
+    n_signal = int(ch.signal.sum())
+    report_inputs += [f"<b>Chart:</b> {ch.label}", f"<b>{'Defectives' if kind in ('p', 'np') else 'Defects'}:</b> {count_col}"]
+    if n_col:
+        report_inputs.append(f"<b>{'n' if kind in ('p', 'np') else 'Units/area'}:</b> {n_col}")
+    if laney:
+        report_inputs.append(f"<b>σz:</b> {ch.sigma_z:.3f}")
+    if n_signal:
+        badge_text = f"{ch.label}: {n_signal} point(s) beyond limits"
+        badge_level = "error"
+    else:
+        badge_text = f"{ch.label}: all points within limits"
+        badge_level = "success"
+    report_interp.append(badge_text)
 
+    ytitle = {"p": "Fraction defective", "np": "Number defective", "c": "Defect count", "u": "Defects per unit"}[kind]
     fig = go.Figure()
-    fig.add_trace(go.Scatter(y=d["u"], mode="lines+markers", name="u"))
-    fig.add_trace(go.Scatter(y=d["UCL"], mode="lines", name="UCL"))
-    fig.add_trace(go.Scatter(y=d["LCL"], mode="lines", name="LCL"))
-    fig.add_hline(y=ubar, line_dash="dash", annotation_text="CL")
-    fig.update_layout(title="u-chart", xaxis_title="Order", yaxis_title="Defects per unit")
+    fig.add_trace(go.Scatter(y=ch.stat, mode="lines+markers", name=kind))
+    if n_signal:
+        idx = np.flatnonzero(ch.signal)
+        fig.add_trace(go.Scatter(x=idx, y=ch.stat[idx], mode="markers", name="Beyond limits", marker=dict(size=10)))
+    if kind == "c":
+        fig.add_hline(y=ch.bar, line_dash="dash", annotation_text="CL")
+        fig.add_hline(y=float(ch.ucl[0]), line_dash="dot", annotation_text="UCL")
+        fig.add_hline(y=float(ch.lcl[0]), line_dash="dot", annotation_text="LCL")
+    else:
+        fig.add_trace(go.Scatter(y=ch.ucl, mode="lines", name="UCL"))
+        fig.add_trace(go.Scatter(y=ch.lcl, mode="lines", name="LCL"))
+        if kind == "np":
+            fig.add_trace(go.Scatter(y=ch.center, mode="lines", name="CL", line=dict(dash="dash")))
+        else:
+            fig.add_hline(y=ch.bar, line_dash="dash", annotation_text="CL")
+    fig.update_layout(title=ch.label, xaxis_title="Order", yaxis_title=ytitle)
     st.plotly_chart(fig, use_container_width=True)
 
-    report_figs.append(("u-chart", fig))
+    report_figs.append((ch.label, fig))
 
 # ---- Export report + Add to builder ----
 st.divider()
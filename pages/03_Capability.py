@@ -6,12 +6,18 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 
-from processiq.ui import set_page, df_preview, warn_empty, kpi_row
-from processiq.data import coerce_numeric
+from processiq.ui import set_page, df_preview, warn_empty, kpi_row, require_numeric
+from processiq.data import coerce_numeric, array_fingerprint
+from processiq.charts import histogram_from_sorted, normal_pdf_curve, minmax_decimate
 from processiq.shared import get_working_df
-from processiq.columns import numeric_like_columns
+from processiq.columns import numeric_like_columns, datetime_columns
+from processiq.capability_trend import BUCKETS, rolling_moments, with_indices, bucketed_capability
 from processiq.reporting import Report
 from processiq.report_builder import ReportSection, add_section
+from processiq.whatif import SpecIndex, build_spec_index, evaluate, sweep
+from processiq.capability_ci import analytic_ci, bootstrap_ci
+from processiq.nonnormal import fit_distributions, fits_table, percentile_capability
+from processiq.sketch import QuantileSketch, quantile_summary, percentile_capability as sketch_capability
 
 
 def _parse_optional_float(s: str | None) -> float | None:
@@ -26,44 +32,38 @@ def _parse_optional_float(s: str | None) -> float | None:
         return None
 
 
-def _mr_within_sigma(x: np.ndarray) -> float | None:
-    if x.size < 2:
-        return None
-    mr = np.abs(np.diff(x))
-    if mr.size == 0:
-        return None
-    mrbar = float(np.mean(mr))
-    if not np.isfinite(mrbar) or mrbar <= 0:
-        return None
-    return mrbar / 1.128
-
-
-def _capability(mean: float, s: float, lsl: float | None, usl: float | None):
-    if s is None or not np.isfinite(s) or s <= 0:
-        return None, None
-    cp = None
-    cpk = None
-    if lsl is not None and usl is not None:
-        cp = (usl - lsl) / (6 * s)
-    if usl is not None:
-        cpu = (usl - mean) / (3 * s)
-        cpk = cpu if cpk is None else min(cpk, cpu)
-    if lsl is not None:
-        cpl = (mean - lsl) / (3 * s)
-        cpk = cpl if cpk is None else min(cpk, cpl)
-    return cp, cpk
-
-
-def _ppm_expected_normal(mean: float, s: float, lsl: float | None, usl: float | None) -> float | None:
-    if s is None or not np.isfinite(s) or s <= 0:
-        return None
-    try:
-        from scipy.stats import norm  # type: ignore
-        p_low = norm.cdf(lsl, loc=mean, scale=s) if lsl is not None else 0.0
-        p_high = 1 - norm.cdf(usl, loc=mean, scale=s) if usl is not None else 0.0
-        return (p_low + p_high) * 1_000_000
-    except Exception:
-        return None
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _spec_index(fingerprint: str, _x: np.ndarray) -> SpecIndex:
+    # Sorted once per column; LSL/USL edits reuse it
+    return build_spec_index(_x)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _hist_layers(fingerprint: str, nbins: int, _idx: SpecIndex) -> dict:
+    # Bar heights + overlay curves only; raw observations never reach the figure
+    lo, hi = float(_idx.sorted_x[0]), float(_idx.sorted_x[-1])
+    return {
+        "bins": histogram_from_sorted(_idx.sorted_x, nbins),
+        "overall": normal_pdf_curve(lo, hi, _idx.mean, _idx.stdev_overall),
+        "within": normal_pdf_curve(lo, hi, _idx.mean, _idx.stdev_within),
+    }
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _sketch(fingerprint: str, compression: int, _x: np.ndarray) -> QuantileSketch:
+    return QuantileSketch.from_array(_x, compression)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _bootstrap(fingerprint: str, lsl, usl, conf: float, sides: str, _x: np.ndarray):
+    # Seeded + time-boxed so reruns are reproducible and never stall the page
+    return bootstrap_ci(_x, lsl, usl, conf=conf, sides=sides, resamples=2000, seed=0, time_budget_s=1.0)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _rolling_moments(fingerprint: str, window: int, _x: np.ndarray):
+    # Spec edits only recompute the indices from these
+    return rolling_moments(_x, window)
 
 
 set_page("Process Capability", icon="🎯")
@@ -86,6 +86,7 @@ if not num_cols:
     st.stop()
 
 col = st.selectbox("Measurement column", num_cols, key="cap_col")
+require_numeric(df, col)
 
 x_series = coerce_numeric(df[col]).dropna()
 x = x_series.to_numpy()
@@ -101,30 +102,58 @@ with c2:
 with c3:
     tgt_in = st.text_input("Target / Nominal (optional)", value="", key="cap_tgt")
 
+SKETCH_CHOICE = "Empirical percentiles (quantile sketch)"
+fits = fit_distributions(x)
+dist_choice = st.selectbox(
+    "Distribution",
+    ["Normal", "Best fit (Anderson-Darling)"] + [f.label for f in fits if f.key != "normal"] + [SKETCH_CHOICE],
+    key="cap_dist",
+    help="Non-normal options use the percentile method (P0.135 / P50 / P99.865 of the fitted distribution, "
+    "or of the data itself for the quantile sketch).",
+)
+sketch_compression = None
+if dist_choice == SKETCH_CHOICE:
+    sketch_compression = st.select_slider(
+        "Sketch compression (accuracy vs memory)",
+        options=[100, 200, 500, 1000, 2000],
+        value=500,
+        key="cap_sketch_compression",
+    )
+
 lsl = _parse_optional_float(lsl_in)
 usl = _parse_optional_float(usl_in)
 target = _parse_optional_float(tgt_in)
 if target is None and (lsl is not None and usl is not None):
     target = (lsl + usl) / 2.0
 
-mean = float(np.mean(x))
-stdev_overall = float(np.std(x, ddof=1)) if x.size > 1 else float("nan")
-stdev_within = _mr_within_sigma(x)
-
-pp, ppk = _capability(mean, stdev_overall, lsl, usl)
-cp, cpk = (None, None)
-if stdev_within is not None:
-    cp, cpk = _capability(mean, stdev_within, lsl, usl)
-
-oos = 0
-if lsl is not None:
-    oos += int(np.sum(x < lsl))
-if usl is not None:
-    oos += int(np.sum(x > usl))
-obs_ppm = (oos / x.size) * 1_000_000
-exp_ppm = _ppm_expected_normal(mean, stdev_overall, lsl, usl)
+x_fp = array_fingerprint(x)
+idx = _spec_index(x_fp, x)
+mean = idx.mean
+stdev_overall = idx.stdev_overall if idx.stdev_overall is not None else float("nan")
+stdev_within = idx.stdev_within
+
+res = evaluate(idx, lsl, usl)
+cp, cpk, pp, ppk = res.cp, res.cpk, res.pp, res.ppk
+oos = res.oos
+obs_ppm = res.obs_ppm
+exp_ppm = res.exp_ppm
+
+fit = None
+if dist_choice == "Best fit (Anderson-Darling)" and fits:
+    fit = fits[0]
+elif dist_choice != "Normal":
+    fit = next((f for f in fits if f.label == dist_choice), None)
+if fit is not None and fit.key == "normal":
+    fit = None  # best fit is normal: the classic indices already apply
+pcap = percentile_capability(fit, lsl, usl) if fit is not None else None
+sk = None
+if sketch_compression is not None:
+    sk = _sketch(x_fp, int(sketch_compression), x)
+    pcap = sketch_capability(sk, lsl, usl)
 
 score = ppk if ppk is not None else cpk
+if pcap is not None:
+    score = pcap.ppk
 label = "—"
 level = "success"
 if score is not None and np.isfinite(score):
@@ -164,6 +193,60 @@ kpi_row(
         ("Expected PPM (normal)", f"{exp_ppm:,.0f}" if exp_ppm is not None else "—"),
     ]
 )
+nn_kpis: list[tuple[str, str]] = []
+if pcap is not None:
+    nn_kpis = [
+        ("Distribution", pcap.distribution),
+        ("Pp (percentile)", f"{pcap.pp:.3f}" if pcap.pp is not None else "—"),
+        ("Ppk (percentile)", f"{pcap.ppk:.3f}" if pcap.ppk is not None else "—"),
+        ("Expected PPM (fit)" if sk is None else "Est. PPM (sketch)", f"{pcap.exp_ppm:,.0f}" if pcap.exp_ppm is not None else "—"),
+    ]
+    kpi_row(nn_kpis)
+    st.caption("Decision uses the percentile Ppk of the selected distribution.")
+    if sk is not None:
+        st.caption(
+            f"Sketch: {sk.centroids} centroids for {sk.n:,} points; P0.135 / P99.865 rank error "
+            f"≤ {100 * sk.rank_error(0.00135):.3f} % and median ≤ {100 * sk.rank_error(0.5):.2f} % of N."
+        )
+
+fit_df = fits_table(fits)
+with st.expander("Distribution fits (lower AD = better)"):
+    st.dataframe(fit_df, use_container_width=True)
+pct_title, pct_df = "Distribution fits", fit_df
+if sk is not None:
+    pct_title, pct_df = "Empirical percentiles (quantile sketch)", quantile_summary(sk)
+    with st.expander(pct_title):
+        st.dataframe(pct_df, use_container_width=True, hide_index=True)
+
+# ---- Confidence intervals ----
+st.subheader("Confidence intervals")
+i1, i2, i3 = st.columns(3)
+with i1:
+    ci_method = st.radio("Method", ["Analytic", "Bootstrap"], horizontal=True, key="cap_ci_method")
+with i2:
+    ci_conf = st.selectbox("Confidence", [0.90, 0.95, 0.99], index=1, key="cap_ci_conf")
+with i3:
+    ci_sides = st.radio("Interval", ["Lower bound", "Two-sided"], horizontal=True, key="cap_ci_sides")
+sides = "lower" if ci_sides == "Lower bound" else "two-sided"
+
+if ci_method == "Bootstrap":
+    ci = _bootstrap(x_fp, lsl, usl, ci_conf, sides, x)
+    st.caption(f"Moving-block bootstrap, {ci.resamples:,} resamples (seed 0).")
+else:
+    ci = analytic_ci(x, lsl, usl, conf=ci_conf, sides=sides)
+    st.caption("Chi-square (Cp/Pp) and Bissell (Cpk/Ppk) normal-theory bounds.")
+
+ci_df = ci.to_frame()
+st.dataframe(ci_df, use_container_width=True)
+
+conf_pct = f"{ci_conf:.0%}"
+cpk_lo = ci.lower["Cpk"]
+ppk_lo = ci.lower["Ppk"]
+ci_kpis = [
+    (f"Cpk lower ({conf_pct})", f"{cpk_lo:.3f}" if np.isfinite(cpk_lo) else "—"),
+    (f"Ppk lower ({conf_pct})", f"{ppk_lo:.3f}" if np.isfinite(ppk_lo) else "—"),
+]
+kpi_row(ci_kpis)
 
 # ---- Interpretation ----
 st.subheader("Interpretation")
@@ -180,10 +263,24 @@ st.caption("Reminder: If the process is not stable, capability numbers can be mi
 st.subheader("Histogram with normal curves")
 nbins = st.slider("Bins", min_value=10, max_value=80, value=30, step=1, key="cap_bins")
 
-fig = px.histogram(x, nbins=nbins, histnorm="probability density")
-# Keep bins visible in reports too (your report theming also enforces this)
-fig.update_traces(selector=dict(type="histogram"), opacity=0.55, marker_line_width=0)
-fig.update_layout(xaxis_title=col, yaxis_title="Density")
+layers = _hist_layers(x_fp, nbins, idx)
+bins = layers["bins"]
+
+fig = go.Figure()
+fig.add_trace(
+    go.Bar(
+        x=bins.centers,
+        y=bins.density,
+        width=bins.widths,
+        customdata=bins.counts,
+        hovertemplate="%{x:.5g}<br>count=%{customdata}<br>density=%{y:.4g}<extra></extra>",
+        name="Histogram",
+        marker_color=px.colors.qualitative.Plotly[0],
+        opacity=0.55,
+        marker_line_width=0,
+    )
+)
+fig.update_layout(xaxis_title=col, yaxis_title="Density", bargap=0)
 
 if lsl is not None:
     fig.add_vline(x=lsl, line_dash="dot", annotation_text="LSL", annotation_position="top")
@@ -194,19 +291,122 @@ fig.add_vline(x=mean, line_dash="dash", annotation_text="Mean", annotation_posit
 if target is not None:
     fig.add_vline(x=target, line_dash="solid", annotation_text="Target", annotation_position="top")
 
-xx = np.linspace(float(np.min(x)), float(np.max(x)), 300)
-try:
-    from scipy.stats import norm  # type: ignore
-    yy_overall = norm.pdf(xx, loc=mean, scale=stdev_overall)
-    fig.add_trace(go.Scatter(x=xx, y=yy_overall, mode="lines", name="Overall normal"))
-    if stdev_within is not None and stdev_within > 0:
-        yy_within = norm.pdf(xx, loc=mean, scale=stdev_within)
-        fig.add_trace(go.Scatter(x=xx, y=yy_within, mode="lines", name="Within normal", line=dict(dash="dash")))
-except Exception:
-    st.info("Normal curve overlay requires scipy. (Histogram + indices still valid.)")
+if layers["overall"] is not None:
+    xx, yy = layers["overall"]
+    fig.add_trace(go.Scatter(x=xx, y=yy, mode="lines", name="Overall normal"))
+if layers["within"] is not None:
+    xx, yy = layers["within"]
+    fig.add_trace(go.Scatter(x=xx, y=yy, mode="lines", name="Within normal", line=dict(dash="dash")))
+if fit is not None:
+    xx = np.linspace(float(idx.sorted_x[0]), float(idx.sorted_x[-1]), 300)
+    fig.add_trace(go.Scatter(x=xx, y=fit.frozen().pdf(xx), mode="lines", name=f"{fit.label} fit"))
 
 st.plotly_chart(fig, use_container_width=True)
 
+# ---- What-if spec limits ----
+st.subheader("What-if: spec limits")
+st.caption("Sweep candidate limits against the current data (sorted once, so large columns stay interactive).")
+
+spread = stdev_overall if np.isfinite(stdev_overall) and stdev_overall > 0 else 1.0
+center = target if target is not None else mean
+w1, w2, w3 = st.columns(3)
+with w1:
+    vary = st.selectbox(
+        "Vary",
+        ["Tolerance (± around target)", "USL only", "LSL only"],
+        key="cap_whatif_vary",
+    )
+with w2:
+    k_range = st.slider("Range (× overall stdev)", 0.5, 8.0, (1.0, 6.0), step=0.5, key="cap_whatif_range")
+with w3:
+    n_points = st.slider("Grid points", 20, 500, 200, step=20, key="cap_whatif_points")
+
+k = np.linspace(k_range[0], k_range[1], n_points)
+if vary == "USL only":
+    grid = sweep(idx, lsl, center + k * spread)
+    x_axis = "USL"
+elif vary == "LSL only":
+    grid = sweep(idx, center - k * spread, usl)
+    x_axis = "LSL"
+else:
+    grid = sweep(idx, center - k * spread, center + k * spread)
+    grid["Tolerance"] = grid["USL"] - grid["LSL"]
+    x_axis = "Tolerance"
+
+fig_w = go.Figure()
+for name in ["Cpk", "Ppk"]:
+    fig_w.add_trace(go.Scatter(x=grid[x_axis], y=grid[name], mode="lines", name=name))
+fig_w.add_trace(
+    go.Scatter(x=grid[x_axis], y=grid["Expected PPM"], mode="lines", name="Expected PPM", yaxis="y2", line=dict(dash="dot"))
+)
+fig_w.add_trace(
+    go.Scatter(x=grid[x_axis], y=grid["Observed PPM"], mode="lines", name="Observed PPM", yaxis="y2", line=dict(dash="dash"))
+)
+fig_w.add_hline(y=1.33, line_dash="dash", annotation_text="1.33")
+fig_w.update_layout(
+    title="Capability vs candidate spec limits",
+    xaxis_title=x_axis,
+    yaxis_title="Index",
+    yaxis2=dict(title="PPM", overlaying="y", side="right", type="log"),
+)
+st.plotly_chart(fig_w, use_container_width=True)
+
+with st.expander("What-if table"):
+    st.dataframe(grid, use_container_width=True)
+
+# ---- Capability over time ----
+st.subheader("Capability over time")
+st.caption("Running sums make every window O(1), so the trend covers the full column.")
+
+time_cols = datetime_columns(df)
+t1, t2 = st.columns([1, 2])
+with t1:
+    trend_mode = st.radio(
+        "Trend",
+        ["Rolling window", "Time buckets"] if time_cols else ["Rolling window"],
+        key="cap_trend_mode",
+    )
+with t2:
+    if trend_mode == "Rolling window":
+        default_w = int(min(max(x.size // 10, 5), 500))
+        trend_window = st.number_input(
+            "Window (points)", min_value=5, max_value=max(int(x.size), 5), value=default_w, step=5, key="cap_trend_window"
+        )
+    else:
+        trend_time = st.selectbox("Time column", time_cols, key="cap_trend_time")
+        trend_bucket = st.selectbox("Bucket", list(BUCKETS), index=2, key="cap_trend_bucket")
+
+if trend_mode == "Rolling window":
+    trend = with_indices(_rolling_moments(x_fp, int(trend_window), x), lsl, usl)
+    trend_x, trend_x_title = trend["end"].to_numpy() if len(trend) else np.array([]), "Window end (order)"
+    trend_title = f"Rolling capability ({int(trend_window)}-point window)"
+else:
+    trend = bucketed_capability(coerce_numeric(df[col]), df[trend_time], BUCKETS[trend_bucket], lsl, usl)
+    trend_x, trend_x_title = trend["bucket"].to_numpy() if len(trend) else np.array([]), trend_time
+    trend_title = f"Capability per {trend_bucket.lower()}"
+
+fig_t = None
+if trend.empty or (lsl is None and usl is None):
+    st.info("Need spec limits and enough points per window / bucket for a capability trend.")
+else:
+    # Long trends are thinned for drawing; each index keeps its own min/max points
+    keep = np.unique(np.concatenate([minmax_decimate(trend[k].to_numpy()) for k in ("Cpk", "Ppk")]))
+    if len(keep) < len(trend):
+        st.caption(f"Plot shows {len(keep):,} of {len(trend):,} windows (min/max per bucket).")
+    fig_t = go.Figure()
+    for name in ["Cpk", "Ppk"]:
+        fig_t.add_trace(go.Scatter(x=trend_x[keep], y=trend[name].to_numpy()[keep], mode="lines", name=name))
+    fig_t.add_hline(y=1.33, line_dash="dash", annotation_text="1.33")
+    fig_t.update_layout(title=trend_title, xaxis_title=trend_x_title, yaxis_title="Index")
+    st.plotly_chart(fig_t, use_container_width=True)
+
+    worst = trend.loc[trend["Cpk"].idxmin()] if trend["Cpk"].notna().any() else None
+    if worst is not None:
+        at = f"order {int(worst['end'])}" if trend_mode == "Rolling window" else worst["bucket"]
+        st.caption(f"Lowest Cpk {worst['Cpk']:.3f} at {at}.")
+    with st.expander("Trend table"):
+        st.dataframe(trend, use_container_width=True)
+
 # ---- Report export ----
 st.divider()
 st.subheader("Export / Add to Report Builder")
@@ -229,6 +429,8 @@ kpis = [
     ("Ppk", f"{ppk:.3f}" if ppk is not None else "—"),
     ("Observed PPM", f"{obs_ppm:,.0f}"),
     ("Expected PPM", f"{exp_ppm:,.0f}" if exp_ppm is not None else "—"),
+    *ci_kpis,
+    *nn_kpis,
     ("Decision", label),
 ]
 
@@ -241,6 +443,11 @@ rep.add_card("Inputs", inputs_html)
 rep.add_kpis("Key results", kpis)
 rep.add_card("Interpretation", "<br/>".join(interp_lines))
 rep.add_figure("Histogram + curves", fig)
+rep.add_table(f"Confidence intervals ({ci.method}, {conf_pct})", ci_df)
+if fig_t is not None:
+    rep.add_figure(trend_title, fig_t)
+if pcap is not None:
+    rep.add_table(pct_title, pct_df)
 
 colA, colB = st.columns(2)
 
@@ -267,8 +474,9 @@ with colB:
                 kpis=kpis,
                 badge_text=f"Decision: {label}",
                 badge_level=level,
-                figures=[("Histogram + curves", fig)],
-                tables=[],
+                figures=[("Histogram + curves", fig)] + ([(trend_title, fig_t)] if fig_t is not None else []),
+                tables=[(f"Confidence intervals ({ci.method}, {conf_pct})", ci_df)]
+                + ([(pct_title, pct_df)] if pcap is not None else []),
             )
         )
         st.success("Added Capability section to Report Builder.")
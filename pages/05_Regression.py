@@ -5,7 +5,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-from processiq.ui import set_page, df_preview, kpi_row, warn_empty
+from processiq.ui import set_page, df_preview, kpi_row, warn_empty, require_numeric
 from processiq.data import coerce_numeric
 from processiq.models import ols
 from processiq.shared import get_working_df
@@ -33,6 +33,7 @@ if len(numeric_cols) < 2:
     st.stop()
 
 y_col = st.selectbox("Response (Y)", numeric_cols, index=0, key="reg_y")
+require_numeric(df, y_col)
 x_pool = [c for c in numeric_cols if c != y_col]
 
 x_cols = st.multiselect(
@@ -4,8 +4,10 @@ from __future__ import annotations
 import streamlit as st
 import pandas as pd
 
-from processiq.ui import set_page, df_preview, kpi_row, warn_empty
-from processiq.msa import gage_rr_crossed_anova
+from processiq.ui import set_page, df_preview, kpi_row, warn_empty, require_numeric
+from processiq.msa import gage_rr_crossed_anova, gage_rr_batch
+from processiq.reporting import Report
+from processiq.report_builder import ReportSection, add_section
 from processiq.shared import get_working_df
 from processiq.columns import categorical_columns, numeric_like_columns
 
@@ -38,6 +40,7 @@ if not num_cols:
 part_col = st.selectbox("Part column", cat_cols, key="grr_part")
 op_col = st.selectbox("Operator column", [c for c in cat_cols if c != part_col] or cat_cols, key="grr_op")
 y_col = st.selectbox("Measurement column", num_cols, key="grr_y")
+require_numeric(df, y_col)
 
 st.caption("Data requirement: each Part×Operator cell should have repeated measurements (≥2 recommended).")
 
@@ -81,4 +84,75 @@ out = pd.DataFrame(
 )
 st.dataframe(out, use_container_width=True)
 
-st.caption("Tip: We can add %Study Var and ndc (number of distinct categories) next.")
+# ---- Batch: every measurement column over the same Part × Operator design ----
+st.divider()
+st.subheader("Batch: many measurement columns")
+st.caption(
+    "For studies that measure many features on the same parts (e.g. CMM programs): the Part×Operator cells are "
+    "indexed once and every balanced column is analysed in one vectorized pass. Ranked by %GRR, worst first."
+)
+
+batch_default = [c for c in num_cols if c not in (part_col, op_col)]
+batch_cols = st.multiselect("Measurement columns", batch_default, default=batch_default, key="grr_batch_cols")
+if batch_cols and st.toggle("Run batch Gage R&R", key="grr_batch_run"):
+    batch = gage_rr_batch(df, part_col=part_col, op_col=op_col, y_cols=batch_cols)
+    ok = batch[batch["method"] != "failed"]
+    kpi_row(
+        [
+            ("Features", f"{len(batch)}"),
+            ("≤10% StudyVar", f"{int((ok['pct_studyvar_grr'] <= 10).sum())}"),
+            ("10–30%", f"{int(((ok['pct_studyvar_grr'] > 10) & (ok['pct_studyvar_grr'] <= 30)).sum())}"),
+            (">30%", f"{int((ok['pct_studyvar_grr'] > 30).sum())}"),
+            ("ndc < 5", f"{int((ok['ndc'] < 5).sum())}"),
+        ]
+    )
+    st.dataframe(
+        batch,
+        use_container_width=True,
+        hide_index=True,
+        column_config={c: st.column_config.NumberColumn(format="%.2f") for c in batch.columns if c.startswith("pct_")},
+    )
+    n_single = int((batch["method"] == "single (unbalanced)").sum())
+    n_failed = int((batch["method"] == "failed").sum())
+    if n_single or n_failed:
+        st.caption(
+            f"{n_single} unbalanced column(s) analysed one at a time; {n_failed} could not be analysed "
+            "(too few values or fewer than 2 repeats per cell)."
+        )
+    st.caption("%GRR is % contribution (variance); %StudyVar is the ratio of standard deviations; ndc = ⌊1.41·PV/GRR⌋.")
+
+    batch_inputs = (
+        f"<b>Part:</b> {part_col}<br/><b>Operator:</b> {op_col}<br/><b>Features:</b> {len(batch)}"
+    )
+    batch_interp = (
+        f"{int((ok['pct_studyvar_grr'] > 30).sum())} of {len(batch)} feature(s) exceed 30% StudyVar; "
+        f"{int((ok['ndc'] < 5).sum())} have ndc below 5."
+    )
+    batch_rep = Report(title="ProcessIQ Report — Gage R&R (Batch)", subtitle="Tool: Gage R&R", dataset_name=name or "(unknown)")
+    batch_rep.add_card("Inputs", batch_inputs)
+    batch_rep.add_card("Interpretation", batch_interp)
+    batch_rep.add_table("Features ranked by %GRR", batch)
+
+    colA, colB = st.columns(2)
+    with colA:
+        st.download_button(
+            "Download HTML report",
+            data=batch_rep.render_html().encode("utf-8"),
+            file_name=batch_rep.file_name("processiq_gage_rr_batch"),
+            mime="text/html",
+            use_container_width=True,
+            key="grr_batch_dl_html",
+        )
+    with colB:
+        if st.button("Add to Report Builder", use_container_width=True, key="grr_batch_add_rb"):
+            add_section(
+                ReportSection(
+                    tool="Gage R&R (Batch)",
+                    subtitle=f"{len(batch)} features",
+                    dataset_name=name or "(unknown)",
+                    inputs_html=batch_inputs,
+                    interpretation_html=batch_interp,
+                    tables=[("Features ranked by %GRR", batch)],
+                )
+            )
+            st.success("Added Gage R&R (Batch) section to Report Builder.")
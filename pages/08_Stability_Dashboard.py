@@ -0,0 +1,153 @@
+# pages/08_Stability_Dashboard.py
+from __future__ import annotations
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from processiq.ui import set_page, df_preview, warn_empty
+from processiq.shared import get_working_df
+from processiq.data import frame_fingerprint
+from processiq.columns import numeric_like_columns, categorical_columns
+from processiq.dashboard import stability_overview
+from processiq.reporting import Report
+from processiq.report_builder import ReportSection, add_section
+
+set_page("Stability Dashboard", icon="🚦")
+
+st.title("Stability Dashboard")
+st.caption("I-MR limits and Nelson R1–R4 counts for every measurement × split level, ranked worst first.")
+
+
+@st.cache_data(show_spinner="Scanning streams…", max_entries=8)
+def _overview(fingerprint: str, _df: pd.DataFrame, value_cols: tuple, split_cols: tuple, min_points: int) -> pd.DataFrame:
+    return stability_overview(_df, list(value_cols), list(split_cols), min_points=min_points)
+
+
+df, dataset_name = get_working_df(key_prefix="dashboard")
+if df is None:
+    warn_empty("Upload a dataset here OR load one in Data Explorer and use the shared dataset.")
+    st.stop()
+
+df_preview(df)
+st.divider()
+
+num_cols = numeric_like_columns(df)
+if not num_cols:
+    st.warning("No numeric-like columns detected.")
+    st.stop()
+
+c1, c2, c3 = st.columns([2, 2, 1])
+with c1:
+    value_cols = st.multiselect("Measurements", num_cols, default=num_cols, key="dash_values")
+with c2:
+    split_cols = st.multiselect(
+        "Split by (machine, cavity, lot, …)",
+        [c for c in categorical_columns(df) if c not in value_cols],
+        key="dash_split",
+    )
+with c3:
+    min_points = int(st.number_input("Min points / stream", min_value=3, value=10, step=1, key="dash_min_points"))
+
+if not value_cols:
+    st.info("Pick at least one measurement.")
+    st.stop()
+
+fingerprint = frame_fingerprint(df, value_cols + split_cols)
+table = _overview(fingerprint, df, tuple(value_cols), tuple(split_cols), min_points)
+
+if table.empty:
+    st.warning("No stream has enough points. Lower the minimum or change the split.")
+    st.stop()
+
+unstable = table[table["violations"] > 0]
+k1, k2, k3 = st.columns(3)
+k1.metric("Streams", f"{len(table):,}")
+k2.metric("Unstable streams", f"{len(unstable):,}")
+k3.metric("Total violations", f"{int(table['violations'].sum()):,}")
+
+st.subheader("Ranked streams")
+st.caption("Select a row, then open it in Control Charts for the full I-MR view.")
+event = st.dataframe(
+    table,
+    use_container_width=True,
+    hide_index=True,
+    on_select="rerun",
+    selection_mode="single-row",
+    key="dash_table",
+)
+
+rows = event.selection.rows if event is not None else []
+if rows:
+    picked = table.iloc[rows[0]]
+    label = " • ".join([str(picked["measurement"])] + [f"{c}={picked[c]}" for c in split_cols])
+    if st.button(f"Open I-MR chart: {label}", key="dash_drill", type="primary"):
+        st.session_state["cc_imr_col"] = str(picked["measurement"])
+        st.session_state["cc_imr_filter"] = {c: str(picked[c]) for c in split_cols}
+        st.switch_page("pages/02_Control_Charts.py")
+
+top = table.head(25).copy()
+top["stream"] = top[["measurement", *split_cols]].astype(str).agg(" • ".join, axis=1)
+fig = px.bar(
+    top.iloc[::-1],
+    x=["R1", "R2", "R3", "R4"],
+    y="stream",
+    orientation="h",
+    title="Top 25 streams by violations",
+)
+fig.update_layout(xaxis_title="Violations", yaxis_title="", legend_title="Rule", height=max(350, 22 * len(top)))
+st.plotly_chart(fig, use_container_width=True)
+
+# ---- Export report + Add to builder ----
+st.divider()
+st.subheader("Export / Add to Report Builder")
+
+inputs_html = "<br/>".join(
+    [
+        f"<b>Measurements:</b> {len(value_cols)}",
+        f"<b>Split by:</b> {', '.join(split_cols) if split_cols else '(none)'}",
+        f"<b>Min points / stream:</b> {min_points}",
+    ]
+)
+interp_html = f"{len(unstable)} of {len(table)} stream(s) show at least one R1–R4 violation."
+badge_text = f"Unstable streams: {len(unstable)}"
+badge_level = "error" if len(unstable) else "success"
+
+rep = Report(
+    title="ProcessIQ Report — Stability Dashboard",
+    subtitle="Tool: Stability Dashboard",
+    dataset_name=dataset_name or "(unknown)",
+)
+rep.add_card("Inputs", inputs_html)
+rep.add_card("Interpretation", interp_html)
+rep.add_badge("Status", badge_text, level=badge_level)
+rep.add_figure("Top streams by violations", fig)
+rep.add_table("Ranked streams", table)
+
+colA, colB = st.columns(2)
+with colA:
+    st.download_button(
+        "Download HTML report",
+        data=rep.render_html().encode("utf-8"),
+        file_name=rep.file_name("processiq_stability_dashboard_report"),
+        mime="text/html",
+        use_container_width=True,
+        key="dash_dl_html",
+    )
+with colB:
+    if st.button("Add to Report Builder", use_container_width=True, key="dash_add_rb"):
+        add_section(
+            ReportSection(
+                tool="Stability Dashboard",
+                subtitle=", ".join(split_cols) if split_cols else "All rows",
+                dataset_name=dataset_name or "(unknown)",
+                inputs_html=inputs_html,
+                interpretation_html=interp_html,
+                kpis=[],
+                badge_text=badge_text,
+                badge_level=badge_level,
+                figures=[("Top streams by violations", fig)],
+                tables=[("Ranked streams", table)],
+            )
+        )
+        st.success("Added Stability Dashboard section to Report Builder.")
@@ -0,0 +1,96 @@
+# pages/09_Session_Snapshots.py
+from __future__ import annotations
+
+import time
+
+import streamlit as st
+
+from processiq.ui import set_page, df_preview
+from processiq.state import set_df, get_df
+from processiq.report_builder import get_sections, set_sections
+from processiq.snapshot import (
+    HAVE_ARROW,
+    save_snapshot,
+    list_snapshots,
+    load_snapshot,
+    delete_snapshot,
+    snapshots_table,
+    snapshot_root,
+)
+
+set_page("Session Snapshots", icon="💾")
+
+st.title("Session Snapshots")
+st.caption("Save the shared dataset and every Report Builder section, then pick up where you left off.")
+
+df, source_name = get_df()
+sections = get_sections()
+
+# ---------------------------
+# Save
+# ---------------------------
+st.subheader("Save current session")
+c1, c2, c3 = st.columns([2, 1, 1])
+c1.metric("Shared dataset", source_name or "—", f"{len(df):,} rows" if df is not None else None, delta_color="off")
+c2.metric("Report sections", len(sections))
+with c3:
+    compression = st.selectbox(
+        "Compression",
+        ["lz4", "zstd", "none"],
+        index=0,
+        key="snap_compression",
+        help="lz4 restores fastest among compressed options; 'none' gives zero-copy memory-mapped restores but larger files.",
+        disabled=not HAVE_ARROW,
+    )
+if not HAVE_ARROW:
+    st.caption("pyarrow is not installed: datasets are stored as gzip pickles instead of memory-mapped Arrow files.")
+
+name = st.text_input("Snapshot name", value="", placeholder=time.strftime("Snapshot %Y-%m-%d %H:%M"), key="snap_name")
+if st.button("Save snapshot", type="primary", disabled=df is None and not sections, key="snap_save"):
+    with st.spinner("Writing snapshot…"):
+        t0 = time.perf_counter()
+        info = save_snapshot(name, df, source_name, sections, compression=None if compression == "none" else compression)
+    st.success(f"Saved '{info.name}' ({info.bytes / 1024:,.1f} KB) in {time.perf_counter() - t0:.2f} s.")
+
+st.divider()
+
+# ---------------------------
+# Restore / delete
+# ---------------------------
+st.subheader("Saved snapshots")
+st.caption(f"Stored in {snapshot_root()}")
+
+infos = list_snapshots()
+if not infos:
+    st.info("No snapshots yet.")
+    st.stop()
+
+st.dataframe(snapshots_table(infos), use_container_width=True, hide_index=True)
+
+labels = {i.id: f"{i.name} — {time.strftime('%Y-%m-%d %H:%M', time.localtime(i.created))}" for i in infos}
+chosen = st.selectbox("Snapshot", list(labels), format_func=labels.get, key="snap_pick")
+
+b1, b2, b3 = st.columns(3)
+with b1:
+    replace_sections = st.checkbox("Replace report sections", value=True, key="snap_replace_sections",
+                                   help="Unchecked: restored sections are appended to the current ones.")
+with b2:
+    if st.button("Restore", type="primary", use_container_width=True, key="snap_restore"):
+        t0 = time.perf_counter()
+        snap = load_snapshot(chosen)
+        if snap.df is not None:
+            set_df(snap.df, snap.info.source_name)
+        set_sections(snap.sections if replace_sections else sections + snap.sections)
+        st.session_state["snap_restored"] = (snap.info.name, time.perf_counter() - t0)
+        st.rerun()
+with b3:
+    if st.button("Delete", use_container_width=True, key="snap_delete"):
+        delete_snapshot(chosen)
+        st.rerun()
+
+if "snap_restored" in st.session_state:
+    restored, seconds = st.session_state.pop("snap_restored")
+    st.success(f"Restored '{restored}' in {seconds:.2f} s. The shared dataset and Report Builder are ready.")
+    df, _ = get_df()
+    if df is not None:
+        df_preview(df)
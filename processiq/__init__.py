@@ -1 +1 @@
-__all__ = ['data','spc','metrics','models','ui','msa','state']
+__all__ = ['data','spc','metrics','models','ui','msa','state','whatif','charts','capability_ci','nonnormal','live','dashboard','attribute','multivariate','capability_trend','summary','sketch','backend','snapshot','sources','loader','profiling','expressions','resample']
@@ -0,0 +1,149 @@
+# processiq/attribute.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from processiq import spc  # D2_MR; spc imports this module too, so only read it at call time
+
+KINDS = ("p", "np", "c", "u")
+
+
+@dataclass
+class AttributeChart:
+    kind: str  # "p" | "np" | "c" | "u"
+    laney: bool
+    stat: np.ndarray  # plotted value per sample
+    center: np.ndarray  # per-sample CL (only np varies with n)
+    lcl: np.ndarray
+    ucl: np.ndarray
+    bar: float  # pbar / cbar / ubar
+    sigma_z: float  # Laney between-sample factor (1.0 for the classical chart)
+
+    @property
+    def label(self) -> str:
+        return f"{self.kind}′-chart (Laney)" if self.laney else f"{self.kind}-chart"
+
+    @property
+    def signal(self) -> np.ndarray:
+        return (self.stat > self.ucl) | (self.stat < self.lcl)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {self.kind: self.stat, "CL": self.center, "LCL": self.lcl, "UCL": self.ucl, "signal": self.signal}
+        )
+
+
+def _as_2d(a) -> np.ndarray:
+    a = np.asarray(a, dtype=float)
+    return a[None, :] if a.ndim == 1 else a
+
+
+def _kernel(kind: str, counts: np.ndarray, n: np.ndarray, laney: bool):
+    """
+    Limits for every row of a (series x samples) array at once.
+    Invalid cells (NaN, n <= 0, negative counts) are NaN in every output.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown attribute chart: {kind}")
+    counts = _as_2d(counts)
+    n = np.broadcast_to(_as_2d(n), counts.shape)
+    valid = np.isfinite(counts) & np.isfinite(n) & (n > 0) & (counts >= 0)
+    c = np.where(valid, counts, np.nan)
+    nn = np.where(valid, n, np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bar = np.nansum(c, axis=1) / np.nansum(nn, axis=1)
+        b = bar[:, None]
+        if kind == "p":
+            stat, center, sd = c / nn, np.broadcast_to(b, c.shape), np.sqrt(b * (1 - b) / nn)
+        elif kind == "np":
+            stat, center, sd = c, b * nn, np.sqrt(nn * b * (1 - b))
+        elif kind == "u":
+            stat, center, sd = c / nn, np.broadcast_to(b, c.shape), np.sqrt(b / nn)
+        else:  # c: counts per equal-size sample, n ignored
+            stat, center, sd = c, np.broadcast_to(b, c.shape), np.broadcast_to(np.sqrt(b), c.shape)
+
+        sigma_z = np.ones(counts.shape[0])
+        if laney:
+            # Laney: scale the within-sample sigma by the between-sample spread
+            # of the z-scores, estimated from their average moving range.
+            z = (stat - center) / sd
+            mr = np.abs(np.diff(z, axis=1))
+            sigma_z = np.nanmean(mr, axis=1) / spc.D2_MR if mr.shape[1] else sigma_z
+            sigma_z = np.where(np.isfinite(sigma_z) & (sigma_z > 0), sigma_z, 1.0)
+
+        half = 3.0 * sd * sigma_z[:, None]
+        lcl = np.where(valid, np.maximum(center - half, 0.0), np.nan)
+        ucl = center + half
+        if kind == "p":
+            ucl = np.minimum(ucl, 1.0)
+        ucl = np.where(valid, ucl, np.nan)
+    return stat, np.where(valid, center, np.nan), lcl, ucl, bar, sigma_z
+
+
+def attribute_chart(kind: str, counts, n=None, laney: bool = False) -> AttributeChart:
+    """
+    One attribute chart over array inputs. `n` is the sample size (p, np) or
+    inspection units (u); c ignores it. Invalid samples are dropped.
+    """
+    counts = np.asarray(counts, dtype=float)
+    n = np.ones_like(counts) if n is None or kind == "c" else np.asarray(n, dtype=float)
+    keep = np.isfinite(counts) & np.isfinite(n) & (n > 0) & (counts >= 0)
+    if not keep.any():
+        raise ValueError("No valid rows.")
+    stat, center, lcl, ucl, bar, sigma_z = _kernel(kind, counts[keep], n[keep], laney)
+    return AttributeChart(kind, laney, stat[0], center[0], lcl[0], ucl[0], float(bar[0]), float(sigma_z[0]))
+
+
+def p_chart(defectives, n, laney: bool = False) -> AttributeChart:
+    return attribute_chart("p", defectives, n, laney)
+
+
+def np_chart(defectives, n) -> AttributeChart:
+    return attribute_chart("np", defectives, n)
+
+
+def c_chart(defects) -> AttributeChart:
+    return attribute_chart("c", defects)
+
+
+def u_chart(defects, units, laney: bool = False) -> AttributeChart:
+    return attribute_chart("u", defects, units, laney)
+
+
+def attribute_batch(kind: str, counts: dict[str, np.ndarray] | pd.DataFrame, n=None, laney: bool = False) -> pd.DataFrame:
+    """
+    Summary for many defect categories / lines in one vectorized pass.
+
+    counts maps a series name to its per-sample counts (equal length, NaN for
+    missing); n is shared (1-D) or per series (same shape). Returns one row per
+    series: centre value, Laney sigma_z, points beyond limits and their share.
+    """
+    frame = pd.DataFrame(counts)
+    names = list(frame.columns)
+    c2 = frame.to_numpy(dtype=float).T
+    if n is None or kind == "c":
+        n2 = np.ones_like(c2)
+    elif isinstance(n, pd.DataFrame):
+        n2 = n[names].to_numpy(dtype=float).T
+    else:
+        n2 = np.asarray(n, dtype=float)
+        n2 = n2.T if n2.ndim == 2 else n2
+    stat, _, lcl, ucl, bar, sigma_z = _kernel(kind, c2, n2, laney)
+
+    with np.errstate(invalid="ignore"):
+        beyond = ((stat > ucl) | (stat < lcl)).sum(axis=1)
+    samples = np.isfinite(stat).sum(axis=1)
+    return pd.DataFrame(
+        {
+            "series": names,
+            "samples": samples,
+            f"{kind}bar": bar,
+            "sigma_z": sigma_z,
+            "beyond_limits": beyond,
+            "beyond_rate": np.divide(beyond, samples, out=np.zeros(len(names)), where=samples > 0),
+        }
+    )
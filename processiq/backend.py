@@ -0,0 +1,294 @@
+# processiq/backend.py
+"""
+Compute kernels behind SPC, capability and grouped statistics.
+
+Each kernel has a NumPy reference implementation and, when Numba is
+installed, a compiled loop version. The active backend is chosen with
+set_backend() or the PROCESSIQ_BACKEND environment variable ("auto",
+"numpy", "numba"; default "auto" = Numba when available). A kernel
+without an implementation for the active backend falls back to NumPy.
+
+    python -m processiq.bench backend   # parity check + timings per kernel
+    python -m pytest tests              # parity asserted for every kernel / backend
+"""
+from __future__ import annotations
+
+import os
+from typing import Callable
+
+import numpy as np
+from scipy.signal import lfilter
+
+try:
+    import numba
+except ImportError:  # optional dependency
+    numba = None
+
+HAVE_NUMBA = numba is not None
+BACKENDS = ("numpy", "numba")
+
+# kernel name -> backend -> implementation
+_IMPLS: dict[str, dict[str, Callable]] = {}
+# kernel name -> rng, size -> positional args (used by parity() and the benchmark)
+SAMPLES: dict[str, Callable[[np.random.Generator, int], tuple]] = {}
+
+
+def _resolve(name: str) -> str:
+    name = (name or "auto").strip().lower()
+    if name == "auto":
+        return "numba" if HAVE_NUMBA else "numpy"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Choose from auto, {', '.join(BACKENDS)}.")
+    if name == "numba" and not HAVE_NUMBA:
+        return "numpy"
+    return name
+
+
+_active = _resolve(os.environ.get("PROCESSIQ_BACKEND", "auto"))
+
+
+def set_backend(name: str) -> str:
+    """Switch every kernel to `name` ("auto", "numpy", "numba"); returns the backend in effect."""
+    global _active
+    _active = _resolve(name)
+    return _active
+
+
+def active_backend() -> str:
+    return _active
+
+
+def available_backends() -> list[str]:
+    return [b for b in BACKENDS if b == "numpy" or HAVE_NUMBA]
+
+
+def register(name: str, backend: str = "numpy", sample: Callable | None = None):
+    def deco(fn: Callable) -> Callable:
+        _IMPLS.setdefault(name, {})[backend] = fn
+        if sample is not None:
+            SAMPLES[name] = sample
+        return fn
+
+    return deco
+
+
+def implementation(name: str, backend: str | None = None) -> Callable:
+    impls = _IMPLS[name]
+    return impls.get(backend or _active, impls["numpy"])
+
+
+def kernels() -> list[str]:
+    return list(_IMPLS)
+
+
+# ---------------------------------------------------------------------------
+# NumPy reference kernels
+# ---------------------------------------------------------------------------
+
+@register("moving_range_mean", sample=lambda rng, n: (rng.normal(10, 1, n),))
+def _mr_mean_np(x: np.ndarray) -> float:
+    return float(np.mean(np.abs(np.diff(x)))) if x.size > 1 else float("nan")
+
+
+@register("window_count", sample=lambda rng, n: (rng.normal(size=n) > 1, 5))
+def _window_count_np(mask: np.ndarray, w: int) -> np.ndarray:
+    c = np.cumsum(mask, dtype=np.int64)
+    out = c.copy()
+    out[w:] -= c[:-w]
+    return out
+
+
+def _segments_sample(rng, n):
+    x = rng.normal(10, 1, n)
+    starts = np.flatnonzero(np.r_[True, rng.random(n - 1) < 0.2])
+    return x, starts
+
+
+@register("segment_stats", sample=_segments_sample)
+def _segment_stats_np(x: np.ndarray, starts: np.ndarray):
+    n = np.diff(np.r_[starts, x.size])
+    total = np.add.reduceat(x, starts)
+    dev = x - np.repeat(total / n, n)
+    return (
+        n,
+        total,
+        np.add.reduceat(dev * dev, starts),
+        np.minimum.reduceat(x, starts),
+        np.maximum.reduceat(x, starts),
+    )
+
+
+def _seg_id_sample(rng, n):
+    seg = np.cumsum(np.r_[0, rng.random(n - 1) < 0.01])
+    return rng.normal(10, 1, n), seg, int(seg[-1]) + 1
+
+
+@register("segment_mr_sum", sample=_seg_id_sample)
+def _segment_mr_sum_np(x: np.ndarray, seg_id: np.ndarray, n_seg: int) -> np.ndarray:
+    inside = seg_id[1:] == seg_id[:-1]
+    return np.bincount(seg_id[1:][inside], weights=np.abs(np.diff(x))[inside], minlength=n_seg)
+
+
+@register("ewma_filter", sample=lambda rng, n: (rng.normal(10, 1, n), 0.2, 10.0))
+def _ewma_np(x: np.ndarray, lam: float, z0: float) -> np.ndarray:
+    z, _ = lfilter([lam], [1.0, -(1.0 - lam)], x, zi=[(1.0 - lam) * z0])
+    return z
+
+
+@register("lindley", sample=lambda rng, n: (rng.normal(-0.5, 1, n),))
+def _lindley_np(increments: np.ndarray) -> np.ndarray:
+    # C_i = max(0, C_{i-1} + d_i), C_0 = 0  <=>  C_i = S_i - min(0, min_{j<=i} S_j)
+    s = np.cumsum(increments)
+    return s - np.minimum(np.minimum.accumulate(s), 0.0)
+
+
+# ---------------------------------------------------------------------------
+# Numba kernels (compiled on first call, cached on disk)
+# ---------------------------------------------------------------------------
+
+if HAVE_NUMBA:
+
+    @register("moving_range_mean", "numba")
+    @numba.njit(cache=True)
+    def _mr_mean_nb(x):
+        n = x.size
+        if n < 2:
+            return np.nan
+        s = 0.0
+        for i in range(1, n):
+            s += abs(x[i] - x[i - 1])
+        return s / (n - 1)
+
+    @register("window_count", "numba")
+    @numba.njit(cache=True)
+    def _window_count_nb(mask, w):
+        out = np.empty(mask.size, np.int64)
+        c = 0
+        for i in range(mask.size):
+            if mask[i]:
+                c += 1
+            if i >= w and mask[i - w]:
+                c -= 1
+            out[i] = c
+        return out
+
+    @register("segment_stats", "numba")
+    @numba.njit(cache=True)
+    def _segment_stats_nb(x, starts):
+        k = starts.size
+        n = np.empty(k, np.int64)
+        total = np.empty(k)
+        m2 = np.empty(k)
+        lo = np.empty(k)
+        hi = np.empty(k)
+        for g in range(k):
+            a = starts[g]
+            b = starts[g + 1] if g + 1 < k else x.size
+            s = 0.0
+            mn = x[a]
+            mx = x[a]
+            for i in range(a, b):
+                v = x[i]
+                s += v
+                if v < mn:
+                    mn = v
+                if v > mx:
+                    mx = v
+            mean = s / (b - a)
+            ss = 0.0
+            for i in range(a, b):
+                d = x[i] - mean
+                ss += d * d
+            n[g] = b - a
+            total[g] = s
+            m2[g] = ss
+            lo[g] = mn
+            hi[g] = mx
+        return n, total, m2, lo, hi
+
+    @register("segment_mr_sum", "numba")
+    @numba.njit(cache=True)
+    def _segment_mr_sum_nb(x, seg_id, n_seg):
+        out = np.zeros(n_seg)
+        for i in range(1, x.size):
+            if seg_id[i] == seg_id[i - 1]:
+                out[seg_id[i]] += abs(x[i] - x[i - 1])
+        return out
+
+    @register("ewma_filter", "numba")
+    @numba.njit(cache=True)
+    def _ewma_nb(x, lam, z0):
+        z = np.empty(x.size)
+        prev = z0
+        for i in range(x.size):
+            prev = lam * x[i] + (1.0 - lam) * prev
+            z[i] = prev
+        return z
+
+    @register("lindley", "numba")
+    @numba.njit(cache=True)
+    def _lindley_nb(increments):
+        out = np.empty(increments.size)
+        c = 0.0
+        for i in range(increments.size):
+            c = max(0.0, c + increments[i])
+            out[i] = c
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Public entry points (dispatch to the active backend)
+# ---------------------------------------------------------------------------
+
+def _f64(x) -> np.ndarray:
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
+def moving_range_mean(x) -> float:
+    """Average |x_i - x_{i-1}| (NaN for fewer than two points)."""
+    return float(implementation("moving_range_mean")(_f64(x)))
+
+
+def window_count(mask, w: int) -> np.ndarray:
+    """True count in the length-w window ending at each index (shorter at the start)."""
+    return implementation("window_count")(np.ascontiguousarray(mask, dtype=np.bool_), int(w))
+
+
+def segment_stats(x, starts) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(n, sum, M2, min, max) of each contiguous segment of x beginning at `starts`."""
+    return implementation("segment_stats")(_f64(x), np.ascontiguousarray(starts, dtype=np.int64))
+
+
+def segment_mr_sum(x, seg_id, n_seg: int) -> np.ndarray:
+    """Sum of moving ranges that stay inside each segment (seg_id sorted, 0..n_seg-1)."""
+    return implementation("segment_mr_sum")(_f64(x), np.ascontiguousarray(seg_id, dtype=np.int64), int(n_seg))
+
+
+def ewma_filter(x, lam: float, z0: float) -> np.ndarray:
+    """z_i = lam*x_i + (1-lam)*z_{i-1}, starting from z0."""
+    return implementation("ewma_filter")(_f64(x), float(lam), float(z0))
+
+
+def lindley(increments) -> np.ndarray:
+    """C_i = max(0, C_{i-1} + d_i) with C_0 = 0 (tabular CUSUM)."""
+    return implementation("lindley")(_f64(increments))
+
+
+def _close(a, b, rtol: float) -> bool:
+    if isinstance(a, tuple):
+        return all(_close(u, v, rtol) for u, v in zip(a, b))
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    finite = np.abs(b[np.isfinite(b)])
+    scale = max(1.0, float(finite.max())) if finite.size else 1.0
+    return a.shape == b.shape and bool(np.allclose(a, b, rtol=rtol, atol=rtol * scale, equal_nan=True))
+
+
+def parity(size: int = 100_000, rtol: float = 1e-9, seed: int = 0) -> list[dict]:
+    """Run every kernel on every available backend against the NumPy reference."""
+    rows = []
+    for name in kernels():
+        args = SAMPLES[name](np.random.default_rng(seed), size)
+        ref = implementation(name, "numpy")(*args)
+        for b in available_backends():
+            rows.append({"kernel": name, "backend": b, "matches_numpy": _close(implementation(name, b)(*args), ref, rtol)})
+    return rows
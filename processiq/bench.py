@@ -0,0 +1,414 @@
+# processiq/bench.py
+"""
+Headless throughput benchmarks.
+
+    python -m processiq.bench              # every suite
+    python -m processiq.bench attribute    # one suite
+    python -m processiq.bench --scale 0.1  # smaller inputs for a quick check
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+SUITES: dict[str, Callable[[float], list[dict]]] = {}
+
+
+def suite(name: str):
+    def register(fn: Callable[[float], list[dict]]):
+        SUITES[name] = fn
+        return fn
+
+    return register
+
+
+def timed(fn: Callable[[], object], repeat: int = 3) -> float:
+    """Best wall time of `repeat` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def row(suite_name: str, case: str, items: int, seconds: float) -> dict:
+    return {
+        "suite": suite_name,
+        "case": case,
+        "items": items,
+        "seconds": round(seconds, 4),
+        "items/s": round(items / seconds) if seconds > 0 else float("inf"),
+    }
+
+
+@suite("attribute")
+def bench_attribute(scale: float = 1.0) -> list[dict]:
+    from processiq.attribute import attribute_batch, attribute_chart
+
+    rng = np.random.default_rng(0)
+    m = max(10, int(1_000_000 * scale))
+    n = rng.integers(5_000, 20_000, m).astype(float)
+    d = rng.binomial(n.astype(np.int64), np.clip(rng.normal(0.02, 0.004, m), 0, 1)).astype(float)
+
+    out = []
+    for kind, laney in (("p", False), ("p", True), ("np", False), ("c", False), ("u", True)):
+        label = f"{kind}′ (Laney)" if laney else kind
+        out.append(row("attribute", f"{label}, one series", m, timed(lambda: attribute_chart(kind, d, n, laney=laney))))
+
+    k, s = 200, max(10, int(5_000 * scale))
+    counts = pd.DataFrame(rng.poisson(20, (s, k)).astype(float), columns=[f"cat{i}" for i in range(k)])
+    units = rng.integers(50, 150, s).astype(float)
+    out.append(row("attribute", f"u′ batch, {k} categories", k * s, timed(lambda: attribute_batch("u", counts, units, laney=True))))
+    return out
+
+
+@suite("summary")
+def bench_summary(scale: float = 1.0) -> list[dict]:
+    import os
+    import tempfile
+    from functools import reduce
+
+    from processiq.summary import Summary, SubgroupSummary, summarize_files
+
+    rng = np.random.default_rng(0)
+    k, m = 500, max(20, int(2_000 * scale))
+    parts = [rng.normal(10.0, 0.05, m) for _ in range(k)]
+    keys = [np.arange(m) // 5 + i * m for i in range(k)]
+
+    out = [
+        row("summary", f"Summary merge, {k} partitions", k * m,
+            timed(lambda: reduce(Summary.merge, map(Summary.from_array, parts)))),
+        row("summary", f"SubgroupSummary concat, {k} partitions", k * m,
+            timed(lambda: SubgroupSummary.concat([SubgroupSummary.from_arrays(x, g) for x, g in zip(parts, keys)]))),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, (x, g) in enumerate(zip(parts, keys)):
+            paths.append(os.path.join(tmp, f"part{i:03d}.csv"))
+            pd.DataFrame({"value": x, "subgroup": g}).to_csv(paths[-1], index=False)
+        out.append(row("summary", f"summarize_files, {k} CSVs", k * m,
+                       timed(lambda: summarize_files(paths, "value", "subgroup"), repeat=1)))
+    return out
+
+
+@suite("sketch")
+def bench_sketch(scale: float = 1.0) -> list[dict]:
+    from processiq.sketch import CAPABILITY_QUANTILES, QuantileSketch
+
+    rng = np.random.default_rng(0)
+    m = max(10_000, int(5_000_000 * scale))
+    x = rng.lognormal(0.0, 0.5, m)
+    qs = np.array(CAPABILITY_QUANTILES)
+    exact = np.quantile(x, qs)
+
+    out = []
+    for compression in (100, 500, 2000):
+        sk = QuantileSketch.from_array(x, compression)
+        err = np.max(np.abs(sk.quantile(qs) - exact)) / x.std()
+        r = row("sketch", f"update, compression={compression}", m, timed(lambda: QuantileSketch.from_array(x, compression)))
+        r["max P0.135/P50/P99.865 error (σ)"] = round(float(err), 5)
+        r["bytes"] = sk.nbytes
+        out.append(r)
+
+    parts = [QuantileSketch.from_array(c) for c in np.array_split(x, 500)]
+
+    def merge_all():
+        total = QuantileSketch()
+        for p in parts:
+            total.merge(p)
+        return total.quantile(qs)
+
+    out.append(row("sketch", "merge 500 sketches", m, timed(merge_all)))
+    out.append(row("sketch", "exact np.quantile (reference)", m, timed(lambda: np.quantile(x, qs))))
+    return out
+
+
+@suite("backend")
+def bench_backend(scale: float = 1.0) -> list[dict]:
+    from processiq import backend
+
+    size = max(1_000, int(2_000_000 * scale))
+    checks = {(r["kernel"], r["backend"]): r["matches_numpy"] for r in backend.parity(size=min(size, 100_000))}
+    out = []
+    for name in backend.kernels():
+        args = backend.SAMPLES[name](np.random.default_rng(0), size)
+        for b in backend.available_backends():
+            fn = backend.implementation(name, b)
+            fn(*args)  # compile / warm up outside the timing
+            r = row("backend", f"{name} [{b}]", size, timed(lambda: fn(*args)))
+            r["matches_numpy"] = checks[(name, b)]
+            out.append(r)
+    return out
+
+
+@suite("columns")
+def bench_columns(scale: float = 1.0) -> list[dict]:
+    from processiq import columns
+
+    rng = np.random.default_rng(0)
+    rows, wide = max(5_000, int(500_000 * scale)), max(20, int(400 * scale))
+    frame = {f"m{i}": rng.normal(size=rows) for i in range(wide)}
+    as_text = pd.Series(rng.normal(size=rows).round(4)).astype(str)
+    for i in range(max(2, wide // 20)):
+        frame[f"txt_num{i}"] = as_text
+        frame[f"label{i}"] = pd.Series(rng.choice(["A", "B", "C"], rows))
+    df = columns.tag_dataset(pd.DataFrame(frame))
+    cells = rows * df.shape[1]
+
+    def cold():
+        columns._PROFILE_CACHE.clear()
+        return columns.numeric_like_columns(df)
+
+    return [
+        row("columns", f"numeric_like_columns cold, {df.shape[1]} cols", cells, timed(cold)),
+        row("columns", "numeric_like_columns cached (copy of dataset)", cells, timed(lambda: columns.numeric_like_columns(df.copy(deep=False)))),
+        row("columns", "full-column coercion (previous approach)", cells,
+            timed(lambda: [c for c in df.columns if pd.to_numeric(df[c], errors="coerce").notna().sum() >= 5], repeat=1)),
+    ]
+
+
+@suite("distinct")
+def bench_distinct(scale: float = 1.0) -> list[dict]:
+    from processiq import columns
+
+    rng = np.random.default_rng(0)
+    rows = max(10_000, int(2_000_000 * scale))
+    df = columns.tag_dataset(
+        pd.DataFrame(
+            {
+                "measurement": rng.normal(size=rows),
+                "subgroup": np.arange(rows) // 5,
+                "operator": rng.choice(["A", "B", "C"], rows),
+                "lot": rng.integers(0, 400, rows).astype(str),
+                "serial": pd.Series(np.arange(rows)).astype(str),
+            }
+        )
+    )
+    cells = rows * df.shape[1]
+
+    def cold(fn):
+        def go():
+            columns._DISTINCT_CACHE.clear()
+            columns._SIZES_CACHE.clear()
+            columns._PROFILE_CACHE.clear()
+            return fn()
+
+        return go
+
+    def full_scan():
+        out = []
+        for c in df.columns:
+            counts = df[c].value_counts()
+            if len(counts) >= 2 and counts.min() >= 2:
+                out.append(c)
+        return out, [c for c in ("operator", "lot", "serial") if df[c].nunique() <= 150]
+
+    return [
+        row("distinct", "subgroup candidates (variable size) cold", cells,
+            timed(cold(lambda: columns.subgroup_columns_xbarr(df, max_size=None, require_equal=False)))),
+        row("distinct", "categorical_columns(max_unique=150) cold", cells, timed(cold(lambda: columns.categorical_columns(df, 150)))),
+        row("distinct", "both, cached (copy of dataset)", cells,
+            timed(lambda: (columns.subgroup_columns_xbarr(df.copy(deep=False), max_size=None, require_equal=False),
+                           columns.categorical_columns(df.copy(deep=False), 150)))),
+        row("distinct", "full value_counts / nunique (previous approach)", cells, timed(full_scan, repeat=1)),
+    ]
+
+
+@suite("sources")
+def bench_sources(scale: float = 1.0) -> list[dict]:
+    import os
+    import sqlite3
+    import tempfile
+
+    from processiq.sources import DatabaseSource
+
+    rng = np.random.default_rng(0)
+    rows = max(10_000, int(1_000_000 * scale))
+    ts = pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows) * 30, unit="s")
+    frame = pd.DataFrame(
+        {
+            "ts": ts.astype(str),
+            "machine": rng.choice(["M1", "M2", "M3", "M4"], rows),
+            "diameter": rng.normal(10.0, 0.1, rows),
+        }
+    )
+    for i in range(12):
+        frame[f"sensor{i}"] = rng.normal(size=rows)
+    start, end = str(ts[rows // 3]), str(ts[rows // 3 + rows // 100])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "archive.sqlite")
+        con = sqlite3.connect(path)
+        frame.to_sql("measurements", con, index=False)
+        con.execute('CREATE INDEX ix_ts ON measurements("ts")')
+        con.commit()
+        con.close()
+        src = DatabaseSource(path)
+
+        def full_read():
+            c = sqlite3.connect(path)
+            d = pd.read_sql_query("SELECT * FROM measurements", c)
+            c.close()
+            d = d[(d["ts"] >= start) & (d["ts"] < end) & d["machine"].isin(["M1", "M4"])]
+            return d[["ts", "machine", "diameter"]]
+
+        pushed = dict(columns=["ts", "machine", "diameter"], time_col="ts", start=start, end=end, filters={"machine": ["M1", "M4"]})
+        return [
+            row("sources", "pushdown: 3 columns, 1% time range, 2 of 4 machines", rows, timed(lambda: src.read("measurements", **pushed))),
+            row("sources", "column pushdown only (diameter)", rows, timed(lambda: src.read("measurements", columns=["diameter"]), repeat=1)),
+            row("sources", "read everything, filter in pandas (previous approach)", rows, timed(full_read, repeat=1)),
+        ]
+
+
+@suite("ingest")
+def bench_ingest(scale: float = 1.0) -> list[dict]:
+    import os
+    import tempfile
+
+    from processiq.data import load_tables
+
+    rng = np.random.default_rng(0)
+    k, rows = 12, max(1_000, int(100_000 * scale))
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(k):
+            paths.append(os.path.join(tmp, f"line1_shift{i:02d}.csv"))
+            pd.DataFrame(
+                {"measurement": rng.normal(10.0, 0.1, rows), "operator": rng.choice(["A", "B", "C"], rows)}
+            ).to_csv(paths[-1], index=False)
+
+        def sequential():
+            frames = [pd.read_csv(p) for p in paths]
+            return pd.concat([f.assign(source_file=os.path.basename(p)) for f, p in zip(frames, paths)], ignore_index=True)
+
+        return [
+            row("ingest", f"load_tables, {k} files, thread pool", k * rows, timed(lambda: load_tables(paths), repeat=1)),
+            row("ingest", f"load_tables, {k} files, process pool", k * rows, timed(lambda: load_tables(paths, executor="process"), repeat=1)),
+            row("ingest", "read_csv one by one + string source column", k * rows, timed(sequential, repeat=1)),
+        ]
+
+
+@suite("profile")
+def bench_profile(scale: float = 1.0) -> list[dict]:
+    from processiq.profiling import profile_frame
+
+    rng = np.random.default_rng(0)
+    rows, wide = max(10_000, int(1_000_000 * scale)), max(10, int(100 * scale))
+    a = rng.normal(10.0, 0.1, (rows, wide))
+    a[rng.random(a.shape) < 0.01] = np.nan
+    df = pd.DataFrame(a, columns=[f"m{i}" for i in range(wide)])
+    del a
+    for i in range(5):
+        df[f"label{i}"] = pd.Series(rng.choice(["A", "B", "C", "D"], rows))
+    cells = rows * df.shape[1]
+
+    def per_column():
+        out = {}
+        for c in df.columns[:wide]:
+            s = df[c]
+            q1, q3 = s.quantile([0.25, 0.75])
+            out[c] = (s.isna().sum(), s.min(), s.max(), s.mean(), s.std(), ((s < q1 - 1.5 * (q3 - q1)) | (s > q3 + 1.5 * (q3 - q1))).sum())
+        return out
+
+    return [
+        row("profile", f"profile_frame, {df.shape[1]} columns", cells, timed(lambda: profile_frame(df), repeat=1)),
+        row("profile", "pandas column by column, numeric only (reference)", rows * wide, timed(per_column, repeat=1)),
+    ]
+
+
+@suite("expressions")
+def bench_expressions(scale: float = 1.0) -> list[dict]:
+    from processiq.expressions import parse_expression
+
+    rng = np.random.default_rng(0)
+    n = max(10_000, int(5_000_000 * scale))
+    df = pd.DataFrame({"defectives": rng.integers(0, 5, n), "sample_size_n": rng.integers(40, 60, n), "measurement": rng.normal(10, 0.1, n)})
+    text = "where(sample_size_n > 45, defectives / sample_size_n, nan) * 100 + abs(measurement - 10)"
+    expr = parse_expression(text, df.columns)
+
+    def pandas_ops():
+        return (df["defectives"] / df["sample_size_n"]).where(df["sample_size_n"] > 45) * 100 + (df["measurement"] - 10).abs()
+
+    return [
+        row("expressions", "Expression.evaluate (chunked)", n, timed(lambda: expr.evaluate(df))),
+        row("expressions", "pandas Series operations (reference)", n, timed(pandas_ops)),
+    ]
+
+
+@suite("resample")
+def bench_resample(scale: float = 1.0) -> list[dict]:
+    from processiq.columns import tag_dataset
+    from processiq.resample import _BUCKET_CACHE, _FRAME_CACHE, resample
+
+    rng = np.random.default_rng(0)
+    n = max(10_000, int(2_592_000 * scale))  # 30 days at 1 Hz
+    df = tag_dataset(pd.DataFrame({"timestamp": pd.date_range("2026-01-01", periods=n, freq="s"), "measurement": rng.normal(10, 0.1, n)}))
+
+    def cold(freq: str):
+        _BUCKET_CACHE.clear()
+        _FRAME_CACHE.clear()
+        return resample(df, "timestamp", ["measurement"], freq)
+
+    def pandas_groupby(freq: str):
+        g = df.groupby(df["timestamp"].dt.floor(freq))["measurement"]
+        return g.agg(["count", "mean", "std", "min", "max"]).join(g.quantile([0.05, 0.5, 0.95]).unstack())
+
+    rows = []
+    for freq in ("1min", "1h"):
+        rows += [
+            row("resample", f"resample {freq} (cold)", n, timed(lambda: cold(freq), repeat=1)),
+            row("resample", f"resample {freq} (cached)", n, timed(lambda: resample(df, "timestamp", ["measurement"], freq))),
+            row("resample", f"pandas groupby {freq} (reference)", n, timed(lambda: pandas_groupby(freq), repeat=1)),
+        ]
+    return rows
+
+
+@suite("grr")
+def bench_grr(scale: float = 1.0) -> list[dict]:
+    from processiq.msa import gage_rr_batch, gage_rr_crossed_anova
+
+    rng = np.random.default_rng(0)
+    parts, ops, reps, k = 10, 3, 3, max(4, int(200 * scale))
+    design = pd.DataFrame(
+        [(f"P{p}", f"Op{o}", r) for p in range(parts) for o in range(ops) for r in range(reps)],
+        columns=["part", "operator", "repeat"],
+    )
+    y = rng.normal(0, 1, (parts, k))[np.repeat(np.arange(parts), ops * reps)] + rng.normal(0, 0.3, (len(design), k))
+    features = [f"feature_{i}" for i in range(k)]
+    df = pd.concat([design, pd.DataFrame(y, columns=features)], axis=1)
+    few = features[: max(2, k // 20)]
+
+    def one_at_a_time():
+        return [gage_rr_crossed_anova(df, "part", "operator", c) for c in few]
+
+    return [
+        row("grr", f"gage_rr_batch, {k} features", k, timed(lambda: gage_rr_batch(df, "part", "operator", features))),
+        row("grr", "gage_rr_crossed_anova per feature (reference)", len(few), timed(one_at_a_time, repeat=1)),
+    ]
+
+
+def run(names: list[str] | None = None, scale: float = 1.0) -> pd.DataFrame:
+    rows: list[dict] = []
+    for name in names or list(SUITES):
+        if name not in SUITES:
+            raise SystemExit(f"Unknown suite '{name}'. Available: {', '.join(SUITES)}")
+        rows += SUITES[name](scale)
+    return pd.DataFrame(rows)
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m processiq.bench", description="ProcessIQ throughput benchmarks")
+    ap.add_argument("suites", nargs="*", help=f"suites to run (default: all of {', '.join(SUITES)})")
+    ap.add_argument("--scale", type=float, default=1.0, help="input size multiplier")
+    args = ap.parse_args(argv)
+    with pd.option_context("display.width", 120, "display.max_columns", 10):
+        print(run(args.suites, args.scale).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# processiq/capability_ci.py
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, norm
+
+from processiq.metrics import _stdev_within_i_mr
+from processiq.spc import D2_MR
+from processiq.whatif import capability_indices
+
+INDICES = ("Cp", "Cpk", "Pp", "Ppk")
+
+# Resampled values held in memory per block (rows x n); keeps one block ~32 MB
+BLOCK_ELEMENTS = 4_000_000
+
+
+@dataclass
+class CapabilityCI:
+    n: int
+    conf: float
+    sides: str  # "two-sided" | "lower"
+    method: str  # "analytic" | "bootstrap"
+    estimate: dict[str, float]
+    lower: dict[str, float]
+    upper: dict[str, float]
+    resamples: int = 0
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "index": list(INDICES),
+                "estimate": [self.estimate[k] for k in INDICES],
+                "lower": [self.lower[k] for k in INDICES],
+                "upper": [self.upper[k] for k in INDICES],
+            }
+        )
+
+
+def _opt(v: float | None) -> float:
+    return float("nan") if v is None else float(v)
+
+
+def _limits(lsl: float | None, usl: float | None) -> tuple[float, float]:
+    return _opt(lsl), _opt(usl)
+
+
+def _point_estimates(x: np.ndarray, lsl: float | None, usl: float | None) -> dict[str, float]:
+    lo, hi = _limits(lsl, usl)
+    mean = float(np.mean(x))
+    s_overall = float(np.std(x, ddof=1)) if x.size > 1 else None
+    cp, cpk = capability_indices(mean, _stdev_within_i_mr(x), lo, hi)
+    pp, ppk = capability_indices(mean, s_overall, lo, hi)
+    return {"Cp": float(cp), "Cpk": float(cpk), "Pp": float(pp), "Ppk": float(ppk)}
+
+
+def _alphas(conf: float, sides: str) -> tuple[float, float]:
+    """Lower / upper tail probabilities for the requested interval."""
+    if sides == "lower":
+        return 1.0 - conf, float("nan")
+    a = (1.0 - conf) / 2.0
+    return a, 1.0 - a
+
+
+def analytic_ci(x, lsl: float | None, usl: float | None, conf: float = 0.95, sides: str = "two-sided") -> CapabilityCI:
+    """
+    Normal-theory bounds: chi-square for Cp/Pp, Bissell's approximation for Cpk/Ppk.
+    n - 1 degrees of freedom are used for both sigma estimates.
+    """
+    x = np.asarray(x, dtype=float)
+    x = x[np.isfinite(x)]
+    n = int(x.size)
+    est = _point_estimates(x, lsl, usl) if n else {k: float("nan") for k in INDICES}
+    a_lo, a_hi = _alphas(conf, sides)
+    dof = max(n - 1, 1)
+
+    lower: dict[str, float] = {}
+    upper: dict[str, float] = {}
+    for k in ("Cp", "Pp"):
+        lower[k] = est[k] * np.sqrt(chi2.ppf(a_lo, dof) / dof)
+        upper[k] = est[k] * np.sqrt(chi2.ppf(a_hi, dof) / dof) if np.isfinite(a_hi) else float("nan")
+    for k in ("Cpk", "Ppk"):
+        se = np.sqrt(1.0 / (9.0 * max(n, 1)) + est[k] ** 2 / (2.0 * dof))
+        lower[k] = est[k] + norm.ppf(a_lo) * se
+        upper[k] = est[k] + norm.ppf(a_hi) * se if np.isfinite(a_hi) else float("nan")
+
+    return CapabilityCI(n, conf, sides, "analytic", est, lower, upper)
+
+
+def _block_length(n: int) -> int:
+    # Moving blocks keep short-range order so the MR (within) sigma stays meaningful
+    return max(1, int(round(n ** (1.0 / 3.0))))
+
+
+def _bootstrap_draws(
+    x: np.ndarray,
+    lsl: float | None,
+    usl: float | None,
+    resamples: int,
+    rng: np.random.Generator,
+    time_budget_s: float | None,
+) -> np.ndarray:
+    """(B, 4) array of Cp/Cpk/Pp/Ppk replicates from a moving-block bootstrap."""
+    n = x.size
+    L = _block_length(n)
+    n_blocks = -(-n // L)
+    offsets = np.arange(L)
+    # MRs that straddle two blocks are artificial; keep only within-block pairs
+    keep_mr = ((np.arange(n - 1) + 1) % L != 0) if L > 1 else np.ones(n - 1, dtype=bool)
+    lo, hi = _limits(lsl, usl)
+
+    per_block = max(1, BLOCK_ELEMENTS // max(n, 1))
+    out: list[np.ndarray] = []
+    done = 0
+    t0 = time.perf_counter()
+    while done < resamples:
+        b = min(per_block, resamples - done)
+        starts = rng.integers(0, n - L + 1, size=(b, n_blocks))
+        idx = (starts[:, :, None] + offsets).reshape(b, -1)[:, :n]
+        xs = x[idx]
+
+        mean = xs.mean(axis=1)
+        s_overall = xs.std(axis=1, ddof=1)
+        mr = np.abs(np.diff(xs, axis=1))[:, keep_mr]
+        s_within = mr.mean(axis=1) / D2_MR
+
+        cp, cpk = capability_indices(mean, s_within, lo, hi)
+        pp, ppk = capability_indices(mean, s_overall, lo, hi)
+        out.append(np.column_stack([cp, cpk, pp, ppk]))
+        done += b
+
+        if time_budget_s is not None and time.perf_counter() - t0 > time_budget_s:
+            break
+
+    return np.vstack(out)
+
+
+def bootstrap_ci(
+    x,
+    lsl: float | None,
+    usl: float | None,
+    conf: float = 0.95,
+    sides: str = "two-sided",
+    resamples: int = 2000,
+    seed: int | np.random.SeedSequence | None = 0,
+    time_budget_s: float | None = None,
+) -> CapabilityCI:
+    """
+    Percentile bootstrap, resampled in vectorized blocks.
+
+    With time_budget_s set, resampling stops after the first block that exceeds
+    the budget; the number actually drawn is reported in `resamples`.
+    """
+    x = np.asarray(x, dtype=float)
+    x = x[np.isfinite(x)]
+    n = int(x.size)
+    if n < 3:
+        nan = {k: float("nan") for k in INDICES}
+        return CapabilityCI(n, conf, sides, "bootstrap", dict(nan), dict(nan), dict(nan))
+
+    rng = np.random.default_rng(seed)
+    est = _point_estimates(x, lsl, usl)
+    draws = _bootstrap_draws(x, lsl, usl, resamples, rng, time_budget_s)
+    a_lo, a_hi = _alphas(conf, sides)
+
+    lower: dict[str, float] = {}
+    upper: dict[str, float] = {}
+    for j, k in enumerate(INDICES):
+        col = draws[:, j]
+        col = col[np.isfinite(col)]
+        if col.size == 0:
+            lower[k] = upper[k] = float("nan")
+            continue
+        lower[k] = float(np.quantile(col, a_lo))
+        upper[k] = float(np.quantile(col, a_hi)) if np.isfinite(a_hi) else float("nan")
+
+    return CapabilityCI(n, conf, sides, "bootstrap", est, lower, upper, resamples=int(draws.shape[0]))
+
+
+def _ci_job(args) -> CapabilityCI:
+    x, lsl, usl, conf, sides, method, resamples, seed = args
+    if method == "analytic":
+        return analytic_ci(x, lsl, usl, conf=conf, sides=sides)
+    return bootstrap_ci(x, lsl, usl, conf=conf, sides=sides, resamples=resamples, seed=seed)
+
+
+def capability_ci_table(
+    columns: dict[str, np.ndarray],
+    specs: dict[str, tuple[float | None, float | None]],
+    conf: float = 0.95,
+    sides: str = "two-sided",
+    method: str = "bootstrap",
+    resamples: int = 2000,
+    seed: int = 0,
+    workers: int | None = None,
+    parallel_threshold: int = 8,
+) -> pd.DataFrame:
+    """
+    Capability with CI columns for a batch of characteristics.
+
+    Each characteristic gets its own child seed, so results do not depend on
+    how the batch is split. Batches at or above parallel_threshold fan out to
+    a process pool (workers=1 forces serial).
+    """
+    names = list(columns)
+    children = np.random.SeedSequence(seed).spawn(len(names))
+    jobs = [
+        (np.asarray(columns[c], dtype=float), *specs.get(c, (None, None)), conf, sides, method, resamples, children[i])
+        for i, c in enumerate(names)
+    ]
+
+    if workers != 1 and len(jobs) >= parallel_threshold:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_ci_job, jobs, chunksize=max(1, len(jobs) // 32)))
+    else:
+        results = [_ci_job(j) for j in jobs]
+
+    rows = []
+    for name, r in zip(names, results):
+        row: dict[str, object] = {"characteristic": name, "n": r.n}
+        for k in INDICES:
+            row[k] = r.estimate[k]
+            row[f"{k}_lower"] = r.lower[k]
+            row[f"{k}_upper"] = r.upper[k]
+        row["method"] = r.method
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,146 @@
+# processiq/capability_trend.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from processiq.backend import segment_mr_sum
+from processiq.spc import D2_MR
+from processiq.whatif import capability_indices
+
+# Bucket choices for the time-based trend (label -> pandas frequency)
+BUCKETS = {
+    "Hour": "1h",
+    "Shift (8 h)": "8h",
+    "Day": "1D",
+    "Week": "W",
+    "Month": "M",
+}
+
+
+def _opt(v: float | None) -> float:
+    return float("nan") if v is None else float(v)
+
+
+def _indices_frame(n, mean, s_within, s_overall, lsl: float | None, usl: float | None) -> dict[str, np.ndarray]:
+    lo, hi = _opt(lsl), _opt(usl)
+    cp, cpk = capability_indices(mean, s_within, lo, hi)
+    pp, ppk = capability_indices(mean, s_overall, lo, hi)
+    return {
+        "n": n,
+        "mean": mean,
+        "stdev_within": s_within,
+        "stdev_overall": s_overall,
+        "Cp": cp,
+        "Cpk": cpk,
+        "Pp": pp,
+        "Ppk": ppk,
+    }
+
+
+def with_indices(moments: pd.DataFrame, lsl: float | None, usl: float | None) -> pd.DataFrame:
+    """Add Cp/Cpk/Pp/Ppk to a rolling_moments / bucket moments table (cheap: no pass over the data)."""
+    ind = _indices_frame(
+        moments["n"].to_numpy(),
+        moments["mean"].to_numpy(dtype=float),
+        moments["stdev_within"].to_numpy(dtype=float),
+        moments["stdev_overall"].to_numpy(dtype=float),
+        lsl,
+        usl,
+    )
+    return moments.assign(**{k: ind[k] for k in ("Cp", "Cpk", "Pp", "Ppk")})
+
+
+def rolling_capability(x, window: int, lsl: float | None, usl: float | None) -> pd.DataFrame:
+    """
+    Cp/Cpk/Pp/Ppk for every length-`window` run of consecutive points, in O(n).
+    Pages that re-score the same data under new spec limits cache
+    rolling_moments and call with_indices instead.
+    """
+    return with_indices(rolling_moments(x, window), lsl, usl)
+
+
+def rolling_moments(x, window: int) -> pd.DataFrame:
+    """
+    n / mean / within and overall stdev for every length-`window` run of consecutive points.
+
+    Sums, sums of squares and moving-range sums come from prefix sums, so each
+    window is a few subtractions. Data are centred first to keep the sum of
+    squares well conditioned. `end` is the index of the window's last point.
+    """
+    x = np.asarray(x, dtype=float)
+    x = x[np.isfinite(x)]
+    n = x.size
+    window = int(window)
+    if window < 2 or n < window:
+        return pd.DataFrame(columns=["end", "n", "mean", "stdev_within", "stdev_overall"])
+
+    shift = float(np.mean(x))
+    xc = x - shift
+    c1 = np.concatenate([[0.0], np.cumsum(xc)])
+    c2 = np.concatenate([[0.0], np.cumsum(xc * xc)])
+    cm = np.concatenate([[0.0], np.cumsum(np.abs(np.diff(x)))])
+
+    ends = np.arange(window - 1, n)
+    s1 = c1[ends + 1] - c1[ends + 1 - window]
+    s2 = c2[ends + 1] - c2[ends + 1 - window]
+    mean = s1 / window + shift
+    var = np.maximum((s2 - s1 * s1 / window) / (window - 1), 0.0)
+    # Moving ranges inside the window: MR_j = |x_{j+1} - x_j| for j = start .. end-1
+    mrbar = (cm[ends] - cm[ends + 1 - window]) / (window - 1)
+
+    return pd.DataFrame(
+        {"end": ends, "n": np.full(ends.size, window), "mean": mean, "stdev_within": mrbar / D2_MR, "stdev_overall": np.sqrt(var)}
+    )
+
+
+def _bucket_starts(times: pd.Series, freq: str) -> pd.Series:
+    if freq in ("W", "M"):
+        return times.dt.to_period(freq).dt.start_time
+    return times.dt.floor(freq)
+
+
+def bucketed_capability(
+    x,
+    times,
+    freq: str,
+    lsl: float | None,
+    usl: float | None,
+    min_n: int = 5,
+) -> pd.DataFrame:
+    """
+    Capability per calendar bucket (hour, shift, day, ...) in one sorted pass.
+    Moving ranges never span two buckets. Buckets with fewer than min_n points
+    are dropped.
+    """
+    d = pd.DataFrame(
+        {
+            "t": pd.to_datetime(pd.Series(times).reset_index(drop=True), errors="coerce"),
+            "x": pd.to_numeric(pd.Series(x).reset_index(drop=True), errors="coerce"),
+        }
+    ).dropna()
+    cols = ["bucket", "n", "mean", "stdev_within", "stdev_overall", "Cp", "Cpk", "Pp", "Ppk"]
+    if d.empty:
+        return pd.DataFrame(columns=cols)
+    if not d["t"].is_monotonic_increasing:
+        d = d.sort_values("t", kind="stable")
+
+    b = _bucket_starts(d["t"], freq).to_numpy()
+    xv = d["x"].to_numpy(dtype=float)
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    n = np.diff(np.r_[starts, xv.size])
+    seg = np.repeat(np.arange(starts.size), n)
+
+    shift = float(np.mean(xv))
+    xc = xv - shift
+    s1 = np.add.reduceat(xc, starts)
+    s2 = np.add.reduceat(xc * xc, starts)
+    mean = s1 / n + shift
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = np.maximum((s2 - s1 * s1 / n) / (n - 1), 0.0)
+        mr_sum = segment_mr_sum(xv, seg, starts.size)
+        mrbar = mr_sum / (n - 1)
+
+    out = pd.DataFrame(_indices_frame(n, mean, mrbar / D2_MR, np.sqrt(var), lsl, usl))
+    out.insert(0, "bucket", b[starts])
+    return out[out["n"] >= min_n].reset_index(drop=True)
@@ -0,0 +1,82 @@
+# processiq/charts.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class HistogramBins:
+    edges: np.ndarray
+    counts: np.ndarray
+    density: np.ndarray
+
+    @property
+    def centers(self) -> np.ndarray:
+        return (self.edges[:-1] + self.edges[1:]) / 2.0
+
+    @property
+    def widths(self) -> np.ndarray:
+        return np.diff(self.edges)
+
+
+def histogram_from_sorted(sorted_x: np.ndarray, nbins: int) -> HistogramBins:
+    """
+    Equal-width histogram of an already sorted array.
+    Counts come from a binary search per edge, so cost is O(nbins log n).
+    """
+    n = int(sorted_x.size)
+    if n == 0:
+        edges = np.linspace(0.0, 1.0, nbins + 1)
+        zeros = np.zeros(nbins)
+        return HistogramBins(edges, zeros.astype(np.int64), zeros)
+
+    lo, hi = float(sorted_x[0]), float(sorted_x[-1])
+    if hi <= lo:
+        # Constant data: one visible bin around the value
+        lo, hi = lo - 0.5, hi + 0.5
+    edges = np.linspace(lo, hi, nbins + 1)
+
+    # Bins are [a, b) except the last, which includes the max (same as np.histogram)
+    pos = np.searchsorted(sorted_x, edges, side="left")
+    pos[-1] = n
+    counts = np.diff(pos)
+    density = counts / (n * np.diff(edges))
+    return HistogramBins(edges, counts, density)
+
+
+def histogram(x: np.ndarray, nbins: int) -> HistogramBins:
+    x = np.asarray(x, dtype=float)
+    return histogram_from_sorted(np.sort(x[np.isfinite(x)]), nbins)
+
+
+def normal_pdf_curve(lo: float, hi: float, mean: float, s: float | None, points: int = 300):
+    """(xx, yy) for a normal density overlay; None when sigma is unusable."""
+    if s is None or not np.isfinite(s) or s <= 0:
+        return None
+    xx = np.linspace(lo, hi, points)
+    z = (xx - mean) / s
+    yy = np.exp(-0.5 * z * z) / (s * np.sqrt(2.0 * np.pi))
+    return xx, yy
+
+
+def minmax_decimate(y: np.ndarray, max_points: int = 4000) -> np.ndarray:
+    """
+    Indices of a min/max-preserving subset of y for plotting long series.
+    Each bucket keeps its lowest and highest point, so spikes stay visible.
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n <= max_points:
+        return np.arange(n)
+
+    b = int(np.ceil(n / (max_points // 2)))
+    m = -(-n // b)
+    # Pad the last bucket; NaNs never win argmin/argmax
+    pad = m * b - n
+    lo = np.concatenate([np.where(np.isnan(y), np.inf, y), np.full(pad, np.inf)]).reshape(m, b)
+    hi = np.concatenate([np.where(np.isnan(y), -np.inf, y), np.full(pad, -np.inf)]).reshape(m, b)
+    base = np.arange(m) * b
+    keep = np.concatenate([base + lo.argmin(axis=1), base + hi.argmax(axis=1)])
+    return np.unique(np.clip(keep, 0, n - 1))
@@ -1,9 +1,154 @@
 # processiq/columns.py
 from __future__ import annotations
 
+import hashlib
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
+# ---------------------------------------------------------------------------
+# Sampled type inference
+# ---------------------------------------------------------------------------
+
+SAMPLE_ROWS = 2_000  # columns up to this length are always checked in full
+STRATA = 16
+ROUNDS = (64, 256, 1_024)  # early-exit checkpoints before the full sample
+CONFIDENCE_Z = 3.0
+DATASET_ID = "processiq_dataset_id"
+
+_PROFILE_CACHE: OrderedDict[tuple, "ColumnProfile"] = OrderedDict()
+_PROFILE_CACHE_SIZE = 50_000
+
+
+@dataclass
+class ColumnProfile:
+    numeric_frac: float  # share of rows (missing included) that read as numbers
+    valid: int  # numeric values in the column (estimated unless exact)
+    integer_like: bool  # every numeric value seen is a whole number
+    positive_frac: float  # share of numeric values seen that are > 0
+    rows_checked: int
+    exact: bool  # True when the whole column was read
+
+
+def tag_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Give a loaded dataset an id that copies / slices inherit (keys the profile cache)."""
+    df.attrs.setdefault(DATASET_ID, uuid.uuid4().hex)
+    return df
+
+
+@lru_cache(maxsize=64)
+def _sample_positions(n: int, size: int, seed: int = 0) -> np.ndarray:
+    """Stratified row positions ordered so every prefix covers all strata (shared by all columns of a length)."""
+    rng = np.random.default_rng(seed)
+    edges = np.linspace(0, n, STRATA + 1).astype(np.int64)
+    per = -(-size // STRATA)
+    cols = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        k = min(per, b - a)
+        pick = a + rng.choice(b - a, size=k, replace=False)
+        cols.append(np.pad(pick, (0, per - k), constant_values=-1))
+    pos = np.stack(cols, axis=1).reshape(-1)  # round-robin over strata
+    pos = pos[pos >= 0][:size]
+    pos.flags.writeable = False
+    return pos
+
+
+def _wilson(k: int, m: int, z: float = CONFIDENCE_Z) -> tuple[float, float]:
+    if m == 0:
+        return 0.0, 1.0
+    p = k / m
+    den = 1 + z * z / m
+    mid = (p + z * z / (2 * m)) / den
+    half = z * np.sqrt(p * (1 - p) / m + z * z / (4 * m * m)) / den
+    return mid - half, mid + half
+
+
+def _profile(values: pd.Series, n_rows: int, exact: bool) -> ColumnProfile:
+    x = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    ok = np.isfinite(x)
+    m, k = int(x.size), int(ok.sum())
+    v = x[ok]
+    frac = k / m if m else 0.0
+    return ColumnProfile(
+        numeric_frac=frac,
+        valid=k if exact else int(round(frac * n_rows)),
+        integer_like=bool(k) and bool(np.all(np.isclose(v, np.round(v), atol=1e-9))),
+        positive_frac=float((v > 0).mean()) if k else 0.0,
+        rows_checked=m,
+        exact=exact,
+    )
+
+
+def profile_column(s: pd.Series, sample: int = SAMPLE_ROWS, seed: int = 0) -> ColumnProfile:
+    """
+    Classify a column from a stratified sample. Text columns are read in
+    growing rounds and stop as soon as a Wilson interval (z = 3) shows the
+    numeric share is clearly above 95 % or clearly below 5 %; numeric-dtype
+    columns need no parsing and always use the full sample. Short columns
+    are read in full, so the result is exact.
+    """
+    n = len(s)
+    if n <= sample:
+        return _profile(s, n, exact=True)
+    pos = _sample_positions(n, sample, seed)
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return _profile(s.iloc[pos], n, exact=False)
+    for m in ROUNDS:
+        part = s.iloc[pos[:m]]
+        k = int(pd.to_numeric(part, errors="coerce").notna().sum())
+        lo, hi = _wilson(k, m)
+        if lo > 0.95 or hi < 0.05:
+            return _profile(part, n, exact=False)
+    return _profile(s.iloc[pos], n, exact=False)
+
+
+def _cache_key(df: pd.DataFrame, col) -> tuple:
+    s = df[col]
+    n = len(s)
+    probe = s.array[_sample_positions(n, ROUNDS[0])] if n > SAMPLE_ROWS else s.array
+    digest = int(pd.util.hash_array(np.asarray(probe)).sum()) if n else 0
+    return (df.attrs.get(DATASET_ID, ""), col, str(s.dtype), n, digest)
+
+
+def dataset_key(df: pd.DataFrame) -> str:
+    """
+    Cheap cache key for a whole frame: dataset id, column names / dtypes, length
+    and a hash of each column's sampled probe (no full hash of every cell).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([_cache_key(df, c) for c in df.columns]).encode("utf-8"))
+    return h.hexdigest()
+
+
+def column_profiles(df: pd.DataFrame) -> dict[str, ColumnProfile]:
+    """Profiles for every column, reusing cached ones for the same dataset and content."""
+    out: dict[str, ColumnProfile] = {}
+    for c in df.columns:
+        key = _cache_key(df, c)
+        prof = _PROFILE_CACHE.get(key)
+        if prof is None:
+            prof = profile_column(df[c])
+            _PROFILE_CACHE[key] = prof
+            while len(_PROFILE_CACHE) > _PROFILE_CACHE_SIZE:
+                _PROFILE_CACHE.popitem(last=False)
+        out[c] = prof
+    return out
+
+
+def confirm_column(df: pd.DataFrame, col) -> ColumnProfile:
+    """Exact profile of one column (e.g. the one just selected); replaces the sampled entry."""
+    key = _cache_key(df, col)
+    prof = _PROFILE_CACHE.get(key)
+    if prof is None or not prof.exact:
+        prof = _profile(df[col], len(df), exact=True)
+        _PROFILE_CACHE[key] = prof
+    return prof
+
+
 
 def numeric_columns(df: pd.DataFrame) -> list[str]:
     """Strict numeric dtype columns."""
@@ -17,14 +162,10 @@ def numeric_columns(df: pd.DataFrame) -> list[str]:
 def numeric_like_columns(df: pd.DataFrame, min_valid: int = 5) -> list[str]:
     """
     Columns that can be coerced to numeric with at least min_valid non-null values.
-    Useful when data arrives as strings but is really numeric.
+    Useful when data arrives as strings but is really numeric. Long columns are
+    judged from a sample (see profile_column).
     """
-    cols: list[str] = []
-    for c in df.columns:
-        s = pd.to_numeric(df[c], errors="coerce")
-        if int(s.notna().sum()) >= min_valid:
-            cols.append(c)
-    return cols
+    return [c for c, p in column_profiles(df).items() if p.valid >= min_valid]
 
 
 def count_like_columns(df: pd.DataFrame, min_valid: int = 5) -> list[str]:
@@ -32,55 +173,140 @@ def count_like_columns(df: pd.DataFrame, min_valid: int = 5) -> list[str]:
     Columns suitable for count data: integer dtype OR numeric values that are
     essentially integers (e.g., 5.0, 12.0) with enough valid values.
     """
-    cols: list[str] = []
-    for c in df.columns:
-        s = pd.to_numeric(df[c], errors="coerce").dropna()
-        if len(s) < min_valid:
-            continue
-        # "integer-like" within tiny tolerance
-        if np.all(np.isclose(s.to_numpy(), np.round(s.to_numpy()), atol=1e-9)):
-            cols.append(c)
-    return cols
+    # "integer-like" within tiny tolerance
+    return [c for c, p in column_profiles(df).items() if p.valid >= min_valid and p.integer_like]
 
 
 def positive_numeric_like_columns(df: pd.DataFrame, min_valid: int = 5) -> list[str]:
     """Numeric-like columns where valid values are mostly > 0 (good for n, area, units)."""
-    cols: list[str] = []
-    for c in df.columns:
-        s = pd.to_numeric(df[c], errors="coerce").dropna()
-        if len(s) < min_valid:
-            continue
-        # Require that at least 95% are > 0
-        if (s > 0).mean() >= 0.95:
-            cols.append(c)
-    return cols
+    # Require that at least 95% are > 0
+    return [c for c, p in column_profiles(df).items() if p.valid >= min_valid and p.positive_frac >= 0.95]
 
 
-def subgroup_columns_xbarr(df: pd.DataFrame, min_groups: int = 2) -> list[str]:
+# ---------------------------------------------------------------------------
+# Capped distinct counts / group-size checks
+# ---------------------------------------------------------------------------
+
+DISTINCT_CHUNK = 65_536
+PROBE_GROUPS = 256  # sampled values whose groups are counted exactly before a full scan
+
+_DISTINCT_CACHE: OrderedDict[tuple, tuple[int | None, int]] = OrderedDict()
+_SIZES_CACHE: OrderedDict[tuple, "GroupSizes"] = OrderedDict()
+
+
+def _remember(cache: OrderedDict, key: tuple, value) -> None:
+    cache[key] = value
+    while len(cache) > _PROFILE_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _capped_distinct(s: pd.Series, cap: int) -> int | None:
+    n = len(s)
+    # Distinct values in a sample never exceed those in the column
+    if n > SAMPLE_ROWS and s.iloc[_sample_positions(n, SAMPLE_ROWS)].nunique(dropna=True) > cap:
+        return None
+    seen: set = set()
+    for i in range(0, n, DISTINCT_CHUNK):
+        u = s.iloc[i : i + DISTINCT_CHUNK].dropna().unique()
+        if len(u) > cap:
+            return None
+        seen.update(u.tolist())
+        if len(seen) > cap:
+            return None
+    return len(seen)
+
+
+def distinct_count(df: pd.DataFrame, col, cap: int) -> int | None:
     """
-    Candidate subgroup columns for Xbar-R where subgroup sizes are consistent
-    (all equal) and within a typical range (2..10).
+    Exact number of distinct non-null values of df[col], or None as soon as
+    it is known to exceed cap (chunks are scanned until the cap is passed).
+    Results are cached per dataset, so other pages and larger caps reuse them.
     """
-    cols: list[str] = []
-    for c in df.columns:
-        s = df[c].dropna()
-        if s.empty:
-            continue
+    key = _cache_key(df, col)
+    hit = _DISTINCT_CACHE.get(key)
+    if hit is not None:
+        count, over = hit
+        if count is not None:
+            return count if count <= cap else None
+        if over >= cap:
+            return None
+    count = _capped_distinct(df[col], cap)
+    over = max(cap, hit[1] if hit else -1) if count is None else -1
+    _remember(_DISTINCT_CACHE, key, (count, over))
+    return count
 
-        counts = s.value_counts()
-        if len(counts) < min_groups:
-            continue
 
-        sizes = counts.to_numpy()
-        if sizes.min() < 2:
-            continue
-        if sizes.max() > 10:
-            continue
-        if not np.all(sizes == sizes[0]):
-            continue
+@dataclass
+class GroupSizes:
+    """What is known about how many rows share each value of a column."""
+    min_le: int | None = None  # some group is at most this big
+    max_ge: int = 0  # some group is at least this big
+    unequal: bool = False  # two groups are known to differ in size
+    groups: int | None = None  # exact group count (full scan only)
+    exact: bool = False
+
+    def rules_out(self, min_groups: int, max_size: int | None, require_equal: bool) -> bool:
+        return (
+            (self.min_le is not None and self.min_le < 2)
+            or (max_size is not None and self.max_ge > max_size)
+            or (require_equal and self.unequal)
+            or (self.groups is not None and self.groups < min_groups)
+        )
+
+
+def _sizes_facts(sizes: np.ndarray, exact: bool) -> GroupSizes:
+    if sizes.size == 0:
+        return GroupSizes(groups=0 if exact else None, exact=exact)
+    return GroupSizes(
+        min_le=int(sizes.min()),
+        max_ge=int(sizes.max()),
+        unequal=bool(np.any(sizes != sizes[0])),
+        groups=int(sizes.size) if exact else None,
+        exact=exact,
+    )
+
+
+def _group_sizes(s: pd.Series, min_groups: int, max_size: int | None, require_equal: bool) -> GroupSizes:
+    v = s.dropna()
+    if len(v) > SAMPLE_ROWS:
+        # Sample counts are lower bounds on group sizes
+        probe = v.iloc[_sample_positions(len(v), SAMPLE_ROWS)].value_counts(sort=False)
+        facts = GroupSizes(max_ge=int(probe.max()))
+        if facts.rules_out(min_groups, max_size, require_equal):
+            return facts
+        # Every occurrence of a few sampled values gives exact sizes for those groups
+        picked = v[v.isin(probe.index[:PROBE_GROUPS])]
+        facts = _sizes_facts(picked.value_counts(sort=False).to_numpy(), exact=False)
+        if facts.rules_out(min_groups, max_size, require_equal):
+            return facts
+    return _sizes_facts(v.value_counts(sort=False).to_numpy(), exact=True)
+
+
+def group_sizes(df: pd.DataFrame, col, min_groups: int = 2, max_size: int | None = None, require_equal: bool = False) -> GroupSizes:
+    """Cached group-size facts; a full value_counts only runs when the cheap checks cannot rule the column out."""
+    key = _cache_key(df, col)
+    facts = _SIZES_CACHE.get(key)
+    if facts is None or not (facts.exact or facts.rules_out(min_groups, max_size, require_equal)):
+        facts = _group_sizes(df[col], min_groups, max_size, require_equal)
+        _remember(_SIZES_CACHE, key, facts)
+    return facts
 
-        cols.append(c)
 
+def subgroup_columns_xbarr(
+    df: pd.DataFrame,
+    min_groups: int = 2,
+    max_size: int | None = 10,
+    require_equal: bool = True,
+) -> list[str]:
+    """
+    Candidate subgroup columns for Xbar-R / Xbar-S. By default subgroup sizes
+    must be consistent (all equal) and within 2..10; pass max_size=None and
+    require_equal=False for the variable-size engine.
+    """
+    cols: list[str] = []
+    for c in df.columns:
+        if not group_sizes(df, c, min_groups, max_size, require_equal).rules_out(min_groups, max_size, require_equal):
+            cols.append(c)
     return cols
 
 
@@ -89,8 +315,63 @@ def categorical_columns(df: pd.DataFrame, max_unique: int = 75) -> list[str]:
     cols: list[str] = []
     for c in df.columns:
         s = df[c]
-        if pd.api.types.is_object_dtype(s) or pd.api.types.is_categorical_dtype(s) or pd.api.types.is_bool_dtype(s):
-            nunq = s.nunique(dropna=True)
-            if nunq <= max_unique:
+        if isinstance(s.dtype, pd.CategoricalDtype) and len(s.cat.categories) <= max_unique:
+            cols.append(c)  # observed values are a subset of the categories
+        elif pd.api.types.is_bool_dtype(s):
+            cols.append(c)
+        elif (
+            pd.api.types.is_object_dtype(s)
+            or pd.api.types.is_string_dtype(s)
+            or isinstance(s.dtype, pd.CategoricalDtype)
+        ):
+            if distinct_count(df, c, max_unique) is not None:
                 cols.append(c)
     return cols
+
+
+# A date must look like one before dateutil sees it: "M1" or "12" would otherwise parse
+_DATE_LIKE = (
+    r"^\s*(?:\d{4}[-/.]\d{1,2}[-/.]\d{1,2}"  # 2024-01-31, 2024/1/31
+    r"|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}"  # 31.01.2024, 1/31/24
+    r"|\d{1,2}\s+[A-Za-z]{3,9}\.?,?\s+\d{4}"  # 31 Jan 2024
+    r"|[A-Za-z]{3,9}\.?\s+\d{1,2},?\s+\d{4})"  # Jan 31, 2024
+)
+YEAR_RANGE = (1900, 2200)
+_DATETIME_CACHE: OrderedDict[tuple, bool] = OrderedDict()
+
+
+def _looks_datetime(s: pd.Series, sample: int, min_ratio: float) -> bool:
+    v = s.dropna()
+    if v.empty:
+        return False
+    v = v.iloc[:: max(1, len(v) // sample)].astype(str)
+    shaped = v.str.match(_DATE_LIKE)
+    if shaped.mean() < min_ratio:
+        return False
+    parsed = pd.to_datetime(v[shaped], errors="coerce", format="mixed")
+    years = parsed.dt.year
+    plausible = parsed.notna() & years.between(*YEAR_RANGE)
+    return plausible.sum() >= min_ratio * len(v)
+
+
+def datetime_columns(df: pd.DataFrame, sample: int = 500, min_ratio: float = 0.9) -> list[str]:
+    """
+    Datetime columns, plus text columns whose values (sampled) mostly look like
+    dates and parse to years in YEAR_RANGE. Text verdicts are cached per column content.
+    """
+    cols: list[str] = []
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            cols.append(c)
+            continue
+        if not (pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)):
+            continue
+        key = (_cache_key(df, c), sample, min_ratio)
+        hit = _DATETIME_CACHE.get(key)
+        if hit is None:
+            hit = _looks_datetime(s, sample, min_ratio)
+            _remember(_DATETIME_CACHE, key, hit)
+        if hit:
+            cols.append(c)
+    return cols
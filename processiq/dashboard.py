@@ -0,0 +1,115 @@
+# processiq/dashboard.py
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from processiq.backend import segment_mr_sum
+from processiq.spc import D2_MR, nelson_flags
+
+RULES = ("R1", "R2", "R3", "R4")
+
+
+def grouped_imr(x: np.ndarray, codes: np.ndarray, min_points: int = 10) -> pd.DataFrame:
+    """
+    I-MR limits and Nelson R1-R4 counts for every stream of one measurement.
+
+    x is in row (time) order; codes give each row's stream. NaNs are dropped per
+    stream, exactly as the single-chart view drops them, so counts match imr() +
+    nelson_rules_1_2_3_4() run on each stream separately.
+    """
+    order = np.argsort(codes, kind="stable")
+    return _grouped_imr_sorted(x[order], codes[order], min_points)
+
+
+def _grouped_imr_sorted(xs: np.ndarray, sc: np.ndarray, min_points: int) -> pd.DataFrame:
+    # xs / sc are already laid out stream by stream (row order kept within a stream)
+    ok = np.isfinite(xs)
+    xs, sc = xs[ok], sc[ok]
+    if xs.size == 0:
+        return pd.DataFrame(columns=["stream", "n", "mean", "sigma", "LCL", "UCL", *RULES, "violations"])
+
+    starts = np.flatnonzero(np.r_[True, sc[1:] != sc[:-1]])
+    n_seg = starts.size
+    lengths = np.diff(np.r_[starts, xs.size])
+    seg_id = np.repeat(np.arange(n_seg), lengths)
+    seg_pos = np.arange(xs.size) - np.repeat(starts, lengths)
+
+    mean = np.add.reduceat(xs, starts) / lengths
+    # Moving ranges that stay inside a stream
+    mr_sum = segment_mr_sum(xs, seg_id, n_seg)
+    mrbar = np.divide(mr_sum, lengths - 1, out=np.full(n_seg, np.nan), where=lengths > 1)
+    sigma = np.where(mrbar > 0, mrbar / D2_MR, np.nan)
+
+    z = (xs - mean[seg_id]) / sigma[seg_id]
+    counts = {r: np.zeros(n_seg, dtype=np.int64) for r in RULES}
+    for rule, _, mask in nelson_flags(z, seg_pos):
+        counts[rule] += np.bincount(seg_id[mask], minlength=n_seg)
+
+    out = pd.DataFrame(
+        {
+            "stream": sc[starts],
+            "n": lengths,
+            "mean": mean,
+            "sigma": sigma,
+            "LCL": mean - 3 * sigma,
+            "UCL": mean + 3 * sigma,
+            **counts,
+        }
+    )
+    out["violations"] = out[list(RULES)].sum(axis=1)
+    return out[out["n"] >= min_points].reset_index(drop=True)
+
+
+def _job(args) -> pd.DataFrame:
+    name, xs, sc, min_points = args
+    out = _grouped_imr_sorted(xs, sc, min_points)
+    out.insert(0, "measurement", name)
+    return out
+
+
+def stability_overview(
+    df: pd.DataFrame,
+    value_cols: list[str],
+    split_cols: list[str] | None = None,
+    min_points: int = 10,
+    workers: int | None = None,
+    parallel_threshold: int = 32,
+) -> pd.DataFrame:
+    """
+    Ranked stability table for every measurement × split-level stream.
+
+    Split levels are factorized once and shared by all measurements; batches of
+    at least parallel_threshold measurements are spread over a process pool.
+    """
+    split_cols = list(split_cols or [])
+    if split_cols:
+        keys = df[split_cols].astype("string").fillna("(blank)")
+        codes, levels = pd.MultiIndex.from_frame(keys).factorize()
+    else:
+        codes, levels = np.zeros(len(df), dtype=np.int64), None
+
+    # One stable sort serves every measurement
+    order = np.argsort(codes, kind="stable")
+    sc = np.asarray(codes)[order]
+    jobs = [(c, pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)[order], sc, min_points) for c in value_cols]
+    if workers != 1 and len(jobs) >= parallel_threshold:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(_job, jobs, chunksize=max(1, len(jobs) // 32)))
+    else:
+        parts = [_job(j) for j in jobs]
+
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame(columns=["measurement", *split_cols, "n", "mean", "sigma", "LCL", "UCL", *RULES, "violations", "violation_rate"])
+    out = pd.concat(parts, ignore_index=True)
+
+    if split_cols:
+        lv = levels[out["stream"].to_numpy()]
+        for i, c in enumerate(split_cols):
+            out.insert(1 + i, c, [t[i] for t in lv])
+    out = out.drop(columns="stream")
+    out["violation_rate"] = out["violations"] / out["n"]
+    return out.sort_values(["violations", "violation_rate"], ascending=False, ignore_index=True)
@@ -1,9 +1,17 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Optional, List
+import hashlib
+import io
+import time
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from processiq.columns import column_profiles, tag_dataset
+
 SUPPORTED_EXTS = (".csv", ".xlsx", ".xls")
 
 @dataclass
@@ -29,15 +37,167 @@ def load_table(uploaded_file) -> Optional[LoadedData]:
         return None
 
     df.columns = [str(c).strip() for c in df.columns]
+    tag_dataset(df)
     return LoadedData(df=df, source_name=name)
 
+SOURCE_FILE_COL = "source_file"
+
+
+@dataclass
+class MultiLoadedData:
+    df: pd.DataFrame
+    source_name: str
+    timings: pd.DataFrame  # one row per file: rows, columns, MB, parse seconds, status
+    notes: list[str] = field(default_factory=list)  # how column mismatches were reconciled
+
+
+def _read_bytes(name: str, data: bytes) -> tuple[pd.DataFrame, float]:
+    t0 = time.perf_counter()
+    lower = name.lower()
+    if lower.endswith(".csv"):
+        df = pd.read_csv(io.BytesIO(data))
+    elif lower.endswith((".xlsx", ".xls")):
+        df = pd.read_excel(io.BytesIO(data))
+    else:
+        raise ValueError(f"unsupported file type (use {', '.join(SUPPORTED_EXTS)})")
+    df.columns = [str(c).strip() for c in df.columns]
+    return df, time.perf_counter() - t0
+
+
+def _read_job(args):
+    name, data = args
+    try:
+        return _read_bytes(name, data) + (None,)
+    except Exception as e:
+        return None, 0.0, str(e)
+
+
+def _column_key(name: str) -> str:
+    return " ".join(str(name).split()).lower()
+
+
+def _kind(s: pd.Series) -> str:
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return "datetime"
+    return "text"
+
+
+def reconcile_columns(frames: list[tuple[str, pd.DataFrame]]) -> tuple[list[pd.DataFrame], list[str]]:
+    """
+    Give every frame the first file's spelling of each column (matched ignoring
+    case and repeated whitespace) and describe what differs between files:
+    renamed, missing or extra columns and columns whose type disagrees.
+    Missing columns become NaN when the frames are concatenated.
+    """
+    canonical: dict[str, str] = {}
+    for _, df in frames:
+        for c in df.columns:
+            canonical.setdefault(_column_key(c), c)
+    all_cols = list(canonical.values())
+
+    out, notes = [], []
+    kinds: dict[str, dict[str, list[str]]] = {}
+    for name, df in frames:
+        renames = {c: canonical[_column_key(c)] for c in df.columns if canonical[_column_key(c)] != c}
+        if renames:
+            df = df.rename(columns=renames)
+            notes.append(f"{name}: renamed " + ", ".join(f"'{a}' → '{b}'" for a, b in renames.items()))
+        for c in df.columns:
+            kinds.setdefault(c, {}).setdefault(_kind(df[c]), []).append(name)
+        out.append(df)
+
+    for c in all_cols:
+        absent = [name for (name, _), df in zip(frames, out) if c not in df.columns]
+        if absent:
+            shown = ", ".join(absent[:3]) + (" …" if len(absent) > 3 else "")
+            notes.append(f"'{c}' missing from {len(absent)} of {len(frames)} files ({shown}); left empty there.")
+    for c, by_kind in kinds.items():
+        if len(by_kind) > 1:
+            parts = "; ".join(f"{k} in {len(v)} file(s)" for k, v in by_kind.items())
+            notes.append(f"'{c}' has mixed types ({parts}); values are kept as-is and tools coerce numbers on use.")
+    return out, notes
+
+
+def load_tables(
+    files,
+    workers: int | None = None,
+    executor: str = "thread",
+    source_col: str = SOURCE_FILE_COL,
+) -> Optional[MultiLoadedData]:
+    """
+    Parse many CSV / Excel files concurrently and stack them into one dataset.
+
+    `files` are uploaded files (anything with .name and .getvalue()) or paths.
+    Files are parsed in a thread pool (executor="process" for a process pool),
+    columns are reconciled across files, and the frames are concatenated once
+    in the order given. `source_col` records each row's file as a categorical.
+    """
+    items = []
+    for f in files or []:
+        if isinstance(f, (str, Path)):
+            items.append((Path(f).name, Path(f).read_bytes()))
+        else:
+            items.append((f.name, f.getvalue()))
+    if not items:
+        return None
+
+    pool = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    if len(items) == 1 or workers == 1:
+        results = [_read_job(it) for it in items]
+    else:
+        with pool(max_workers=workers) as ex:
+            results = list(ex.map(_read_job, items))
+
+    timings = pd.DataFrame(
+        {
+            "file": [n for n, _ in items],
+            "rows": [len(df) if df is not None else 0 for df, _, _ in results],
+            "columns": [df.shape[1] if df is not None else 0 for df, _, _ in results],
+            "MB": [round(len(b) / 1e6, 2) for _, b in items],
+            "parse_s": [round(t, 4) for _, t, _ in results],
+            "status": ["ok" if err is None else f"error: {err}" for _, _, err in results],
+        }
+    )
+    parsed = [(name, df) for (name, _), (df, _, err) in zip(items, results) if err is None]
+    if not parsed:
+        st.error("Could not read any of the files: " + "; ".join(timings["status"]))
+        return None
+
+    frames, notes = reconcile_columns(parsed)
+    df = pd.concat(frames, ignore_index=True, sort=False)
+    while source_col in df.columns:
+        source_col += "_"
+    names = [n for n, _ in parsed]
+    labels = names if len(set(names)) == len(names) else [f"{i + 1}: {n}" for i, n in enumerate(names)]
+    # Integer codes + categories: no per-row copy of the file name
+    df[source_col] = pd.Categorical.from_codes(np.repeat(np.arange(len(frames)), [len(f) for f in frames]), categories=labels)
+    tag_dataset(df)
+    label = names[0] if len(names) == 1 else f"{len(names)} files ({names[0]} …)"
+    return MultiLoadedData(df=df, source_name=label, timings=timings, notes=notes)
+
 def coerce_numeric(s: pd.Series) -> pd.Series:
     return pd.to_numeric(s, errors="coerce")
 
 def infer_numeric_columns(df: pd.DataFrame, min_frac: float = 0.8) -> List[str]:
-    out = []
-    for c in df.columns:
-        x = pd.to_numeric(df[c], errors="coerce")
-        if x.notna().mean() >= min_frac and x.notna().sum() >= 3:
-            out.append(c)
-    return out
+    return [c for c, p in column_profiles(df).items() if p.numeric_frac >= min_frac and p.valid >= 3]
+
+def array_fingerprint(x: np.ndarray) -> str:
+    """Exact content hash of a numeric array (used as a cache key for derived results)."""
+    x = np.ascontiguousarray(x)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((x.dtype.str, x.shape)).encode("utf-8"))
+    h.update(x.view(np.uint8).reshape(-1))
+    return h.hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame, columns: list[str] | None = None) -> str:
+    """Content hash of selected DataFrame columns (names, order and values)."""
+    cols = list(df.columns) if columns is None else list(columns)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(cols).encode("utf-8"))
+    if cols:
+        rows = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+        h.update(array_fingerprint(rows).encode("utf-8"))
+    return h.hexdigest()
@@ -0,0 +1,296 @@
+# processiq/expressions.py
+"""
+Calculated columns from arithmetic expressions over existing columns.
+
+    defectives / sample_size_n
+    measurement - 0.0004 * (temp_C - 20)
+    where(`pressure_kPa` > 40, measurement, nan)
+
+Expressions are parsed with `ast` and checked against a whitelist (numbers,
+column names, arithmetic, comparisons, and / or / not, and the functions in
+FUNCTIONS); nothing is ever passed to eval(). Names with spaces or symbols go
+in backticks. Columns are read as floats (text is coerced, non-numbers become
+NaN) and the expression is evaluated vectorized in row chunks of CHUNK_ROWS,
+so temporaries stay small. numexpr is used per chunk when it is installed.
+
+add_calculated_column() evaluates the expression once, when the column is
+added, and inserts the result into the frame in place (the other columns are
+not copied); the definition is recorded in df.attrs, which copies and filters
+of the frame inherit. Evaluation is chunked but not deferred: every tool reads
+plain DataFrame columns, so a column computed on first read would need a lazy
+column type that pandas does not have. The cost is one float column per
+calculated column.
+"""
+from __future__ import annotations
+
+import ast
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from processiq.columns import DATASET_ID
+
+try:
+    import numexpr
+except ImportError:  # optional dependency
+    numexpr = None
+
+HAVE_NUMEXPR = numexpr is not None
+CHUNK_ROWS = 262_144
+CALCULATED = "processiq_calculated"  # df.attrs key: {column name: expression}
+MAX_LENGTH = 2_000  # characters
+MAX_DEPTH = 200  # syntax-tree levels; evaluation recurses once per level
+
+FUNCTIONS: dict[str, Callable] = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "log10": np.log10,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "floor": np.floor,
+    "ceil": np.ceil,
+    "round": np.round,
+    "where": np.where,
+    "clip": np.clip,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "isnan": np.isnan,
+}
+# (min, max) number of arguments; round's optional second argument is an integer literal
+ARITY: dict[str, tuple[int, int]] = {name: (1, 1) for name in FUNCTIONS}
+ARITY.update({"round": (1, 2), "where": (3, 3), "clip": (3, 3), "minimum": (2, 2), "maximum": (2, 2)})
+# numexpr spells a few of these differently or lacks them
+_NUMEXPR_FUNCS = {"abs", "sqrt", "exp", "log", "log10", "sin", "cos", "tan", "where"}
+CONSTANTS = {"pi": np.pi, "e": np.e, "nan": np.nan, "inf": np.inf}
+
+_BINOPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide,
+    ast.Mod: np.mod,
+    ast.Pow: np.power,
+}
+_CMPOPS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+_BACKTICK = re.compile(r"`([^`]+)`")
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+@dataclass
+class Expression:
+    """A validated expression; `columns` are the source columns it reads."""
+    text: str
+    columns: list[str]
+    _tree: ast.Expression
+    _aliases: dict[str, str]  # python identifier -> column name
+
+    def evaluate(self, df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS) -> np.ndarray:
+        """Float result for every row of df."""
+        n = len(df)
+        src = {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float, na_value=np.nan) for c in self.columns}
+        out = np.empty(n, dtype=float)
+        use_ne = HAVE_NUMEXPR and _numexpr_ok(self._tree)
+        with np.errstate(all="ignore"):
+            for i in range(0, n, chunk_rows):
+                env = {alias: src[col][i : i + chunk_rows] for alias, col in self._aliases.items()}
+                try:
+                    if use_ne:
+                        val = numexpr.evaluate(_numexpr_source(self._tree), local_dict={**CONSTANTS, **env})
+                    else:
+                        val = _eval(self._tree.body, env)
+                    out[i : i + chunk_rows] = val
+                except ExpressionError:
+                    raise
+                except Exception as e:  # whatever numpy rejects is still the expression's fault
+                    raise ExpressionError(f"Could not evaluate '{self.text}': {e}") from None
+        return out
+
+
+def parse_expression(text: str, columns) -> Expression:
+    """Validate `text` against the available column names; raises ExpressionError."""
+    columns = [str(c) for c in columns]
+    aliases: dict[str, str] = {}
+    # Backtick aliases must not collide with a real column name
+    prefix = "_c"
+    while any(c.startswith(prefix) for c in columns):
+        prefix = "_" + prefix
+
+    def quote(m: re.Match) -> str:
+        name = m.group(1)
+        if name not in columns:
+            raise ExpressionError(f"Unknown column `{name}`.")
+        alias = f"{prefix}{columns.index(name)}"
+        aliases[alias] = name
+        return alias
+
+    if len(text) > MAX_LENGTH:
+        raise ExpressionError(f"Expression is too long (more than {MAX_LENGTH:,} characters).")
+    src = _BACKTICK.sub(quote, text.strip())
+    if not src:
+        raise ExpressionError("Expression is empty.")
+    try:
+        tree = ast.parse(src, mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Syntax error: {e.msg}.") from None
+    except (RecursionError, MemoryError):
+        raise ExpressionError("Expression is nested too deeply.") from None
+    if _depth(tree) > MAX_DEPTH:
+        raise ExpressionError(f"Expression is nested too deeply (more than {MAX_DEPTH} levels).")
+
+    # Only a name in call position is a function; the same name used as a value must be a column
+    func_names = {id(n.func) for n in ast.walk(tree) if isinstance(n, ast.Call)}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id in aliases or id(node) in func_names:
+                continue
+            if node.id in columns:
+                aliases[node.id] = node.id
+            elif node.id not in CONSTANTS:
+                raise ExpressionError(f"Unknown name '{node.id}' (put column names with spaces or symbols in backticks).")
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ExpressionError(f"Only these functions are allowed: {', '.join(FUNCTIONS)}.")
+            name, (lo, hi) = node.func.id, ARITY[node.func.id]
+            if not lo <= len(node.args) <= hi:
+                want = str(lo) if lo == hi else f"{lo} or {hi}"
+                raise ExpressionError(f"{name}() takes {want} argument(s), got {len(node.args)}.")
+            if name == "round" and len(node.args) == 2 and _int_literal(node.args[1]) is None:
+                raise ExpressionError("round(x, digits): digits must be a whole number, e.g. round(x, 2).")
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+                raise ExpressionError("Only numeric constants are allowed.")
+        elif isinstance(node, ast.BinOp) and type(node.op) not in _BINOPS:
+            raise ExpressionError(f"Operator {type(node.op).__name__} is not allowed.")
+        elif isinstance(node, ast.Compare) and not all(type(op) in _CMPOPS for op in node.ops):
+            raise ExpressionError("Only <, <=, >, >=, == and != comparisons are allowed.")
+        elif isinstance(node, ast.UnaryOp) and not isinstance(node.op, (ast.USub, ast.UAdd, ast.Not)):
+            raise ExpressionError(f"Operator {type(node.op).__name__} is not allowed.")
+        elif not isinstance(
+            node,
+            (ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.Load,
+             ast.operator, ast.unaryop, ast.cmpop, ast.boolop),
+        ):
+            raise ExpressionError(f"'{type(node).__name__}' is not allowed in an expression.")
+
+    return Expression(text, sorted(set(aliases.values()), key=columns.index), tree, aliases)
+
+
+def _depth(tree: ast.AST) -> int:
+    """Nesting depth of tree, without recursing."""
+    deepest, stack = 0, [(tree, 1)]
+    while stack:
+        node, d = stack.pop()
+        deepest = max(deepest, d)
+        stack.extend((child, d + 1) for child in ast.iter_child_nodes(node))
+    return deepest
+
+
+def _int_literal(node: ast.AST) -> int | None:
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        v = _int_literal(node.operand)
+        return None if v is None else -v
+    if isinstance(node, ast.Constant) and isinstance(node.value, int) and not isinstance(node.value, bool):
+        return node.value
+    return None
+
+
+def _eval(node: ast.AST, env: dict[str, np.ndarray]):
+    if isinstance(node, ast.Constant):
+        return float(node.value)
+    if isinstance(node, ast.Name):
+        return env[node.id] if node.id in env else CONSTANTS[node.id]
+    if isinstance(node, ast.BinOp):
+        return _BINOPS[type(node.op)](_eval(node.left, env), _eval(node.right, env))
+    if isinstance(node, ast.UnaryOp):
+        v = _eval(node.operand, env)
+        if isinstance(node.op, ast.Not):
+            return np.logical_not(v)
+        return np.negative(v) if isinstance(node.op, ast.USub) else v
+    if isinstance(node, ast.BoolOp):
+        op = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        vals = [_eval(v, env) for v in node.values]
+        out = vals[0]
+        for v in vals[1:]:
+            out = op(out, v)
+        return out
+    if isinstance(node, ast.Compare):
+        left, out = _eval(node.left, env), True
+        for op, comp in zip(node.ops, node.comparators):
+            right = _eval(comp, env)
+            out = np.logical_and(out, _CMPOPS[type(op)](left, right))
+            left = right
+        return out
+    if isinstance(node, ast.Call):
+        if node.func.id == "round" and len(node.args) == 2:
+            return np.round(_eval(node.args[0], env), _int_literal(node.args[1]))
+        return FUNCTIONS[node.func.id](*(_eval(a, env) for a in node.args))
+    raise ExpressionError(f"'{type(node).__name__}' is not allowed in an expression.")  # unreachable after parse
+
+
+def _numexpr_ok(tree: ast.Expression) -> bool:
+    for n in ast.walk(tree):
+        if isinstance(n, (ast.FloorDiv, ast.BoolOp, ast.Not)):
+            return False
+        if isinstance(n, ast.Call) and n.func.id not in _NUMEXPR_FUNCS:
+            return False
+        if isinstance(n, ast.Compare) and len(n.ops) > 1:  # no chained comparisons
+            return False
+    return True
+
+
+def _numexpr_source(tree: ast.Expression) -> str:
+    return ast.unparse(tree)
+
+
+# ---------------------------------------------------------------------------
+# Registering on a frame
+# ---------------------------------------------------------------------------
+
+def calculated_columns(df: pd.DataFrame) -> dict[str, str]:
+    """Calculated columns of df and their expressions."""
+    return dict(df.attrs.get(CALCULATED, {}))
+
+
+def add_calculated_column(df: pd.DataFrame, name: str, text: str) -> pd.DataFrame:
+    """Evaluate `text` now and insert it as column `name` (in place; returns df)."""
+    name = str(name).strip()
+    if not name:
+        raise ExpressionError("Give the new column a name.")
+    existing = calculated_columns(df)
+    if name in df.columns and name not in existing:
+        raise ExpressionError(f"'{name}' is already a data column.")
+    # A calculated column may build on earlier ones, but not on itself
+    expr = parse_expression(text, [c for c in df.columns if c != name])
+    df[name] = expr.evaluate(df)
+    existing[name] = expr.text
+    df.attrs[CALCULATED] = existing
+    # The frame's content changed in place: a new dataset id keeps sampled-key caches from serving old results
+    df.attrs[DATASET_ID] = uuid.uuid4().hex
+    return df
+
+
+def drop_calculated_column(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    """df without calculated column `name` (columns built on it keep their values)."""
+    out = df.drop(columns=[name])
+    defs = calculated_columns(df)
+    defs.pop(name, None)
+    out.attrs[CALCULATED] = defs
+    return out
@@ -0,0 +1,410 @@
+# processiq/live.py
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator
+
+import numpy as np
+import pandas as pd
+
+from processiq.backend import moving_range_mean
+from processiq.multivariate import RunningCovariance, hotelling_t2, t2_ucl
+from processiq.sketch import QuantileSketch, quantile_summary
+from processiq.spc import ChartLine, imr_lines, imr_sigma_from_mrbar, nelson_rules_1_2_3_4
+
+# Nelson R4 looks back 8 points; keep that many z-values between batches
+RULE_TAIL = 7
+
+
+@dataclass
+class LiveChartState:
+    """
+    Incremental I-MR state for one characteristic.
+
+    Limits are estimated from the first `baseline` points and then frozen
+    (Phase II), so each new batch only touches its own points plus a short
+    tail for the run rules.
+    """
+    column: str
+    baseline: int = 25
+    history: int = 5000
+    n: int = 0
+    last: float | None = None
+    x_line: ChartLine | None = None
+    mr_line: ChartLine | None = None
+    sigma: float | None = None
+    base: list = field(default_factory=list)
+    tail: deque = field(default_factory=lambda: deque(maxlen=RULE_TAIL))
+    points: deque = field(default=None)  # (seq, x, mr)
+    alarms: deque = field(default=None)  # (seq, rule, value, detail, wall time)
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)  # every point, bounded memory
+
+    def __post_init__(self):
+        if self.points is None:
+            self.points = deque(maxlen=self.history)
+        if self.alarms is None:
+            self.alarms = deque(maxlen=self.history)
+
+    def update(self, values: np.ndarray) -> list[tuple]:
+        """Add new observations; returns the alarms they raised."""
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return []
+
+        self.sketch.update(values)
+        mr = np.abs(np.diff(values, prepend=np.nan if self.last is None else self.last))
+        start = self.n
+        self.n += values.size
+        self.last = float(values[-1])
+        self.points.extend(zip(range(start, self.n), values.tolist(), mr.tolist()))
+
+        if self.x_line is None:
+            self.base.extend(values[: self.baseline - len(self.base)].tolist())
+            if len(self.base) < self.baseline:
+                return []
+            self._freeze_limits()
+            # Judge everything seen so far (baseline included) against the new limits
+            start = self.points[0][0]
+            values = np.array([p[1] for p in self.points])
+
+        return self._check_rules(values, start)
+
+    def _freeze_limits(self) -> None:
+        base = np.asarray(self.base)
+        mrbar = moving_range_mean(base)
+        self.sigma = imr_sigma_from_mrbar(mrbar)
+        self.x_line, self.mr_line = imr_lines(float(np.mean(base)), mrbar)
+
+    def _check_rules(self, values: np.ndarray, start: int) -> list[tuple]:
+        if self.sigma is None:
+            return []
+        tail = np.array(self.tail, dtype=float)
+        viol = nelson_rules_1_2_3_4(
+            pd.Series(np.concatenate([tail, values])), center=self.x_line.center, sigma=self.sigma
+        )
+        self.tail.extend(values.tolist())
+
+        now = time.time()
+        new: list[tuple] = []
+        for rule, i, v, detail in viol.itertuples(index=False):
+            if i < tail.size:
+                continue  # already reported with the previous batch
+            alarm = (start + int(i) - tail.size, rule, float(v), detail, now)
+            self.alarms.append(alarm)
+            new.append(alarm)
+        return new
+
+    def since(self, seq: int) -> pd.DataFrame:
+        """Points with sequence number >= seq (what a chart has not drawn yet)."""
+        rows = [p for p in self.points if p[0] >= seq]
+        return pd.DataFrame(rows, columns=["seq", "X", "MR"])
+
+
+@dataclass
+class LiveT2State:
+    """
+    Incremental Hotelling T² over several characteristics.
+
+    Complete rows are absorbed into a RunningCovariance batch by batch until
+    `baseline` rows are in; the mean and covariance are then frozen. Baseline
+    rows are judged against the Phase I limit and every later row against the
+    Phase II limit, one vectorized pass per batch.
+    """
+    columns: list[str]
+    baseline: int = 25
+    alpha: float = 0.0027
+    history: int = 5000
+    n: int = 0
+    rc: RunningCovariance = None
+    base: list = field(default_factory=list)  # baseline rows, scored once the limits freeze
+    ucl: float | None = None  # Phase II, for rows after the baseline
+    baseline_ucl: float | None = None  # Phase I, for the baseline rows
+    error: str | None = None
+    points: deque = field(default=None)  # (seq, T², UCL)
+
+    def __post_init__(self):
+        # The covariance needs more complete rows than variables
+        self.baseline = max(int(self.baseline), len(self.columns) + 2)
+        if self.rc is None:
+            self.rc = RunningCovariance(len(self.columns))
+        if self.points is None:
+            self.points = deque(maxlen=self.history)
+
+    def update(self, X: np.ndarray) -> None:
+        """Add new rows (one column per characteristic); rows with a missing value are skipped."""
+        X = np.asarray(X, dtype=float)
+        X = X[np.isfinite(X).all(axis=1)]
+        if X.size == 0 or self.error:
+            return
+        if self.ucl is None:
+            take = X[: self.baseline - self.rc.n]
+            self.rc.update(take)
+            self.base.extend(take)
+            X = X[take.shape[0] :]
+            if self.rc.n < self.baseline:
+                return
+            self._freeze_limits()
+            if self.error:
+                return
+        self._score(X, self.ucl)
+
+    def _freeze_limits(self) -> None:
+        m, p = self.rc.n, len(self.columns)
+        self.baseline_ucl = t2_ucl(m, p, self.alpha, "I")
+        self.ucl = t2_ucl(m, p, self.alpha, "II")
+        base, self.base = np.asarray(self.base), []
+        self._score(base, self.baseline_ucl)
+
+    def _score(self, X: np.ndarray, ucl: float) -> None:
+        if X.shape[0] == 0:
+            return
+        try:
+            t2 = hotelling_t2(X, self.rc.mean, self.rc.cov)
+        except np.linalg.LinAlgError:
+            self.error = "Covariance matrix is singular (constant or perfectly correlated variables)."
+            return
+        start = self.n
+        self.n += t2.size
+        self.points.extend(zip(range(start, self.n), t2.tolist(), [ucl] * t2.size))
+
+    def since(self, seq: int) -> pd.DataFrame:
+        """Scored rows with sequence number >= seq."""
+        rows = [p for p in self.points if p[0] >= seq]
+        return pd.DataFrame(rows, columns=["seq", "T2", "UCL"])
+
+
+# ---------------------------------------------------------------------------
+# Feeds: async generators yielding DataFrames of new rows
+# ---------------------------------------------------------------------------
+
+async def tail_csv(path: str | Path, poll_s: float = 0.2, from_start: bool = True) -> AsyncIterator[pd.DataFrame]:
+    """Follow a growing CSV file. Partial last lines are held until completed."""
+    path = Path(path)
+    while not path.exists():
+        await asyncio.sleep(poll_s)
+
+    with path.open("r", newline="") as fh:
+        header = fh.readline()
+        while not header.endswith("\n"):
+            await asyncio.sleep(poll_s)
+            header += fh.readline()
+        columns = [c.strip() for c in next(csv.reader([header]))]
+        if not from_start:
+            fh.seek(0, 2)
+
+        pending = ""
+        while True:
+            chunk = fh.read()
+            if not chunk:
+                await asyncio.sleep(poll_s)
+                continue
+            complete, _, pending = (pending + chunk).rpartition("\n")
+            if complete.strip():
+                yield pd.read_csv(io.StringIO(complete), header=None, names=columns, skip_blank_lines=True)
+
+
+async def read_socket(host: str, port: int) -> AsyncIterator[pd.DataFrame]:
+    """Newline-delimited JSON objects ({"column": value, ...}) from a TCP socket."""
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            batch = [line]
+            # Drain whatever arrives within 50 ms so bursts become one update
+            deadline = loop.time() + 0.05
+            while len(batch) < 10_000:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    more = await asyncio.wait_for(reader.readline(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if not more:
+                    break
+                batch.append(more)
+
+            records = []
+            for raw in batch:
+                try:
+                    records.append(json.loads(raw))
+                except ValueError:
+                    continue
+            if records:
+                yield pd.DataFrame.from_records(records)
+    finally:
+        writer.close()
+
+
+def _sqlite_batch(path: str, table: str, after: int, limit: int) -> pd.DataFrame:
+    con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        quoted = '"' + table.replace('"', '""') + '"'
+        return pd.read_sql_query(
+            f"SELECT rowid AS _rowid_, * FROM {quoted} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            con,
+            params=(after, limit),
+        )
+    finally:
+        con.close()
+
+
+async def poll_sqlite(path: str | Path, table: str, poll_s: float = 0.2, batch: int = 50_000) -> AsyncIterator[pd.DataFrame]:
+    """Poll a SQLite table for rows with a rowid above the last one seen."""
+    after = 0
+    while True:
+        d = await asyncio.to_thread(_sqlite_batch, str(path), table, after, batch)
+        if d.empty:
+            await asyncio.sleep(poll_s)
+            continue
+        after = int(d["_rowid_"].iloc[-1])
+        yield d.drop(columns=["_rowid_"])
+
+
+# ---------------------------------------------------------------------------
+# Monitor: runs one feed on a background event loop
+# ---------------------------------------------------------------------------
+
+class LiveMonitor:
+    """
+    Runs a feed on its own asyncio loop (daemon thread) and keeps one
+    LiveChartState per numeric column, plus a LiveT2State over all of them
+    once there are two or more. Readers poll `since()` / `t2_since()` /
+    `alarms()` from any thread.
+    """
+
+    def __init__(self, feed_factory, columns: list[str] | None = None, baseline: int = 25, history: int = 5000):
+        self._feed_factory = feed_factory
+        self._columns = columns
+        self._baseline = baseline
+        self._history = history
+        self._states: dict[str, LiveChartState] = {}
+        self._t2: LiveT2State | None = None
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self.error: str | None = None
+        self.rows = 0
+        self.last_update: float | None = None
+        self.generation = 0  # bumped on every start; readers key their buffers on it
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        """
+        Start (or restart) the feed. The feeds replay from their beginning, so a
+        restart begins a fresh run: states, counters and sequence numbers reset.
+        """
+        if self.running:
+            return
+        with self._lock:
+            self._states = {}
+            self._t2 = None
+            self.rows = 0
+            self.last_update = None
+            self.generation += 1
+        self.error = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="processiq-live", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self.running and self._task is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                pass  # feed ended and the loop closed in between
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self._consume())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:  # surfaced to the page instead of killing the app
+            self.error = str(e)
+        finally:
+            self._loop.close()
+
+    async def _consume(self) -> None:
+        async for frame in self._feed_factory():
+            self.ingest(frame)
+
+    # ---- state ----
+    def ingest(self, frame: pd.DataFrame) -> None:
+        cols = self._columns or list(frame.columns)
+        with self._lock:
+            for c in cols:
+                if c not in frame.columns:
+                    continue
+                v = pd.to_numeric(frame[c], errors="coerce").to_numpy(dtype=float)
+                if c not in self._states:
+                    if not np.isfinite(v).any():
+                        continue  # not a measurement column
+                    self._states[c] = LiveChartState(c, baseline=self._baseline, history=self._history)
+                self._states[c].update(v)
+            # Multivariate chart over the columns known when it starts; later ones stay univariate
+            if self._t2 is None and len(self._states) >= 2:
+                self._t2 = LiveT2State(list(self._states), baseline=self._baseline, history=self._history)
+            if self._t2 is not None and all(c in frame.columns for c in self._t2.columns):
+                X = frame[self._t2.columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+                self._t2.update(X)
+            self.rows += len(frame)
+            self.last_update = time.time()
+
+    def columns(self) -> list[str]:
+        with self._lock:
+            return list(self._states)
+
+    def since(self, column: str, seq: int) -> tuple[pd.DataFrame, ChartLine | None, ChartLine | None]:
+        with self._lock:
+            s = self._states.get(column)
+            if s is None:
+                return pd.DataFrame(columns=["seq", "X", "MR"]), None, None
+            return s.since(seq), s.x_line, s.mr_line
+
+    def t2_since(self, seq: int) -> tuple[pd.DataFrame, list[str], str | None]:
+        """New T² points, the columns they cover and any error ([] before two columns are seen)."""
+        with self._lock:
+            t = self._t2
+            if t is None:
+                return pd.DataFrame(columns=["seq", "T2", "UCL"]), [], None
+            return t.since(seq), list(t.columns), t.error
+
+    def quantiles(self, column: str) -> pd.DataFrame:
+        """Quantile summary over the whole stream so far (not just the chart window)."""
+        with self._lock:
+            s = self._states.get(column)
+            if s is None or s.sketch.n == 0:
+                return pd.DataFrame(columns=["quantile", "value", "± rank error"])
+            return quantile_summary(s.sketch)
+
+    def alarms(self, column: str | None = None) -> pd.DataFrame:
+        with self._lock:
+            states = [self._states[column]] if column in self._states else list(self._states.values())
+            rows = [(s.column, *a) for s in states for a in s.alarms]
+        out = pd.DataFrame(rows, columns=["column", "seq", "rule", "value", "detail", "time"])
+        if len(out):
+            out["time"] = pd.to_datetime(out["time"], unit="s")
+        return out.sort_values("seq", ascending=False, ignore_index=True)
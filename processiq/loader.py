@@ -0,0 +1,122 @@
+# processiq/loader.py
+"""
+Background dataset loading with progress, cancellation and an early preview.
+
+A LoadJob parses an uploaded file on a worker thread. CSV parsing reads
+through a wrapper that counts bytes, so progress is bytes read / file size,
+and a cancel request stops the parser at its next read (every 256 KB). The
+first PREVIEW_ROWS rows are parsed first so they can be shown right away.
+The full parse is the same single read_csv call as data.load_table, so the
+resulting frame is identical.
+
+The worker never touches Streamlit; pages poll the job (see
+shared.loading_panel) and publish the result with state.set_df.
+"""
+from __future__ import annotations
+
+import io
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from processiq.columns import tag_dataset
+from processiq.data import SUPPORTED_EXTS, LoadedData
+
+PREVIEW_ROWS = 200
+BACKGROUND_BYTES = 5_000_000  # smaller uploads are parsed inline
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+class _CountingReader:
+    """Read-only file object that records progress and honours cancellation."""
+
+    def __init__(self, data: bytes, job: "LoadJob"):
+        self._buf = io.BytesIO(data)
+        self._job = job
+
+    def read(self, n: int = -1) -> bytes:
+        if self._job._cancel.is_set():
+            raise LoadCancelled()
+        chunk = self._buf.read(n)
+        self._job.bytes_read += len(chunk)
+        return chunk
+
+    def __iter__(self):
+        return iter(self.read().splitlines(keepends=True))
+
+
+@dataclass
+class LoadJob:
+    name: str
+    key: str  # identifies the upload, so a rerun does not start a second parse
+    total_bytes: int
+    status: str = "running"  # running | done | cancelled | error
+    bytes_read: int = 0
+    preview: pd.DataFrame | None = None
+    result: LoadedData | None = None
+    error: str | None = None
+    started: float = field(default_factory=time.perf_counter)
+    finished: float | None = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    _thread: threading.Thread | None = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    @property
+    def progress(self) -> float:
+        if self.status == "done":
+            return 1.0
+        return min(self.bytes_read / self.total_bytes, 0.99) if self.total_bytes else 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def wait(self, timeout: float | None = None) -> "LoadJob":
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self
+
+    def _run(self, data: bytes) -> None:
+        lower = self.name.lower()
+        try:
+            if lower.endswith(".csv"):
+                self.preview = pd.read_csv(io.BytesIO(data), nrows=PREVIEW_ROWS)
+                df = pd.read_csv(_CountingReader(data, self))
+            elif lower.endswith((".xlsx", ".xls")):
+                # Workbooks are zip archives: no useful partial progress
+                df = pd.read_excel(io.BytesIO(data))
+                self.bytes_read = self.total_bytes
+            else:
+                raise ValueError(f"Unsupported file type. Please upload: {', '.join(SUPPORTED_EXTS)}")
+            if self._cancel.is_set():
+                raise LoadCancelled()
+            df.columns = [str(c).strip() for c in df.columns]
+            tag_dataset(df)
+            self.result = LoadedData(df=df, source_name=self.name)
+            self.status = "done"
+        except LoadCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "error"
+        finally:
+            self.finished = time.perf_counter()
+
+
+def start_load(name: str, data: bytes, key: str | None = None) -> LoadJob:
+    """Start parsing `data` (the bytes of file `name`) on a daemon thread."""
+    job = LoadJob(name=name, key=key or f"{name}:{len(data)}", total_bytes=len(data))
+    job._thread = threading.Thread(target=job._run, args=(data,), name=f"processiq-load-{name}", daemon=True)
+    job._thread.start()
+    return job
@@ -3,6 +3,9 @@ from dataclasses import dataclass
 import numpy as np
 import pandas as pd
 
+from processiq.backend import moving_range_mean
+from processiq.spc import imr_sigma_from_mrbar
+
 @dataclass
 class CapabilityResult:
     n: int
@@ -18,11 +21,7 @@ def _stdev_within_i_mr(x: np.ndarray) -> float | None:
     # Estimate within sigma using MRbar / d2 (d2 for MR of 2 is 1.128)
     if len(x) < 2:
         return None
-    mr = np.abs(np.diff(x))
-    mrbar = float(np.mean(mr)) if len(mr) else float("nan")
-    if not np.isfinite(mrbar) or mrbar <= 0:
-        return None
-    return mrbar / 1.128
+    return imr_sigma_from_mrbar(moving_range_mean(x))
 
 def capability(x: pd.Series, lsl: float | None, usl: float | None) -> CapabilityResult:
     x = pd.to_numeric(x, errors="coerce").dropna().to_numpy()
@@ -33,6 +32,18 @@ def capability(x: pd.Series, lsl: float | None, usl: float | None) -> Capability
     mean = float(np.mean(x))
     st_overall = float(np.std(x, ddof=1)) if n > 1 else None
     st_within = _stdev_within_i_mr(x)
+    return capability_from_stats(n, mean, st_within, st_overall, lsl, usl)
+
+
+def capability_from_stats(
+    n: int,
+    mean: float,
+    st_within: float | None,
+    st_overall: float | None,
+    lsl: float | None,
+    usl: float | None,
+) -> CapabilityResult:
+    """Indices from already-reduced statistics (e.g. a merged summary.Summary)."""
 
     def calc_cp(st):
         if st is None or not np.isfinite(st) or st <= 0 or lsl is None or usl is None:
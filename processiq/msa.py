@@ -1,5 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
+import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 import statsmodels.formula.api as smf
@@ -67,23 +68,134 @@ def gage_rr_crossed_anova(df: pd.DataFrame, part_col: str, op_col: str, y_col: s
     ms_int  = float(aov.loc[row_int, "mean_sq"])
     ms_err  = float(aov.loc[row_err, "mean_sq"])
 
+    comp = _variance_components(ms_part, ms_op, ms_int, ms_err, parts, ops, repeats)
+    return GRRResult(
+        n=n, parts=parts, operators=ops, repeats=repeats,
+        var_repeat=float(comp["var_repeat"]), var_repro=float(comp["var_repro"]),
+        var_part=float(comp["var_part"]), var_total=float(comp["var_total"]),
+        pct_grr=float(comp["pct_grr"]), pct_repeat=float(comp["pct_repeat"]),
+        pct_repro=float(comp["pct_repro"]), pct_part=float(comp["pct_part"]),
+    )
+
+def _variance_components(ms_part, ms_op, ms_int, ms_err, parts, ops, repeats) -> dict:
+    """Crossed GRR variance components and % contribution (scalars or arrays)."""
+    ms_part, ms_op, ms_int, ms_err = (np.asarray(v, dtype=float) for v in (ms_part, ms_op, ms_int, ms_err))
+
     # Variance components (common crossed GRR approximation)
     var_repeat = ms_err
-    var_repro_main = max((ms_op - ms_int) / (parts * repeats), 0.0)
-    var_int = max((ms_int - ms_err) / repeats, 0.0)
+    var_repro_main = np.maximum((ms_op - ms_int) / (parts * repeats), 0.0)
+    var_int = np.maximum((ms_int - ms_err) / repeats, 0.0)
 
     # Include interaction in reproducibility bucket (common in practice)
     var_repro_total = var_repro_main + var_int
-    var_part = max((ms_part - ms_int) / (ops * repeats), 0.0)
+    var_part = np.maximum((ms_part - ms_int) / (ops * repeats), 0.0)
 
     var_grr = var_repeat + var_repro_total
     var_total = var_grr + var_part
 
-    def pct(v: float) -> float:
-        return 100.0 * (v / var_total) if var_total > 0 else float("nan")
-
-    return GRRResult(
-        n=n, parts=parts, operators=ops, repeats=repeats,
-        var_repeat=var_repeat, var_repro=var_repro_total, var_part=var_part, var_total=var_total,
-        pct_grr=pct(var_grr), pct_repeat=pct(var_repeat), pct_repro=pct(var_repro_total), pct_part=pct(var_part)
-    )
+    def pct(v):
+        return 100.0 * np.divide(v, var_total, out=np.full(np.shape(v), np.nan), where=var_total > 0)
+
+    return {
+        "var_repeat": var_repeat, "var_repro": var_repro_total, "var_part": var_part, "var_total": var_total,
+        "pct_grr": pct(var_grr), "pct_repeat": pct(var_repeat), "pct_repro": pct(var_repro_total), "pct_part": pct(var_part),
+    }
+
+def _study_var(comp: dict) -> dict:
+    """%StudyVar (ratio of standard deviations) and ndc = floor(1.41 * PV / GRR)."""
+    var_grr = comp["var_repeat"] + comp["var_repro"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sd_total = np.sqrt(comp["var_total"])
+        ndc = np.floor(1.41 * np.sqrt(comp["var_part"]) / np.sqrt(var_grr))
+        return {
+            "pct_studyvar_grr": 100.0 * np.sqrt(var_grr) / sd_total,
+            "pct_studyvar_repeat": 100.0 * np.sqrt(comp["var_repeat"]) / sd_total,
+            "pct_studyvar_repro": 100.0 * np.sqrt(comp["var_repro"]) / sd_total,
+            "ndc": np.where(np.isfinite(ndc), ndc, np.nan),
+        }
+
+BATCH_COLUMNS = [
+    "feature", "n", "parts", "operators", "repeats",
+    "var_repeat", "var_repro", "var_part", "var_total",
+    "pct_grr", "pct_repeat", "pct_repro", "pct_part",
+    "pct_studyvar_grr", "pct_studyvar_repeat", "pct_studyvar_repro", "ndc", "method",
+]
+
+def gage_rr_batch(df: pd.DataFrame, part_col: str, op_col: str, y_cols) -> pd.DataFrame:
+    """
+    Crossed ANOVA Gage R&R for many measurement columns over one Part × Operator design.
+
+    Rows are sorted into Part×Operator cells once; for every column whose
+    non-missing values form a full, balanced design (same count >= 2 in every
+    cell) the sums of squares come from one pass over the (rows × columns)
+    matrix, identical to gage_rr_crossed_anova. Other columns fall back to
+    gage_rr_crossed_anova one at a time. One row per column, worst %GRR first.
+    """
+    y_cols = list(y_cols)
+    keys = df[[part_col, op_col]]
+    rows = np.flatnonzero(keys.notna().all(axis=1).to_numpy())
+    pc, _ = pd.factorize(keys[part_col].iloc[rows])
+    oc, ou = pd.factorize(keys[op_col].iloc[rows])
+    p, o = int(pc.max()) + 1 if rows.size else 0, len(ou)
+    cell = pc.astype(np.int64) * o + oc
+    order = np.argsort(cell, kind="stable")
+    rows, cell = rows[order], cell[order]
+    starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]]) if rows.size else np.array([], dtype=np.int64)
+    full_grid = starts.size == p * o and p >= 2 and o >= 2
+    cell_pos = np.repeat(np.arange(starts.size), np.diff(np.r_[starts, rows.size]))
+
+    Y = np.column_stack(
+        [pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float, na_value=np.nan)[rows] for c in y_cols]
+    ) if y_cols else np.empty((rows.size, 0))
+    ok = np.isfinite(Y)
+    if starts.size:
+        cnt = np.add.reduceat(ok.astype(np.int64), starts, axis=0)
+        r = cnt.min(axis=0)
+        balanced = full_grid & (r == cnt.max(axis=0)) & (r >= 2)
+    else:
+        r = np.zeros(len(y_cols), dtype=np.int64)
+        balanced = np.zeros(len(y_cols), dtype=bool)
+
+    out = []
+    b = np.flatnonzero(balanced)
+    if b.size:
+        rb = r[b].astype(float)
+        Z = np.where(ok[:, b], Y[:, b], 0.0)
+        cm = np.add.reduceat(Z, starts, axis=0) / rb  # cell means, (p*o, k)
+        grid = cm.reshape(p, o, b.size)
+        m = grid.mean(axis=(0, 1))
+        ss_part = o * rb * ((grid.mean(axis=1) - m) ** 2).sum(axis=0)
+        ss_op = p * rb * ((grid.mean(axis=0) - m) ** 2).sum(axis=0)
+        ss_cell = rb * ((cm - m) ** 2).sum(axis=0)
+        ss_err = (np.where(ok[:, b], Y[:, b] - cm[cell_pos], 0.0) ** 2).sum(axis=0)
+        ms = (
+            ss_part / (p - 1),
+            ss_op / (o - 1),
+            (ss_cell - ss_part - ss_op) / ((p - 1) * (o - 1)),
+            ss_err / (p * o * (rb - 1)),
+        )
+        comp = _variance_components(*ms, p, o, rb)
+        comp.update(_study_var(comp))
+        out.append(pd.DataFrame({
+            "feature": [y_cols[i] for i in b], "n": (p * o * r[b]).astype(np.int64),
+            "parts": p, "operators": o, "repeats": r[b].astype(np.int64), **comp, "method": "batch",
+        }))
+
+    rest = []
+    for i in np.flatnonzero(~balanced):
+        try:
+            res = gage_rr_crossed_anova(df, part_col=part_col, op_col=op_col, y_col=y_cols[i])
+        except Exception:
+            rest.append({"feature": y_cols[i], "method": "failed"})
+            continue
+        row = {k: getattr(res, k) for k in BATCH_COLUMNS if hasattr(res, k)}
+        row.update({k: float(v) for k, v in _study_var(vars(res)).items()})
+        rest.append({"feature": y_cols[i], **row, "method": "single (unbalanced)"})
+    if rest:
+        out.append(pd.DataFrame(rest))
+
+    if not out:
+        return pd.DataFrame(columns=BATCH_COLUMNS)
+    table = pd.concat(out, ignore_index=True).reindex(columns=BATCH_COLUMNS)
+    table = table.astype({c: "Int64" for c in ("n", "parts", "operators", "repeats")})
+    return table.sort_values("pct_grr", ascending=False, na_position="last", kind="stable").reset_index(drop=True)
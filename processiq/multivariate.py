@@ -0,0 +1,145 @@
+# processiq/multivariate.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+from scipy.stats import beta, f
+
+
+@dataclass
+class RunningCovariance:
+    """
+    Mean and co-moment matrix that absorb new rows in batches.
+    Batches are combined with the pairwise (Chan et al.) update, so the
+    result equals the two-pass covariance of everything seen so far.
+    """
+    p: int
+    n: int = 0
+    mean: np.ndarray = field(default=None)
+    m2: np.ndarray = field(default=None)  # sum of outer products of deviations
+
+    def __post_init__(self):
+        if self.mean is None:
+            self.mean = np.zeros(self.p)
+        if self.m2 is None:
+            self.m2 = np.zeros((self.p, self.p))
+
+    @classmethod
+    def from_array(cls, X: np.ndarray) -> "RunningCovariance":
+        rc = cls(np.asarray(X).shape[1])
+        rc.update(X)
+        return rc
+
+    def update(self, X: np.ndarray) -> "RunningCovariance":
+        X = np.asarray(X, dtype=float)
+        nb = X.shape[0]
+        if nb == 0:
+            return self
+        mb = X.mean(axis=0)
+        D = X - mb
+        return self.merge(RunningCovariance(self.p, nb, mb, D.T @ D))
+
+    def merge(self, other: "RunningCovariance") -> "RunningCovariance":
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + np.outer(delta, delta) * (self.n * other.n / n)
+        self.mean = self.mean + delta * (other.n / n)
+        self.n = n
+        return self
+
+    @property
+    def cov(self) -> np.ndarray:
+        return self.m2 / (self.n - 1) if self.n > 1 else np.full((self.p, self.p), np.nan)
+
+
+def t2_ucl(m: int, p: int, alpha: float = 0.0027, phase: str = "I") -> float:
+    """
+    UCL for individual-observation T².
+    Phase I (limits from the same data): ((m-1)^2/m) * Beta(1-alpha; p/2, (m-p-1)/2).
+    Phase II (new data vs a baseline of m rows): p(m+1)(m-1)/(m(m-p)) * F(1-alpha; p, m-p).
+    """
+    if m <= p + 1:
+        return float("nan")
+    if phase == "I":
+        return float((m - 1) ** 2 / m * beta.ppf(1 - alpha, p / 2.0, (m - p - 1) / 2.0))
+    return float(p * (m + 1) * (m - 1) / (m * (m - p)) * f.ppf(1 - alpha, p, m - p))
+
+
+def hotelling_t2(X: np.ndarray, mean: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """T² (squared Mahalanobis distance) of every row: one Cholesky, one triangular solve."""
+    L = np.linalg.cholesky(cov)
+    Y = solve_triangular(L, (np.asarray(X, dtype=float) - mean).T, lower=True, check_finite=False)
+    return np.einsum("ij,ij->j", Y, Y)
+
+
+def t2_contributions(X: np.ndarray, mean: np.ndarray, cov: np.ndarray) -> np.ndarray:
+    """
+    Per-variable contribution to each row's T²: how much T² drops when
+    variable j is left out, w_j^2 / (S^-1)_jj with w = S^-1 (x - mean).
+    """
+    c = cho_factor(cov)
+    inv_diag = np.diag(cho_solve(c, np.eye(cov.shape[0])))
+    W = cho_solve(c, (np.asarray(X, dtype=float) - mean).T).T
+    return W * W / inv_diag
+
+
+@dataclass
+class T2Chart:
+    columns: list[str]
+    t2: np.ndarray
+    ucl: float  # limit for rows beyond the baseline (Phase II), or for every row (Phase I)
+    baseline_ucl: float  # Phase I limit for the baseline rows
+    mean: np.ndarray
+    cov: np.ndarray
+    baseline: int  # rows used for mean / covariance
+    phase: str  # "I" or "II" (points beyond the baseline)
+    rows: np.ndarray  # original row labels of the complete cases
+
+    @property
+    def limits(self) -> np.ndarray:
+        """UCL of every row: baseline rows were part of the estimate, later rows were not."""
+        lim = np.full(self.t2.size, self.ucl)
+        lim[: self.baseline] = self.baseline_ucl
+        return lim
+
+    @property
+    def signal(self) -> np.ndarray:
+        return self.t2 > self.limits
+
+    def contributions(self, X: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(t2_contributions(X, self.mean, self.cov), columns=self.columns)
+
+
+def t2_chart(df: pd.DataFrame, columns: list[str], baseline: int | None = None, alpha: float = 0.0027) -> tuple[T2Chart, np.ndarray]:
+    """
+    Hotelling T² over complete cases of `columns`.
+    With baseline=None every row estimates the covariance (Phase I); otherwise
+    the first `baseline` rows do and later rows are scored against them (Phase II).
+    The baseline rows are always judged against the Phase I limit, since they
+    helped estimate the mean and covariance. Returns the chart and the data matrix it was computed on.
+    """
+    d = df[columns].apply(pd.to_numeric, errors="coerce")
+    ok = d.notna().all(axis=1).to_numpy()
+    X = d.to_numpy(dtype=float)[ok]
+    m, p = X.shape
+    if p < 2:
+        raise ValueError("Pick at least two variables.")
+    base = m if baseline is None else min(int(baseline), m)
+    if base <= p + 1:
+        raise ValueError(f"Need more than {p + 1} complete rows for the baseline (have {base}).")
+
+    rc = RunningCovariance.from_array(X[:base])
+    try:
+        t2 = hotelling_t2(X, rc.mean, rc.cov)
+    except np.linalg.LinAlgError:
+        raise ValueError("Covariance matrix is singular (constant or perfectly correlated variables).") from None
+
+    phase = "I" if base == m else "II"
+    ucl = t2_ucl(base, p, alpha, phase)
+    baseline_ucl = ucl if phase == "I" else t2_ucl(base, p, alpha, "I")
+    return T2Chart(list(columns), t2, ucl, baseline_ucl, rc.mean, rc.cov, base, phase, df.index.to_numpy()[ok]), X
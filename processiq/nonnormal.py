@@ -0,0 +1,303 @@
+# processiq/nonnormal.py
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from scipy.special import boxcox, inv_boxcox, ndtr, ndtri
+
+from processiq.data import array_fingerprint
+
+# Percentiles that play the role of mean ± 3σ in the ISO 22514 / Clements method
+P_LO = ndtr(-3.0)   # 0.00135
+P_HI = ndtr(3.0)    # 0.99865
+
+# scipy name, label, needs strictly positive data (fitted with loc fixed at 0)
+CANDIDATES = {
+    "normal": ("norm", "Normal", False),
+    "lognormal": ("lognorm", "Lognormal", True),
+    "weibull": ("weibull_min", "Weibull", True),
+    "gamma": ("gamma", "Gamma", True),
+    "boxcox": ("boxcox", "Box-Cox", True),
+    "johnson": ("johnson", "Johnson", False),
+}
+
+# Slifker-Shapiro z values scanned for the Johnson fit (best A² wins)
+JOHNSON_Z = np.linspace(0.25, 1.25, 11)
+
+# Fits use at most this many points (evenly strided over the sorted data)
+MAX_FIT_POINTS = 20_000
+
+_CACHE: OrderedDict[tuple, list["DistributionFit"]] = OrderedDict()
+_CACHE_SIZE = 1024
+
+
+class _BoxCox:
+    """Normal model on the Box-Cox scale, exposed with a scipy-like cdf/ppf/pdf."""
+
+    def __init__(self, lam: float, mu: float, sigma: float):
+        self.lam, self.mu, self.sigma = lam, mu, sigma
+
+    def cdf(self, x):
+        x = np.asarray(x, dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (boxcox(np.where(x > 0, x, np.nan), self.lam) - self.mu) / self.sigma
+        return np.where(x > 0, ndtr(z), 0.0)
+
+    def ppf(self, q):
+        return inv_boxcox(self.mu + self.sigma * ndtri(q), self.lam)
+
+    def pdf(self, x):
+        x = np.asarray(x, dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            xp = np.where(x > 0, x, np.nan)
+            z = (boxcox(xp, self.lam) - self.mu) / self.sigma
+            d = np.exp(-0.5 * z * z) / (self.sigma * np.sqrt(2.0 * np.pi)) * xp ** (self.lam - 1.0)
+        return np.nan_to_num(d)
+
+
+@dataclass
+class DistributionFit:
+    key: str
+    label: str
+    family: str  # scipy.stats name, or "boxcox"
+    params: tuple
+    ad: float
+    p_lo: float
+    p_med: float
+    p_hi: float
+
+    def frozen(self):
+        if self.family == "boxcox":
+            return _BoxCox(*self.params)
+        return getattr(stats, self.family)(*self.params)
+
+
+@dataclass
+class PercentileCapability:
+    distribution: str
+    pp: float | None
+    ppk: float | None
+    ppu: float | None
+    ppl: float | None
+    exp_ppm: float | None
+
+
+def anderson_darling(sorted_x: np.ndarray, cdf) -> float:
+    """A² of sorted data against a fitted cdf (smaller = better fit)."""
+    n = sorted_x.size
+    f = np.clip(cdf(sorted_x), 1e-300, 1 - 1e-16)
+    i = np.arange(1, n + 1)
+    return float(-n - np.sum((2 * i - 1) * (np.log(f) + np.log1p(-f[::-1]))) / n)
+
+
+def _fit_sample(x: np.ndarray) -> np.ndarray:
+    xs = np.sort(x[np.isfinite(x)])
+    if xs.size > MAX_FIT_POINTS:
+        xs = xs[np.linspace(0, xs.size - 1, MAX_FIT_POINTS).round().astype(np.int64)]
+    return xs
+
+
+def _johnson_params(xs: np.ndarray, z: float) -> tuple[str, str, tuple] | None:
+    """
+    Slifker-Shapiro percentile fit: picks SU / SB / SL from the quantiles at
+    ±z and ±3z and solves the parameters in closed form.
+    """
+    x1, x2, x3, x4 = np.quantile(xs, ndtr(np.array([-3 * z, -z, z, 3 * z])))
+    m, n, p = x4 - x3, x2 - x1, x3 - x2
+    if m <= 0 or n <= 0 or p <= 0:
+        return None
+    mp, np_ = m / p, n / p
+    q = mp * np_
+
+    if abs(q - 1.0) < 1e-6:
+        # SL: three-parameter lognormal
+        if abs(mp - 1.0) < 1e-9:
+            return None
+        eta = 2 * z / np.log(mp)
+        gamma = eta * np.log((mp - 1) / (p * np.sqrt(mp)))
+        eps = (x2 + x3) / 2 - p / 2 * (mp + 1) / (mp - 1)
+        return "Johnson SL", "lognorm", (1.0 / eta, eps, np.exp(-gamma / eta))
+
+    if q > 1.0:
+        eta = 2 * z / np.arccosh(0.5 * (mp + np_))
+        gamma = eta * np.arcsinh((np_ - mp) / (2 * np.sqrt(q - 1)))
+        lam = 2 * p * np.sqrt(q - 1) / ((mp + np_ - 2) * np.sqrt(mp + np_ + 2))
+        eps = (x2 + x3) / 2 + p * (np_ - mp) / (2 * (mp + np_ - 2))
+        return "Johnson SU", "johnsonsu", (gamma, eta, eps, lam)
+
+    pm, pn = p / m, p / n
+    r = (1 + pm) * (1 + pn)
+    eta = z / np.arccosh(0.5 * np.sqrt(r))
+    gamma = eta * np.arcsinh((pn - pm) * np.sqrt(r - 4) / (2 * (pm * pn - 1)))
+    lam = p * np.sqrt((r - 2) ** 2 - 4) / (pm * pn - 1)
+    eps = (x2 + x3) / 2 - lam / 2 + p * (pn - pm) / (2 * (pm * pn - 1))
+    return "Johnson SB", "johnsonsb", (gamma, eta, eps, lam)
+
+
+def _finish(key: str, label: str, family: str, params: tuple, xs: np.ndarray) -> DistributionFit | None:
+    params = tuple(float(v) for v in params)
+    if not all(np.isfinite(params)):
+        return None
+    fit = DistributionFit(key, label, family, params, float("nan"), float("nan"), float("nan"), float("nan"))
+    dist = fit.frozen()
+    with np.errstate(all="ignore"):
+        fit.ad = anderson_darling(xs, dist.cdf)
+        fit.p_lo, fit.p_med, fit.p_hi = (float(v) for v in dist.ppf([P_LO, 0.5, P_HI]))
+    if not np.isfinite(fit.ad):
+        return None
+    return fit
+
+
+def _fit_one(key: str, xs: np.ndarray) -> DistributionFit | None:
+    family, label, positive = CANDIDATES[key]
+    if positive and xs[0] <= 0:
+        return None
+
+    if key == "johnson":
+        best = None
+        with np.errstate(all="ignore"):
+            for z in JOHNSON_Z:
+                sol = _johnson_params(xs, float(z))
+                if sol is None:
+                    continue
+                f = _finish(key, sol[0], sol[1], sol[2], xs)
+                if f is not None and (best is None or f.ad < best.ad):
+                    best = f
+        return best
+
+    try:
+        if key == "normal":
+            params = (np.mean(xs), np.std(xs, ddof=1))
+        elif key == "boxcox":
+            y, lam = stats.boxcox(xs)
+            params = (lam, np.mean(y), np.std(y, ddof=1))
+        else:
+            params = getattr(stats, family).fit(xs, floc=0)
+    except Exception:
+        return None
+    return _finish(key, label, family, params, xs)
+
+
+def fit_distributions(x, candidates: tuple[str, ...] = tuple(CANDIDATES)) -> list[DistributionFit]:
+    """
+    Fit every candidate and return them sorted by Anderson-Darling A².
+    Results are cached by column fingerprint.
+    """
+    x = np.asarray(x, dtype=float)
+    key = (array_fingerprint(x), tuple(candidates))
+    if key in _CACHE:
+        _CACHE.move_to_end(key)
+        return _CACHE[key]
+
+    xs = _fit_sample(x)
+    fits: list[DistributionFit] = []
+    if xs.size >= 5:
+        for c in candidates:
+            f = _fit_one(c, xs)
+            if f is not None:
+                fits.append(f)
+        fits.sort(key=lambda f: f.ad)
+
+    _remember(key, fits)
+    return fits
+
+
+def _remember(key: tuple, fits: list[DistributionFit]) -> None:
+    _CACHE[key] = fits
+    while len(_CACHE) > _CACHE_SIZE:
+        _CACHE.popitem(last=False)
+
+
+def fits_table(fits: list[DistributionFit]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "distribution": [f.label for f in fits],
+            "AD": [f.ad for f in fits],
+            "P0.135": [f.p_lo for f in fits],
+            "P50": [f.p_med for f in fits],
+            "P99.865": [f.p_hi for f in fits],
+        }
+    )
+
+
+def percentile_indices(
+    p_lo: float, p_med: float, p_hi: float, lsl: float | None, usl: float | None
+) -> tuple[float | None, float | None, float | None, float | None]:
+    """(Pp, Ppk, Ppu, Ppl) from P0.135 / P50 / P99.865, however they were estimated."""
+
+    def ratio(num: float, den: float) -> float | None:
+        if not np.isfinite(num) or not np.isfinite(den) or den <= 0:
+            return None
+        return num / den
+
+    pp = ratio(usl - lsl, p_hi - p_lo) if lsl is not None and usl is not None else None
+    ppu = ratio(usl - p_med, p_hi - p_med) if usl is not None else None
+    ppl = ratio(p_med - lsl, p_med - p_lo) if lsl is not None else None
+    sides = [v for v in (ppu, ppl) if v is not None]
+    ppk = min(sides) if sides else None
+    return pp, ppk, ppu, ppl
+
+
+def percentile_capability(fit: DistributionFit, lsl: float | None, usl: float | None) -> PercentileCapability:
+    """Percentile-method Pp/Ppk: 6σ spread replaced by P99.865 − P0.135, mean by the median."""
+    pp, ppk, ppu, ppl = percentile_indices(fit.p_lo, fit.p_med, fit.p_hi, lsl, usl)
+
+    dist = fit.frozen()
+    p_low = float(dist.cdf(lsl)) if lsl is not None else 0.0
+    p_high = 1.0 - float(dist.cdf(usl)) if usl is not None else 0.0
+    exp_ppm = (p_low + p_high) * 1_000_000
+    return PercentileCapability(fit.label, pp, ppk, ppu, ppl, exp_ppm if np.isfinite(exp_ppm) else None)
+
+
+def _best_job(args):
+    x, candidates = args
+    return fit_distributions(x, candidates)
+
+
+def fit_batch(
+    columns: dict[str, np.ndarray],
+    specs: dict[str, tuple[float | None, float | None]] | None = None,
+    candidates: tuple[str, ...] = tuple(CANDIDATES),
+    workers: int | None = None,
+    parallel_threshold: int = 16,
+) -> pd.DataFrame:
+    """
+    Best-fit distribution + percentile capability for many columns.
+
+    Columns already in the fingerprint cache are answered without refitting;
+    the rest fan out to a process pool when the batch is large enough.
+    """
+    specs = specs or {}
+    names = list(columns)
+    arrays = {c: np.asarray(columns[c], dtype=float) for c in names}
+    todo = [c for c in names if (array_fingerprint(arrays[c]), tuple(candidates)) not in _CACHE]
+
+    if workers != 1 and len(todo) >= parallel_threshold:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            fitted = list(ex.map(_best_job, [(arrays[c], candidates) for c in todo], chunksize=max(1, len(todo) // 32)))
+        for c, fits in zip(todo, fitted):
+            _remember((array_fingerprint(arrays[c]), tuple(candidates)), fits)
+
+    rows = []
+    for c in names:
+        fits = fit_distributions(arrays[c], candidates)
+        row: dict[str, object] = {"column": c, "n": int(np.isfinite(arrays[c]).sum())}
+        if fits:
+            best = fits[0]
+            cap = percentile_capability(best, *specs.get(c, (None, None)))
+            row.update(
+                {
+                    "best_fit": best.label,
+                    "AD": best.ad,
+                    "Pp": cap.pp,
+                    "Ppk": cap.ppk,
+                    "Expected PPM": cap.exp_ppm,
+                }
+            )
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,178 @@
+# processiq/profiling.py
+"""
+Whole-dataset profile: null rates, ranges, moments, robust outlier counts,
+top categories and small histograms for every column.
+
+Numeric columns are processed in blocks of columns as one 2-D array, so each
+statistic is a single vectorized reduction over the block. Null counts,
+min / max, mean / std and both outlier counts are exact. The outlier fences
+(quartiles, median, MAD) and the histograms come from a stratified sample of
+PROFILE_SAMPLE rows; with fewer rows they are exact too.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from processiq.columns import _sample_positions, distinct_count
+
+PROFILE_SAMPLE = 20_000
+BLOCK_CELLS = 16_000_000  # numeric values per block (~128 MB as float64)
+HIST_BINS = 20
+IQR_K = 1.5
+MAD_Z = 3.5  # modified z-score cut-off (Iglewicz & Hoaglin)
+TOP_K = 3
+DISTINCT_CAP = 1_000
+
+
+@dataclass
+class DataProfile:
+    rows: int
+    columns: int
+    numeric: pd.DataFrame  # one row per numeric column (histogram = list of bin counts)
+    other: pd.DataFrame  # text / category / bool / datetime columns
+    seconds: float
+
+    @property
+    def null_rate(self) -> float:
+        cells = self.rows * self.columns
+        nulls = int(self.numeric["nulls"].sum()) + int(self.other["nulls"].sum())
+        return nulls / cells if cells else 0.0
+
+    def report_tables(self) -> list[tuple[str, pd.DataFrame]]:
+        """Tables for HTML reports (histogram lists dropped)."""
+        out = []
+        if len(self.numeric):
+            out.append(("Numeric columns", self.numeric.drop(columns=["histogram"])))
+        if len(self.other):
+            out.append(("Other columns", self.other))
+        return out
+
+
+def _is_numeric(s: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+
+
+def _numeric_block(a: np.ndarray, sample_pos: np.ndarray | None) -> dict[str, np.ndarray]:
+    """Statistics for a (k columns, n rows) float block."""
+    k, n = a.shape
+    nan = np.isnan(a)
+    nulls = np.count_nonzero(nan, axis=1)
+    cnt = n - nulls
+    z = np.where(nan, 0.0, a) if nulls.any() else a
+    del nan
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = z.sum(axis=1) / cnt
+        # One-pass sum of squares; columns where it would lose precision
+        # (|mean| >> std) are redone two-pass
+        m2 = np.einsum("ij,ij->i", z, z) - cnt * mean * mean
+        shaky = np.flatnonzero(~(m2 > 1e-8 * cnt * mean * mean))
+        for i in shaky:
+            v = a[i][~np.isnan(a[i])]
+            m2[i] = float(np.sum((v - v.mean()) ** 2)) if v.size else np.nan
+        std = np.sqrt(np.maximum(m2, 0.0) / (cnt - 1))
+    del z
+    lo = np.fmin.reduce(a, axis=1)
+    hi = np.fmax.reduce(a, axis=1)
+
+    s = a[:, sample_pos] if sample_pos is not None else a
+    with np.errstate(invalid="ignore"):
+        q1, med, q3 = np.nanquantile(s, [0.25, 0.5, 0.75], axis=1) if s.shape[1] else np.full((3, k), np.nan)
+        mad = np.nanmedian(np.abs(s - med[:, None]), axis=1) if s.shape[1] else np.full(k, np.nan)
+
+    iqr = q3 - q1
+    mad_cut = MAD_Z * 1.4826 * mad
+    # NaN compares False, so missing values are never counted
+    iqr_out = np.count_nonzero(a < (q1 - IQR_K * iqr)[:, None], axis=1) + np.count_nonzero(a > (q3 + IQR_K * iqr)[:, None], axis=1)
+    mad_out = np.where(
+        mad > 0,
+        np.count_nonzero(a < (med - mad_cut)[:, None], axis=1) + np.count_nonzero(a > (med + mad_cut)[:, None], axis=1),
+        0,
+    )
+
+    # Histograms of the sample on each column's full min..max range, one bincount for the block
+    width = (hi - lo) / HIST_BINS
+    with np.errstate(invalid="ignore", divide="ignore"):
+        b = np.floor((s - lo[:, None]) / np.where(width > 0, width, 1.0)[:, None])
+    ok = np.isfinite(b)
+    b = np.clip(np.where(ok, b, 0), 0, HIST_BINS - 1).astype(np.int64) + (np.arange(k) * HIST_BINS)[:, None]
+    hist = np.bincount(b[ok], minlength=k * HIST_BINS).reshape(k, HIST_BINS)
+
+    return {
+        "nulls": nulls,
+        "min": lo,
+        "max": hi,
+        "mean": mean,
+        "std": std,
+        "median": med,
+        "IQR outliers": iqr_out,
+        "MAD outliers": mad_out,
+        "hist": hist,
+    }
+
+
+def _numeric_profile(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    n = len(df)
+    sample_pos = np.sort(_sample_positions(n, PROFILE_SAMPLE)) if n > PROFILE_SAMPLE else None
+    per_block = max(1, BLOCK_CELLS // max(n, 1))
+    parts = []
+    for i in range(0, len(cols), per_block):
+        block = cols[i : i + per_block]
+        # (columns, rows); a view of the frame's own float block when it has one
+        a = np.ascontiguousarray(df[block].to_numpy(dtype=float, na_value=np.nan).T)
+        stats = _numeric_block(a, sample_pos)
+        hist = stats.pop("hist")
+        part = pd.DataFrame(stats, index=block)
+        part["histogram"] = list(hist)
+        parts.append(part)
+    out = pd.concat(parts) if parts else pd.DataFrame()
+    out.insert(0, "dtype", [str(df[c].dtype) for c in cols])
+    out.insert(2, "null %", 100.0 * out["nulls"] / n if n else 0.0)
+    for c in ("nulls", "IQR outliers", "MAD outliers"):
+        out[c] = out[c].astype(np.int64)
+    out["outlier %"] = 100.0 * out["IQR outliers"] / (n - out["nulls"]).clip(lower=1)
+    return out.rename_axis("column").reset_index()
+
+
+def _other_profile(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    rows = []
+    n = len(df)
+    for c in cols:
+        s = df[c]
+        nulls = int(s.isna().sum())
+        row = {"column": c, "dtype": str(s.dtype), "nulls": nulls, "null %": 100.0 * nulls / n if n else 0.0}
+        if pd.api.types.is_datetime64_any_dtype(s):
+            row.update(distinct="", top_values="", min=str(s.min()), max=str(s.max()))
+        else:
+            distinct = distinct_count(df, c, DISTINCT_CAP)
+            row["distinct"] = f">{DISTINCT_CAP:,}" if distinct is None else f"{distinct:,}"
+            if distinct is not None and n > nulls:
+                top = s.value_counts(dropna=True).head(TOP_K)
+                row["top_values"] = ", ".join(f"{v} ({100 * k / (n - nulls):.0f}%)" for v, k in top.items())
+            else:
+                row["top_values"] = "(high cardinality)" if distinct is None else ""
+            row.update(min="", max="")
+        rows.append(row)
+    return pd.DataFrame(rows, columns=["column", "dtype", "nulls", "null %", "distinct", "top_values", "min", "max"])
+
+
+def profile_frame(df: pd.DataFrame) -> DataProfile:
+    """Profile every column of df (see the module docstring for what is exact)."""
+    t0 = time.perf_counter()
+    num = [c for c in df.columns if _is_numeric(df[c])]
+    other = [c for c in df.columns if c not in set(num)]
+    numeric = _numeric_profile(df, num) if num else pd.DataFrame(
+        columns=["column", "dtype", "nulls", "null %", "min", "max", "mean", "std", "median",
+                 "IQR outliers", "MAD outliers", "histogram", "outlier %"]
+    )
+    return DataProfile(
+        rows=len(df),
+        columns=df.shape[1],
+        numeric=numeric,
+        other=_other_profile(df, other),
+        seconds=time.perf_counter() - t0,
+    )
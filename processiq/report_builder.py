@@ -72,3 +72,8 @@ def move_down(idx: int) -> None:
 
 def clear_sections() -> None:
     st.session_state[STATE_KEY] = []
+
+
+def set_sections(sections: list[dict]) -> None:
+    """Replace every section (e.g. when a session snapshot is restored)."""
+    st.session_state[STATE_KEY] = list(sections)
@@ -0,0 +1,180 @@
+# processiq/resample.py
+"""
+Time-bucketed aggregation of timestamped data.
+
+Rows are grouped by calendar interval (minute, hour, shift, day) of a time
+column and every value column is reduced per bucket in one sorted pass:
+count, mean, std, min, max, range and percentiles. The sort by bucket is
+done once per (time column, interval) and reused for every value column;
+the aggregated frames are cached on a content fingerprint of the columns
+and the interval, so switching back to an interval or chart only costs a
+hash, and a column rewritten in place (a redefined calculated column) is
+never served stale.
+
+    rs = resample(df, "timestamp", ["measurement"], "1h")
+    rs[["bucket", "measurement_mean", "measurement_p95"]]
+
+Shifts are fixed 8 h blocks from midnight (00-08, 08-16, 16-24). Buckets
+with no timestamps are not emitted; buckets where a value column has no
+numbers get count 0 and NaN statistics.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from processiq.backend import segment_stats
+from processiq.capability_trend import _bucket_starts
+from processiq.data import array_fingerprint, frame_fingerprint
+
+# Interval choices (label -> pandas frequency)
+INTERVALS = {
+    "Minute": "1min",
+    "15 minutes": "15min",
+    "Hour": "1h",
+    "Shift (8 h)": "8h",
+    "Day": "1D",
+}
+DEFAULT_PERCENTILES = (5, 50, 95)
+STATS = ("count", "mean", "std", "min", "max", "range")
+
+_BUCKET_CACHE: OrderedDict[tuple, tuple[np.ndarray, np.ndarray, object]] = OrderedDict()
+_FRAME_CACHE: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+_BUCKET_CACHE_SIZE = 8  # each entry holds two arrays of the dataset's length
+_FRAME_CACHE_SIZE = 64
+SORT_LOOP_SEGMENTS = 50_000  # above this, percentiles use one global two-key sort
+
+
+def _remember(cache: OrderedDict, key: tuple, value, size: int) -> None:
+    cache[key] = value
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+
+def _fingerprint(df: pd.DataFrame, col: str) -> str:
+    """Exact content hash of one column (the sampled column keys are fine for type profiles, not for results)."""
+    dtype = df[col].dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufmM":
+        # Plain NumPy numbers / datetimes: hash the buffer directly, about twice as fast
+        return array_fingerprint(df[col].to_numpy())
+    return frame_fingerprint(df, [col])
+
+
+def _time_buckets(df: pd.DataFrame, time_col: str, freq: str) -> tuple[np.ndarray, np.ndarray, object]:
+    """
+    (row positions sorted by bucket, bucket of each of those rows as int64,
+    bucket dtype). Rows with a missing or unparseable time are left out.
+    """
+    key = (_fingerprint(df, time_col), freq)
+    hit = _BUCKET_CACHE.get(key)
+    if hit is not None:
+        _BUCKET_CACHE.move_to_end(key)
+        return hit
+
+    t = df[time_col]
+    if not pd.api.types.is_datetime64_any_dtype(t):
+        t = pd.to_datetime(t, errors="coerce", format="mixed")
+    starts = _bucket_starts(t.reset_index(drop=True), freq)
+    ok = starts.notna().to_numpy()
+    pos = np.flatnonzero(ok)
+    b = starts[ok].astype("int64").to_numpy()
+    if b.size and np.any(b[1:] < b[:-1]):
+        order = np.argsort(b, kind="stable")
+        pos, b = pos[order], b[order]
+    hit = (pos, b, starts.dtype)
+    _remember(_BUCKET_CACHE, key, hit, _BUCKET_CACHE_SIZE)
+    return hit
+
+
+def _sort_within(x: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """x with each segment sorted; segments begin at `starts`."""
+    if starts.size <= SORT_LOOP_SEGMENTS:
+        # Many short sorts in place beat one global sort by a wide margin
+        xs = x.copy()
+        for a, z in zip(starts.tolist(), np.r_[starts[1:], x.size].tolist()):
+            xs[a:z].sort()
+        return xs
+    seg = np.repeat(np.arange(starts.size), np.diff(np.r_[starts, x.size]))
+    order = np.argsort(x)
+    return x[order[np.argsort(seg[order], kind="stable")]]
+
+
+def _aggregate(x: np.ndarray, b: np.ndarray, percentiles: tuple) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Per-bucket statistics of finite x, already sorted by bucket b."""
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    n, total, m2, lo, hi = segment_stats(x, starts)
+    out = {
+        "count": n,
+        "mean": total / n,
+        "std": np.sqrt(np.divide(m2, n - 1, out=np.full(n.size, np.nan), where=n > 1)),
+        "min": lo,
+        "max": hi,
+        "range": hi - lo,
+    }
+    if percentiles:
+        # Sort values inside each bucket, then interpolate linearly (as np.percentile)
+        xs = _sort_within(x, starts)
+        last = starts + n - 1
+        for q in percentiles:
+            p = starts + (q / 100.0) * (n - 1)
+            i = np.floor(p).astype(np.int64)
+            j = np.minimum(i + 1, last)
+            out[f"p{q:g}"] = xs[i] + (xs[j] - xs[i]) * (p - i)
+    return b[starts], out
+
+
+def resample(
+    df: pd.DataFrame,
+    time_col: str,
+    value_cols,
+    freq: str,
+    percentiles=DEFAULT_PERCENTILES,
+) -> pd.DataFrame:
+    """
+    One row per non-empty bucket: `bucket` (interval start), then
+    <col>_count / _mean / _std / _min / _max / _range / _p<q> for each value column.
+    """
+    value_cols = [value_cols] if isinstance(value_cols, str) else list(value_cols)
+    percentiles = tuple(percentiles)
+    key = (_fingerprint(df, time_col), tuple(_fingerprint(df, c) for c in value_cols), freq, percentiles)
+    hit = _FRAME_CACHE.get(key)
+    if hit is not None:
+        _FRAME_CACHE.move_to_end(key)
+        return hit
+
+    pos, b, dtype = _time_buckets(df, time_col, freq)
+    labels = b[np.flatnonzero(np.r_[True, b[1:] != b[:-1]])] if b.size else b
+    out: dict[str, object] = {"bucket": pd.Series(labels).astype(dtype).to_numpy()}
+    for c in value_cols:
+        x = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float, na_value=np.nan)[pos]
+        ok = np.isfinite(x)
+        stats = {s: np.full(labels.size, np.nan) for s in STATS}
+        stats.update({f"p{q:g}": np.full(labels.size, np.nan) for q in percentiles})
+        stats["count"] = np.zeros(labels.size, dtype=np.int64)
+        if ok.any():
+            got, vals = _aggregate(x[ok], b[ok], percentiles)
+            at = np.searchsorted(labels, got)
+            for name, v in vals.items():
+                stats[name][at] = v
+        out.update({f"{c}_{name}": v for name, v in stats.items()})
+
+    frame = pd.DataFrame(out)
+    _remember(_FRAME_CACHE, key, frame, _FRAME_CACHE_SIZE)
+    return frame
+
+
+def time_subgroup_stats(df: pd.DataFrame, time_col: str, value_col: str, freq: str) -> pd.DataFrame:
+    """Buckets as rational subgroups, shaped like spc.subgroup_stats (subgroup, n, Xbar, R, S)."""
+    rs = resample(df, time_col, [value_col], freq, percentiles=())
+    rs = rs[rs[f"{value_col}_count"] > 0]
+    return pd.DataFrame(
+        {
+            "subgroup": rs["bucket"].to_numpy(),
+            "n": rs[f"{value_col}_count"].to_numpy(),
+            "Xbar": rs[f"{value_col}_mean"].to_numpy(),
+            "R": rs[f"{value_col}_range"].to_numpy(),
+            "S": rs[f"{value_col}_std"].to_numpy(),
+        }
+    )
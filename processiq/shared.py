@@ -3,8 +3,84 @@ from __future__ import annotations
 
 import streamlit as st
 
-from processiq.data import load_table
-from processiq.state import get_df, clear_df
+from processiq.data import LoadedData, load_table
+from processiq.loader import BACKGROUND_BYTES, start_load
+from processiq.state import (
+    KEY_LOAD_ABANDONED,
+    KEY_LOADED_FROM,
+    clear_df,
+    clear_loading,
+    get_df,
+    get_loading,
+    set_df,
+    set_loading,
+)
+
+
+@st.fragment(run_every=0.5)
+def _load_progress(key_prefix: str) -> None:
+    job = get_loading()
+    if job is None or job.done:
+        st.rerun()  # whole page: publish the result
+        return
+    st.progress(
+        job.progress,
+        text=f"Loading {job.name}: {job.bytes_read / 1e6:,.1f} of {job.total_bytes / 1e6:,.1f} MB · {job.elapsed:.0f} s",
+    )
+    if st.button("Cancel load", key=f"{key_prefix}_cancel_load"):
+        job.cancel()
+        job.wait(timeout=2.0)
+        st.rerun()
+    if job.preview is not None:
+        st.caption(f"Preview of the first {len(job.preview)} rows while the rest loads")
+        st.dataframe(job.preview.head(25), use_container_width=True)
+
+
+def loading_panel(key_prefix: str = "default") -> bool:
+    """
+    Show the background load in progress, if any, and return True while it
+    runs (callers stop instead of parsing anything themselves). A finished
+    load is published as the shared dataset here, on whichever page sees it first.
+    """
+    job = get_loading()
+    if job is None:
+        return False
+    if job.done:
+        clear_loading()
+        if job.status == "done":
+            set_df(job.result.df, job.result.source_name)
+            st.session_state[KEY_LOADED_FROM] = job.key
+            st.success(f"Loaded {job.name}: {len(job.result.df):,} rows in {job.elapsed:.1f} s (saved for other tools).")
+        elif job.status == "cancelled":
+            st.session_state[KEY_LOAD_ABANDONED] = job.key
+            st.info(f"Loading {job.name} was cancelled.")
+        else:
+            st.session_state[KEY_LOAD_ABANDONED] = job.key
+            st.error(f"Could not read file: {job.error}")
+        return False
+    _load_progress(key_prefix)
+    return True
+
+
+def load_upload(uploaded_file, key_prefix: str = "default"):
+    """
+    load_table for small uploads; larger ones are parsed by a background job
+    (returns None while it runs and reruns the page to show its progress).
+    """
+    if uploaded_file is None:
+        return None
+    key = getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+    shared_df, shared_name = get_df()
+    if shared_df is not None and st.session_state.get(KEY_LOADED_FROM) == key:
+        return LoadedData(df=shared_df, source_name=shared_name)  # already loaded in the background
+    if uploaded_file.size <= BACKGROUND_BYTES:
+        return load_table(uploaded_file)
+    if st.session_state.get(KEY_LOAD_ABANDONED) == key:
+        # Cancelled or failed: the uploader still holds the file, so don't start over on every rerun
+        st.caption(f"{uploaded_file.name} was not loaded. Upload a different file to try again.")
+        return None
+    set_loading(start_load(uploaded_file.name, uploaded_file.getvalue(), key=key))
+    st.rerun()
 
 
 def get_working_df(
@@ -17,6 +93,9 @@ def get_working_df(
     key_prefix is required to avoid Streamlit DuplicateElementId errors
     when the same helper is used across multiple pages.
     """
+    if loading_panel(key_prefix):
+        return None, ""
+
     shared_df, shared_name = get_df()
 
     if shared_df is not None:
@@ -41,7 +120,7 @@ def get_working_df(
         type=["csv", "xlsx", "xls"],
         key=f"{key_prefix}_uploader",
     )
-    loaded = load_table(uploaded)
+    loaded = load_upload(uploaded, key_prefix)
     if loaded is None:
         return None, ""
     return loaded.df, loaded.source_name
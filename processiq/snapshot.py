@@ -0,0 +1,254 @@
+# processiq/snapshot.py
+"""
+Session snapshots: the shared dataset plus the Report Builder sections,
+saved to a local store and restored in one step.
+
+Layout under the snapshot root (PROCESSIQ_SNAPSHOT_DIR, default
+~/.processiq/snapshots):
+
+    index.sqlite         one row per snapshot + the report sections as
+                         zlib-compressed JSON blobs
+    <id>.arrow           the dataset as an Arrow IPC file (memory-mapped on
+                         restore; lz4 by default, compression=None for zero-copy)
+    <id>.pkl.gz          fallback when pyarrow is missing or cannot hold a column
+
+Figures are stored as Plotly JSON and tables as pandas "table" JSON, so a
+restored section renders and exports like the original.
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import sqlite3
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+import plotly.io as pio
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency
+    pa = None
+
+HAVE_ARROW = pa is not None
+COMPRESSIONS = ("lz4", "zstd", None)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    created REAL NOT NULL,
+    source_name TEXT,
+    rows INTEGER,
+    columns INTEGER,
+    sections INTEGER,
+    data_file TEXT,
+    bytes INTEGER
+);
+CREATE TABLE IF NOT EXISTS sections (
+    snapshot_id TEXT NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (snapshot_id, position)
+);
+"""
+
+
+@dataclass
+class SnapshotInfo:
+    id: str
+    name: str
+    created: float
+    source_name: str
+    rows: int
+    columns: int
+    sections: int
+    data_file: str | None
+    bytes: int
+
+
+@dataclass
+class Snapshot:
+    info: SnapshotInfo
+    df: pd.DataFrame | None
+    sections: list[dict]
+
+
+def snapshot_root(root: str | os.PathLike | None = None) -> Path:
+    p = Path(root or os.environ.get("PROCESSIQ_SNAPSHOT_DIR") or Path.home() / ".processiq" / "snapshots")
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+@contextmanager
+def _connect(root: Path):
+    """Index connection; commits on success and always closes."""
+    con = sqlite3.connect(root / "index.sqlite")
+    try:
+        con.execute("PRAGMA foreign_keys = ON")
+        con.executescript(_SCHEMA)
+        with con:
+            yield con
+    finally:
+        con.close()
+
+
+# ---------------------------------------------------------------------------
+# Dataset files
+# ---------------------------------------------------------------------------
+
+def _write_arrow(df: pd.DataFrame, path: Path, compression: str | None) -> None:
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+
+
+def _write_dataset(df: pd.DataFrame, root: Path, snap_id: str, compression: str | None) -> str:
+    if HAVE_ARROW:
+        name = f"{snap_id}.arrow"
+        try:
+            _write_arrow(df, root / name, compression)
+            return name
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            (root / name).unlink(missing_ok=True)  # e.g. mixed-type object column
+    name = f"{snap_id}.pkl.gz"
+    df.to_pickle(root / name, compression="gzip")
+    return name
+
+
+def _read_dataset(path: Path) -> pd.DataFrame:
+    if path.suffix == ".arrow":
+        if not HAVE_ARROW:
+            raise RuntimeError("This snapshot was saved as Arrow; install pyarrow to restore it.")
+        with pa.memory_map(str(path), "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    return pd.read_pickle(path, compression="gzip")
+
+
+# ---------------------------------------------------------------------------
+# Report sections
+# ---------------------------------------------------------------------------
+
+def _table_json(df: pd.DataFrame) -> dict:
+    try:
+        return {"orient": "table", "data": df.to_json(orient="table", date_format="iso", double_precision=15)}
+    except ValueError:  # duplicate / MultiIndex columns
+        return {"orient": "split", "data": df.to_json(orient="split", date_format="iso", double_precision=15)}
+
+
+def _encode_section(sec: dict) -> bytes:
+    doc = dict(sec)
+    doc["kpis"] = [list(k) for k in sec.get("kpis") or []]
+    doc["figures"] = [[t, pio.to_json(fig)] for t, fig in sec.get("figures") or []]
+    doc["tables"] = [[t, _table_json(pd.DataFrame(df))] for t, df in sec.get("tables") or []]
+    return zlib.compress(json.dumps(doc).encode("utf-8"), 6)
+
+
+def _decode_section(payload: bytes) -> dict:
+    doc = json.loads(zlib.decompress(payload).decode("utf-8"))
+    doc["kpis"] = [tuple(k) for k in doc.get("kpis", [])]
+    doc["figures"] = [(t, pio.from_json(fig)) for t, fig in doc.get("figures", [])]
+    doc["tables"] = [
+        (t, pd.read_json(io.StringIO(tab["data"]), orient=tab["orient"])) for t, tab in doc.get("tables", [])
+    ]
+    return doc
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def _info(row) -> SnapshotInfo:
+    return SnapshotInfo(*row)
+
+
+def save_snapshot(
+    name: str,
+    df: pd.DataFrame | None,
+    source_name: str = "",
+    sections: list[dict] | None = None,
+    root: str | os.PathLike | None = None,
+    compression: str | None = "lz4",
+) -> SnapshotInfo:
+    """Write the dataset and report sections as a new snapshot."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {COMPRESSIONS}.")
+    base = snapshot_root(root)
+    snap_id = uuid.uuid4().hex[:12]
+    sections = sections or []
+
+    data_file = _write_dataset(df, base, snap_id, compression) if df is not None else None
+    payloads = [_encode_section(s) for s in sections]
+    size = ((base / data_file).stat().st_size if data_file else 0) + sum(len(p) for p in payloads)
+
+    info = SnapshotInfo(
+        id=snap_id,
+        name=name.strip() or time.strftime("Snapshot %Y-%m-%d %H:%M"),
+        created=time.time(),
+        source_name=source_name,
+        rows=0 if df is None else int(len(df)),
+        columns=0 if df is None else int(df.shape[1]),
+        sections=len(sections),
+        data_file=data_file,
+        bytes=int(size),
+    )
+    with _connect(base) as con:
+        con.execute(
+            "INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (info.id, info.name, info.created, info.source_name, info.rows, info.columns, info.sections, info.data_file, info.bytes),
+        )
+        con.executemany(
+            "INSERT INTO sections VALUES (?, ?, ?)", [(snap_id, i, p) for i, p in enumerate(payloads)]
+        )
+    return info
+
+
+def list_snapshots(root: str | os.PathLike | None = None) -> list[SnapshotInfo]:
+    """Newest first."""
+    with _connect(snapshot_root(root)) as con:
+        rows = con.execute("SELECT * FROM snapshots ORDER BY created DESC").fetchall()
+    return [_info(r) for r in rows]
+
+
+def load_snapshot(snap_id: str, root: str | os.PathLike | None = None) -> Snapshot:
+    base = snapshot_root(root)
+    with _connect(base) as con:
+        row = con.execute("SELECT * FROM snapshots WHERE id = ?", (snap_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No snapshot '{snap_id}'.")
+        payloads = con.execute(
+            "SELECT payload FROM sections WHERE snapshot_id = ? ORDER BY position", (snap_id,)
+        ).fetchall()
+    info = _info(row)
+    df = _read_dataset(base / info.data_file) if info.data_file else None
+    return Snapshot(info, df, [_decode_section(p) for (p,) in payloads])
+
+
+def delete_snapshot(snap_id: str, root: str | os.PathLike | None = None) -> None:
+    base = snapshot_root(root)
+    with _connect(base) as con:
+        row = con.execute("SELECT data_file FROM snapshots WHERE id = ?", (snap_id,)).fetchone()
+        con.execute("DELETE FROM snapshots WHERE id = ?", (snap_id,))
+    if row and row[0]:
+        (base / row[0]).unlink(missing_ok=True)
+
+
+def snapshots_table(infos: list[SnapshotInfo]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "name": [i.name for i in infos],
+            "saved": pd.to_datetime([i.created for i in infos], unit="s").strftime("%Y-%m-%d %H:%M"),
+            "dataset": [i.source_name for i in infos],
+            "rows": [i.rows for i in infos],
+            "columns": [i.columns for i in infos],
+            "report sections": [i.sections for i in infos],
+            "size (KB)": [round(i.bytes / 1024, 1) for i in infos],
+        }
+    )
@@ -0,0 +1,251 @@
+# processiq/sources.py
+"""
+Local database sources (SQLite, DuckDB) with column and filter pushdown.
+
+Only the selected columns and the rows that pass the time-range and
+category filters leave the database; results stream out in Arrow record
+batches of `batch_size` rows. Everything runs against a local file, no
+server needed.
+
+    src = DatabaseSource("mes_archive.sqlite")
+    src.tables()
+    df = src.read(
+        "measurements",
+        columns=["ts", "machine", "diameter"],
+        time_col="ts", start="2024-01-01", end="2024-02-01",
+        filters={"machine": ["M1", "M4"]},
+    )
+
+SQLite has no timestamp type. Text time columns are first narrowed on the
+raw column with date bounds padded by a day, which an index on the column
+can serve, then checked exactly through datetime(col), so date-only and
+"T"-separated values line up with the "YYYY-MM-DD HH:MM:SS" bounds; DuckDB
+compares real timestamps. Integer or
+real time columns are read as Unix epoch seconds (milliseconds when the
+values are that large) and get numeric bounds on either engine.
+"""
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+from processiq.columns import tag_dataset
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency
+    pa = None
+
+try:
+    import duckdb
+except ImportError:  # optional dependency
+    duckdb = None
+
+HAVE_ARROW = pa is not None
+HAVE_DUCKDB = duckdb is not None
+
+SQLITE_EXTS = (".sqlite", ".sqlite3", ".db")
+DUCKDB_EXTS = (".duckdb", ".ddb")
+BATCH_SIZE = 65_536
+
+
+def quote_ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+EPOCH_MS_ABOVE = 1e11  # epoch values this large are milliseconds (1e11 s is the year 5138)
+
+
+def _bound(value, engine: str, time_unit: str | None = None):
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    if time_unit is not None:
+        return ts.value // (10**6 if time_unit == "ms" else 10**9)
+    # Same text form as SQLite's datetime(), which the column is wrapped in
+    return ts.strftime("%Y-%m-%d %H:%M:%S") if engine == "sqlite" else ts.to_pydatetime()
+
+
+def _text_prefilter(value, op: str) -> str:
+    """
+    Raw-text bound that keeps every ISO-style value datetime() would keep.
+    Padded by a day (two above, for the exclusive end) so UTC offsets that
+    move the date still pass; the exact datetime() comparison follows.
+    """
+    day = pd.Timestamp(value).normalize()
+    day = day - pd.Timedelta(days=1) if op == ">=" else day + pd.Timedelta(days=2)
+    return day.strftime("%Y-%m-%d")
+
+
+@dataclass
+class SourceQuery:
+    """What to pull from one table; turned into a single parameterized SELECT."""
+    table: str
+    columns: list[str] | None = None  # None = every column
+    time_col: str | None = None
+    start: object = None  # inclusive
+    end: object = None  # exclusive
+    filters: dict[str, list] = field(default_factory=dict)  # column -> allowed values
+    limit: int | None = None
+    time_unit: str | None = None  # None = timestamp / text column; "s" or "ms" = numeric epoch column
+
+    def sql(self, engine: str = "sqlite") -> tuple[str, list]:
+        cols = ", ".join(quote_ident(c) for c in self.columns) if self.columns else "*"
+        where, params = [], []
+        if self.time_col:
+            c = quote_ident(self.time_col)
+            text = engine == "sqlite" and self.time_unit is None
+            for op, bound in ((">=", self.start), ("<", self.end)):
+                if bound is None:
+                    continue
+                if text:
+                    # Index-friendly range on the raw column, then the exact check
+                    where.append(f"{c} {op} ?")
+                    params.append(_text_prefilter(bound, op))
+                where.append(f"{'datetime(' + c + ')' if text else c} {op} ?")
+                params.append(_bound(bound, engine, self.time_unit))
+        for col, values in self.filters.items():
+            values = list(values)
+            if not values:
+                continue
+            where.append(f"{quote_ident(col)} IN ({', '.join('?' * len(values))})")
+            params.extend(v.item() if hasattr(v, "item") else v for v in values)
+        sql = f"SELECT {cols} FROM {quote_ident(self.table)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if self.time_col:
+            sql += f" ORDER BY {quote_ident(self.time_col)}"
+        if self.limit:
+            sql += f" LIMIT {int(self.limit)}"
+        return sql, params
+
+
+def _arrow_column(values: tuple):
+    try:
+        return pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # SQLite allows mixed types in one column; keep them as text
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+class DatabaseSource:
+    """A local SQLite or DuckDB file, opened read-only."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"No database file at {self.path}")
+        self.engine = "duckdb" if self.path.suffix.lower() in DUCKDB_EXTS else "sqlite"
+        if self.engine == "duckdb" and not HAVE_DUCKDB:
+            raise ImportError("Reading DuckDB files needs the duckdb package (pip install duckdb).")
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    def _connect(self):
+        if self.engine == "duckdb":
+            return duckdb.connect(str(self.path), read_only=True)
+        return sqlite3.connect(f"file:{self.path.resolve().as_posix()}?mode=ro", uri=True)
+
+    def _fetch(self, sql: str, params: list | tuple = ()) -> list[tuple]:
+        con = self._connect()
+        try:
+            return con.execute(sql, list(params)).fetchall()
+        finally:
+            con.close()
+
+    # ---- catalog ----
+    def tables(self) -> list[str]:
+        if self.engine == "duckdb":
+            rows = self._fetch("SELECT table_name FROM information_schema.tables ORDER BY table_name")
+        else:
+            rows = self._fetch("SELECT name FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name")
+        return [r[0] for r in rows]
+
+    def columns(self, table: str) -> list[tuple[str, str]]:
+        """(name, declared type) per column."""
+        if self.engine == "duckdb":
+            rows = self._fetch(
+                "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = ? ORDER BY ordinal_position",
+                [table],
+            )
+            return [(r[0], r[1]) for r in rows]
+        rows = self._fetch(f"PRAGMA table_info({quote_ident(table)})")
+        return [(r[1], r[2]) for r in rows]
+
+    def row_count(self, table: str) -> int:
+        return int(self._fetch(f"SELECT COUNT(*) FROM {quote_ident(table)}")[0][0])
+
+    def distinct_values(self, table: str, column: str, limit: int = 200) -> list:
+        """Up to `limit` distinct non-null values (for filter pickers)."""
+        c = quote_ident(column)
+        rows = self._fetch(
+            f"SELECT DISTINCT {c} FROM {quote_ident(table)} WHERE {c} IS NOT NULL ORDER BY 1 LIMIT {int(limit)}"
+        )
+        return [r[0] for r in rows]
+
+    def time_unit(self, table: str, column: str) -> str | None:
+        """"s" / "ms" if the column holds numbers (Unix epoch), None for timestamps or text."""
+        c = quote_ident(column)
+        rows = self._fetch(f"SELECT {c} FROM {quote_ident(table)} WHERE {c} IS NOT NULL LIMIT 1")
+        v = rows[0][0] if rows else None
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            return "ms" if abs(v) >= EPOCH_MS_ABOVE else "s"
+        return None
+
+    def time_range(self, table: str, column: str) -> tuple[pd.Timestamp | None, pd.Timestamp | None]:
+        unit = self.time_unit(table, column)
+        # Raw column, one aggregate per subquery, so an index answers each with a single seek
+        c, t = quote_ident(column), quote_ident(table)
+        lo, hi = self._fetch(f"SELECT (SELECT MIN({c}) FROM {t}), (SELECT MAX({c}) FROM {t})")[0]
+        lo, hi = (pd.to_datetime(v, errors="coerce", unit=unit) if unit else pd.to_datetime(v, errors="coerce") for v in (lo, hi))
+        # Text with a UTC offset parses tz-aware; report UTC wall time like datetime() does
+        lo, hi = (v.tz_convert(None) if isinstance(v, pd.Timestamp) and v.tz is not None else v for v in (lo, hi))
+        return (None if pd.isna(lo) else lo), (None if pd.isna(hi) else hi)
+
+    # ---- data ----
+    def batches(self, query: SourceQuery, batch_size: int = BATCH_SIZE) -> Iterator["pa.RecordBatch"]:
+        """Arrow record batches of the query result."""
+        if not HAVE_ARROW:
+            raise ImportError("Arrow batches need the pyarrow package (pip install pyarrow).")
+        sql, params = query.sql(self.engine)
+        con = self._connect()
+        try:
+            if self.engine == "duckdb":
+                reader = con.execute(sql, params).fetch_record_batch(batch_size)
+                yield from reader
+                return
+            cur = con.execute(sql, params)
+            names = [d[0] for d in cur.description]
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield pa.RecordBatch.from_arrays([_arrow_column(col) for col in zip(*rows)], names=names)
+        finally:
+            con.close()
+
+    def read(self, table: str, batch_size: int = BATCH_SIZE, **query) -> pd.DataFrame:
+        """Pull the query result into a DataFrame (tagged for column-profile caching)."""
+        q = SourceQuery(table, **query)
+        if q.time_col and q.time_unit is None and (q.start is not None or q.end is not None):
+            q.time_unit = self.time_unit(table, q.time_col)
+        if HAVE_ARROW:
+            parts = [b.to_pandas() for b in self.batches(q, batch_size)]
+            df = pd.concat(parts, ignore_index=True) if parts else None
+        else:
+            sql, params = q.sql(self.engine)
+            con = self._connect()
+            try:
+                df = pd.read_sql_query(sql, con, params=params)
+            finally:
+                con.close()
+        if df is None:
+            df = pd.DataFrame(columns=q.columns or [c for c, _ in self.columns(table)])
+        df.columns = [str(c).strip() for c in df.columns]
+        return tag_dataset(df)
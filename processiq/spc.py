@@ -1,7 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from functools import lru_cache
 import numpy as np
 import pandas as pd
+from scipy.special import gammaln, ndtr
+
+from processiq import attribute
+from processiq.backend import ewma_filter, lindley, moving_range_mean, segment_stats, window_count
 
 # Constants for Xbar-R (n=2..10), A2, D3, D4 from standard SPC tables
 XBAR_R_CONST = {
@@ -15,6 +20,8 @@ XBAR_R_CONST = {
     9:  (0.337, 0.184, 1.816),
     10: (0.308, 0.223, 1.777),
 }
+D2_MR = 1.128  # d2 for moving ranges of two consecutive points
+D4_MR = 3.267  # D4 for the same moving ranges (their LCL is 0)
 
 @dataclass
 class ChartLine:
@@ -30,59 +37,221 @@ def imr(x: pd.Series) -> tuple[pd.DataFrame, ChartLine, ChartLine]:
     xbar = float(np.mean(xi)) if n else float("nan")
     mrbar = float(np.mean(mr)) if len(mr) else float("nan")
 
-    # Individuals limits using sigma = MRbar/d2, d2=1.128
-    sigma = mrbar / 1.128 if np.isfinite(mrbar) and mrbar > 0 else np.nan
+    df = pd.DataFrame({"X": x, "MR": pd.Series([np.nan] + mr.tolist())})
+    return (df, *imr_lines(xbar, mrbar))
+
+
+def imr_lines(xbar: float, mrbar: float) -> tuple[ChartLine, ChartLine]:
+    """I and MR chart lines from the grand mean and average moving range."""
+    # Individuals limits using sigma = MRbar/d2
+    sigma = mrbar / D2_MR if np.isfinite(mrbar) and mrbar > 0 else np.nan
     ucl_x = xbar + 3 * sigma if np.isfinite(sigma) else None
     lcl_x = xbar - 3 * sigma if np.isfinite(sigma) else None
 
-    # MR limits: UCL = 3.267*MRbar, LCL=0 for MR of 2
-    ucl_mr = 3.267 * mrbar if np.isfinite(mrbar) else None
+    # MR limits: UCL = D4*MRbar, LCL=0 for MR of 2
+    ucl_mr = D4_MR * mrbar if np.isfinite(mrbar) else None
     lcl_mr = 0.0 if np.isfinite(mrbar) else None
+    return ChartLine(xbar, lcl_x, ucl_x), ChartLine(mrbar, lcl_mr, ucl_mr)
+
+@lru_cache(maxsize=1)
+def _range_grid() -> tuple[np.ndarray, float, np.ndarray]:
+    """Normal CDF on the quadrature grid, its step, and F(y) - F(x) over x < y sorted descending."""
+    t = np.linspace(-9.0, 9.0, 1201)
+    F = ndtr(t)
+    i, j = np.triu_indices(F.size, k=1)
+    return F, float(t[1] - t[0]), np.sort(F[j] - F[i])[::-1].copy()
+
+
+@lru_cache(maxsize=None)
+def subgroup_constants(n: int) -> tuple[float, float, float]:
+    """
+    d2, d3, c4 for subgroup size n under normality, computed once per n.
+    d2 = E[R]/σ and d3 = SD[R]/σ by quadrature over the range distribution,
+    c4 = E[S]/σ in closed form.
+    """
+    if n < 2:
+        raise ValueError("Subgroup size must be at least 2.")
+    F, h, spans = _range_grid()
+    m = F.size
+    Fn, Gn = F**n, (1.0 - F) ** n
+    d2 = float(np.sum(1.0 - Fn - Gn) * h)
+    # E[R^2] = 2 * double integral over x < y of P(min < x, max > y)
+    #        = 2 * sum over i < j of 1 - F_j^n - (1 - F_i)^n + (F_j - F_i)^n, diagonal counted half.
+    # The first three terms reduce to weighted 1-D sums; of the last, only spans with
+    # span^n >= 1e-18 are summed (a prefix, since spans are sorted descending).
+    idx = np.arange(m)
+    keep = int(np.searchsorted(-spans, -np.exp(-41.5 / n), side="right"))
+    tri = m * (m - 1) / 2.0 - np.dot(idx, Fn) - np.dot(m - 1 - idx, Gn) + np.sum(spans[:keep] ** n)
+    er2 = 2.0 * float((tri + 0.5 * np.sum(1.0 - Fn - Gn)) * h * h)
+    d3 = float(np.sqrt(max(er2 - d2 * d2, 0.0)))
+    c4 = float(np.sqrt(2.0 / (n - 1)) * np.exp(gammaln(n / 2.0) - gammaln((n - 1) / 2.0)))
+    return d2, d3, c4
+
+
+def xbar_r_factors(n: int) -> tuple[float, float, float]:
+    """A2, D3, D4: the standard table for n = 2..10, computed from d2/d3 beyond."""
+    if n in XBAR_R_CONST:
+        return XBAR_R_CONST[n]
+    d2, d3, _ = subgroup_constants(n)
+    return 3.0 / (d2 * np.sqrt(n)), max(0.0, 1.0 - 3.0 * d3 / d2), 1.0 + 3.0 * d3 / d2
+
+
+def subgroup_stats(values, keys) -> pd.DataFrame:
+    """
+    Per-subgroup n / Xbar / R / S from sorted-segment reductions.
+    Rows with a missing value or key are dropped; subgroups come out in sorted
+    key order (same as groupby). Already-ordered data skips the sort.
+    """
+    x = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    codes, uniques = pd.factorize(pd.Series(keys), sort=True)
+    ok = np.isfinite(x) & (codes >= 0)
+    x, codes = x[ok], codes[ok]
+    if x.size == 0:
+        return pd.DataFrame(columns=["subgroup", "n", "Xbar", "R", "S"])
+
+    if np.any(codes[1:] < codes[:-1]):
+        order = np.argsort(codes, kind="stable")
+        x, codes = x[order], codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    n, total, ss, lo, hi = segment_stats(x, starts)
+    xbar = total / n
+    r = hi - lo
+    sd = np.sqrt(np.divide(ss, n - 1, out=np.full(n.size, np.nan), where=n > 1))
+    return pd.DataFrame({"subgroup": uniques[codes[starts]], "n": n, "Xbar": xbar, "R": r, "S": sd})
 
-    df = pd.DataFrame({"X": x, "MR": pd.Series([np.nan] + mr.tolist())})
-    return df, ChartLine(xbar, lcl_x, ucl_x), ChartLine(mrbar, lcl_mr, ucl_mr)
 
 def xbar_r(df: pd.DataFrame, value_col: str, subgroup_col: str):
-    d = df[[subgroup_col, value_col]].copy()
-    d[value_col] = pd.to_numeric(d[value_col], errors="coerce")
-    d = d.dropna()
-    g = d.groupby(subgroup_col)[value_col]
-    xbar = g.mean()
-    r = g.max() - g.min()
-    n = int(g.size().mode().iloc[0]) if len(g) else 0  # most common subgroup size
-
-    const = XBAR_R_CONST.get(n)
-    if const is None:
-        raise ValueError("Subgroup size must be 2..10 and consistent. (Mode used; adjust data if mixed.)")
-    A2, D3, D4 = const
-    xbarbar = float(xbar.mean()) if len(xbar) else float("nan")
-    rbar = float(r.mean()) if len(r) else float("nan")
+    st_ = subgroup_stats(df[value_col], df[subgroup_col])
+    n = int(pd.Series(st_["n"]).mode().iloc[0]) if len(st_) else 0  # most common subgroup size
+    if n < 2:
+        raise ValueError("Subgroup size must be at least 2. (Mode used; adjust data if mixed.)")
+    A2, D3, D4 = xbar_r_factors(n)
+    xbarbar = float(st_["Xbar"].mean())
+    rbar = float(st_["R"].mean())
 
     x_ucl = xbarbar + A2 * rbar
     x_lcl = xbarbar - A2 * rbar
     r_ucl = D4 * rbar
     r_lcl = D3 * rbar
 
-    out = pd.DataFrame({subgroup_col: xbar.index, "Xbar": xbar.values, "R": r.values})
+    out = pd.DataFrame({subgroup_col: st_["subgroup"].to_numpy(), "Xbar": st_["Xbar"].to_numpy(), "R": st_["R"].to_numpy()})
     return out, ChartLine(xbarbar, x_lcl, x_ucl), ChartLine(rbar, r_lcl, r_ucl), n
 
+
+@dataclass
+class SubgroupChart:
+    table: pd.DataFrame  # subgroup, n, Xbar, X_LCL, X_UCL, <spread>, CL / LCL / UCL for the spread
+    center: float  # grand mean (weighted by subgroup size)
+    sigma: float
+    spread: str  # "R" | "S"
+    equal_sizes: bool
+
+
+def _size_constants(n: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Look up d2/d3/c4 once per distinct size, then broadcast
+    sizes, inv = np.unique(n, return_inverse=True)
+    tab = np.array([subgroup_constants(int(k)) for k in sizes])
+    return tab[inv, 0], tab[inv, 1], tab[inv, 2]
+
+
+def _subgroup_limits(n: np.ndarray, center: float, sigma: float, spread: str) -> dict[str, np.ndarray]:
+    d2, d3, c4 = _size_constants(n)
+    half = 3.0 * sigma / np.sqrt(n)
+    if spread == "R":
+        cl, w = d2 * sigma, 3.0 * d3 * sigma
+    else:
+        cl, w = c4 * sigma, 3.0 * sigma * np.sqrt(1.0 - c4 * c4)
+    return {
+        "X_LCL": center - half,
+        "X_UCL": center + half,
+        f"{spread}_CL": cl,
+        f"{spread}_LCL": np.maximum(cl - w, 0.0),
+        f"{spread}_UCL": cl + w,
+    }
+
+
+def _sigma_units(st_: pd.DataFrame, spread: str) -> np.ndarray:
+    # Per-subgroup unbiased sigma estimates: R/d2(n) or S/c4(n)
+    d2, _, c4 = _size_constants(st_["n"].to_numpy())
+    return st_[spread].to_numpy(dtype=float) / (d2 if spread == "R" else c4)
+
+
+def subgroup_chart(
+    df: pd.DataFrame,
+    value_col: str,
+    subgroup_col: str,
+    spread: str = "R",
+    stats: pd.DataFrame | None = None,
+) -> SubgroupChart:
+    """
+    Xbar-R or Xbar-S chart with per-subgroup limits, so subgroup sizes may vary.
+    Sigma is the average of R/d2(n) (or S/c4(n)); for equal sizes this is the
+    textbook Rbar/d2 (Sbar/c4) estimate. `stats` takes precomputed subgroup
+    statistics (as subgroup_stats returns, e.g. resample.time_subgroup_stats);
+    subgroup_col then only names the label column.
+    """
+    if spread not in ("R", "S"):
+        raise ValueError("spread must be 'R' or 'S'.")
+    st_ = subgroup_stats(df[value_col], df[subgroup_col]) if stats is None else stats
+    st_ = st_[st_["n"] >= 2].reset_index(drop=True)
+    if len(st_) < 2:
+        raise ValueError("Need at least 2 subgroups with 2+ observations.")
+
+    n = st_["n"].to_numpy()
+    center = float(np.sum(n * st_["Xbar"].to_numpy()) / n.sum())
+    sigma = float(np.mean(_sigma_units(st_, spread)))
+    lim = _subgroup_limits(n, center, sigma, spread)
+    table = pd.DataFrame(
+        {
+            subgroup_col: st_["subgroup"].to_numpy(),
+            "n": n,
+            "Xbar": st_["Xbar"].to_numpy(),
+            "X_LCL": lim["X_LCL"],
+            "X_UCL": lim["X_UCL"],
+            spread: st_[spread].to_numpy(),
+            f"{spread}_CL": lim[f"{spread}_CL"],
+            f"{spread}_LCL": lim[f"{spread}_LCL"],
+            f"{spread}_UCL": lim[f"{spread}_UCL"],
+        }
+    )
+    return SubgroupChart(table, center, sigma, spread, bool(np.all(n == n[0])))
+
+
 def p_chart(df: pd.DataFrame, defect_col: str, n_col: str):
     d = df[[defect_col, n_col]].copy()
     d[defect_col] = pd.to_numeric(d[defect_col], errors="coerce")
     d[n_col] = pd.to_numeric(d[n_col], errors="coerce")
     d = d.dropna()
+    d = d[(d[n_col] > 0) & (d[defect_col] >= 0)]
     if len(d) == 0:
         raise ValueError("No valid rows.")
-    p = d[defect_col] / d[n_col]
-    pbar = float((d[defect_col].sum()) / (d[n_col].sum()))
-    se = np.sqrt(pbar * (1 - pbar) / d[n_col])
-    ucl = (pbar + 3 * se).clip(upper=1.0)
-    lcl = (pbar - 3 * se).clip(lower=0.0)
+    ch = attribute.p_chart(d[defect_col].to_numpy(), d[n_col].to_numpy())
     out = d.copy()
-    out["p"] = p
-    out["UCL"] = ucl
-    out["LCL"] = lcl
-    return out, pbar
+    out["p"] = ch.stat
+    out["UCL"] = ch.ucl
+    out["LCL"] = ch.lcl
+    return out, ch.bar
+
+def nelson_flags(z: np.ndarray, seg_pos: np.ndarray | None = None) -> list[tuple[str, str, np.ndarray]]:
+    """
+    Vectorized R1-R4 masks over z-scores.
+
+    seg_pos is each point's position within its own stream when several streams
+    are laid end to end; a window only counts once it fits inside one stream.
+    Returns (rule, detail, mask) in the order the violation table lists them.
+    """
+    if seg_pos is None:
+        seg_pos = np.arange(z.size)
+    out = [("R1", "|z| > 3", np.abs(z) > 3)]
+    for rule, w, k, lim in (("R2", 3, 2, 2), ("R3", 5, 4, 1)):
+        full = seg_pos >= w - 1
+        out.append((rule, f"{k} of {w} > +{lim}σ", full & (window_count(z > lim, w) >= k)))
+        out.append((rule, f"{k} of {w} < -{lim}σ", full & (window_count(z < -lim, w) >= k)))
+    full = seg_pos >= 7
+    out.append(("R4", "8 in a row above CL", full & (window_count(z > 0, 8) == 8)))
+    out.append(("R4", "8 in a row below CL", full & (window_count(z < 0, 8) == 8)))
+    return out
+
 
 def nelson_rules_1_2_3_4(x: pd.Series, center: float, sigma: float) -> pd.DataFrame:
     """
@@ -95,53 +264,257 @@ def nelson_rules_1_2_3_4(x: pd.Series, center: float, sigma: float) -> pd.DataFr
     """
     xs = pd.to_numeric(x, errors="coerce").dropna().reset_index(drop=True).to_numpy()
     n = len(xs)
-    rows = []
     if n == 0 or not np.isfinite(sigma) or sigma <= 0:
         return pd.DataFrame(columns=["rule", "index", "value", "detail"])
 
     z = (xs - center) / sigma
 
-    # R1
-    for i in range(n):
-        if abs(z[i]) > 3:
-            rows.append(("R1", i, xs[i], "|z| > 3"))
-
-    # R2: 2 of 3 beyond 2σ same side
-    for i in range(2, n):
-        window = z[i-2:i+1]
-        pos = np.sum(window > 2)
-        neg = np.sum(window < -2)
-        if pos >= 2:
-            rows.append(("R2", i, xs[i], "2 of 3 > +2σ"))
-        if neg >= 2:
-            rows.append(("R2", i, xs[i], "2 of 3 < -2σ"))
-
-    # R3: 4 of 5 beyond 1σ same side
-    for i in range(4, n):
-        window = z[i-4:i+1]
-        pos = np.sum(window > 1)
-        neg = np.sum(window < -1)
-        if pos >= 4:
-            rows.append(("R3", i, xs[i], "4 of 5 > +1σ"))
-        if neg >= 4:
-            rows.append(("R3", i, xs[i], "4 of 5 < -1σ"))
-
-    # R4: 8 in a row on same side
-    for i in range(7, n):
-        window = xs[i-7:i+1]
-        if np.all(window > center):
-            rows.append(("R4", i, xs[i], "8 in a row above CL"))
-        if np.all(window < center):
-            rows.append(("R4", i, xs[i], "8 in a row below CL"))
-
-    return pd.DataFrame(rows, columns=["rule", "index", "value", "detail"])
+    # Rows are grouped by rule, then ordered by index (upper side before lower)
+    parts = []
+    for side, (rule, detail, mask) in enumerate(nelson_flags(z)):
+        idx = np.flatnonzero(mask)
+        parts.append(pd.DataFrame({"rule": rule, "index": idx, "value": xs[idx], "detail": detail, "_side": side % 2}))
+    out = pd.concat(parts, ignore_index=True)
+    out = out.sort_values(["rule", "index", "_side"], kind="stable", ignore_index=True)
+    return out.drop(columns="_side")
 
 
 def imr_sigma_from_mrbar(mrbar: float) -> float | None:
-    # d2=1.128 for MR(2)
     if mrbar is None or not np.isfinite(mrbar) or mrbar <= 0:
         return None
-    return mrbar / 1.128
+    return mrbar / D2_MR
+
+
+def ewma(
+    x: pd.Series,
+    lam: float = 0.2,
+    L: float = 3.0,
+    target: float | None = None,
+    sigma: float | None = None,
+) -> tuple[pd.DataFrame, ChartLine]:
+    """
+    EWMA chart: z_i = lam*x_i + (1-lam)*z_{i-1}, z_0 = target.
+    The recursion runs as one backend kernel (no Python loop) and the limits are
+    the exact time-varying ones, L*sigma*sqrt(lam/(2-lam)*(1-(1-lam)^(2i))).
+    Target defaults to the mean, sigma to MRbar/d2.
+    Returns per-point X/EWMA/LCL/UCL/signal and the asymptotic chart line.
+    """
+    if not 0 < lam <= 1:
+        raise ValueError("EWMA weight lambda must be in (0, 1].")
+    xi = pd.to_numeric(x, errors="coerce").dropna().to_numpy(dtype=float)
+    n = len(xi)
+    if n == 0:
+        raise ValueError("No valid rows.")
+
+    mu = float(np.mean(xi)) if target is None else float(target)
+    if sigma is None:
+        sigma = imr_sigma_from_mrbar(moving_range_mean(xi))
+    if sigma is None or not np.isfinite(sigma) or sigma <= 0:
+        raise ValueError("Cannot estimate sigma (need at least 2 distinct values).")
+
+    z = ewma_filter(xi, lam, mu)
+
+    # (1-lam)^(2i) drops below double precision after a few dozen points;
+    # only that transient needs the exact factor, the rest is the asymptote.
+    half_inf = L * sigma * np.sqrt(lam / (2.0 - lam))
+    half = np.full(n, half_inf)
+    if lam < 1:
+        n_t = min(n, int(np.ceil(np.log(1e-17) / (2.0 * np.log1p(-lam)))))
+        i = np.arange(1, n_t + 1)
+        half[:n_t] = half_inf * np.sqrt(1.0 - (1.0 - lam) ** (2 * i))
+
+    lcl = mu - half
+    ucl = mu + half
+    out = pd.DataFrame({"X": xi, "EWMA": z, "LCL": lcl, "UCL": ucl, "signal": (z > ucl) | (z < lcl)})
+    return out, ChartLine(mu, float(mu - half_inf), float(mu + half_inf))
+
+
+def cusum(
+    x: pd.Series,
+    k: float = 0.5,
+    h: float = 5.0,
+    target: float | None = None,
+    sigma: float | None = None,
+) -> tuple[pd.DataFrame, float]:
+    """
+    Tabular CUSUM with slack k and decision interval h (both in sigma units).
+    C+ and C- come from the backend's Lindley recursion kernel. Returns per-point X/C_plus/C_minus/signal and H (= h*sigma).
+    """
+    xi = pd.to_numeric(x, errors="coerce").dropna().to_numpy(dtype=float)
+    n = len(xi)
+    if n == 0:
+        raise ValueError("No valid rows.")
+
+    mu = float(np.mean(xi)) if target is None else float(target)
+    if sigma is None:
+        sigma = imr_sigma_from_mrbar(moving_range_mean(xi))
+    if sigma is None or not np.isfinite(sigma) or sigma <= 0:
+        raise ValueError("Cannot estimate sigma (need at least 2 distinct values).")
+
+    K = k * sigma
+    H = h * sigma
+    c_plus = lindley(xi - (mu + K))
+    c_minus = lindley((mu - K) - xi)
+    out = pd.DataFrame({"X": xi, "C_plus": c_plus, "C_minus": c_minus, "signal": (c_plus > H) | (c_minus > H)})
+    return out, float(H)
+
+
+@dataclass
+class Phase1Result:
+    data: pd.DataFrame  # chart table + excluded / pass (pass 0 = kept)
+    x_line: ChartLine
+    spread_line: ChartLine  # MR for I-MR, R for Xbar-R
+    history: pd.DataFrame  # one row per pass: limits used and what they excluded
+    converged: bool
+
+
+def _history_row(p: int, n_used: int, x_line: ChartLine, spread_center: float, dropped: np.ndarray) -> dict:
+    return {
+        "pass": p,
+        "n_used": n_used,
+        "CL": x_line.center,
+        "LCL": x_line.lcl,
+        "UCL": x_line.ucl,
+        "spread_CL": spread_center,
+        "excluded": int(dropped.size),
+        "excluded_at": ", ".join(str(i) for i in dropped),
+    }
+
+
+def phase1_imr(
+    x: pd.Series,
+    rules: tuple[str, ...] = ("R1",),
+    max_passes: int = 10,
+    min_points: int = 10,
+) -> Phase1Result:
+    """
+    Phase I I-MR: drop points flagged by `rules` and recompute until no point
+    is flagged (or max_passes / min_points stops it).
+
+    Mean and MRbar are kept as running sums; each pass subtracts only the
+    dropped points and the moving ranges that touch them (ranges are not
+    bridged across a dropped point).
+    """
+    xi = pd.to_numeric(x, errors="coerce").dropna().to_numpy(dtype=float)
+    n = len(xi)
+    if n < 3:
+        raise ValueError("Not enough numeric data points for I-MR (need at least 3).")
+
+    mr = np.abs(np.diff(xi))
+    active = np.ones(n, dtype=bool)
+    mr_ok = np.ones(n - 1, dtype=bool)
+    dropped_in = np.zeros(n, dtype=np.int64)
+    s_x, n_x = float(xi.sum()), n
+    s_mr, n_mr = float(mr.sum()), n - 1
+
+    def lines() -> tuple[ChartLine, ChartLine, float | None]:
+        center = s_x / n_x
+        mrbar = s_mr / n_mr if n_mr else float("nan")
+        return (*imr_lines(center, mrbar), imr_sigma_from_mrbar(mrbar))
+
+    history: list[dict] = []
+    converged = False
+    for p in range(1, max_passes + 1):
+        x_line, mr_line, sigma = lines()
+        if sigma is None:
+            break
+        idx = np.flatnonzero(active)
+        z = (xi[idx] - x_line.center) / sigma
+        flag = np.abs(z) > 3 if "R1" in rules else np.zeros(idx.size, dtype=bool)
+        if set(rules) - {"R1"}:
+            for rule, _, mask in nelson_flags(z):
+                if rule in rules:
+                    flag |= mask
+        drop = idx[flag]
+        if drop.size == 0:
+            converged = True
+            history.append(_history_row(p, n_x, x_line, mr_line.center, drop))
+            break
+        if n_x - drop.size < min_points:
+            break
+        history.append(_history_row(p, n_x, x_line, mr_line.center, drop))
+
+        s_x -= float(xi[drop].sum())
+        n_x -= drop.size
+        active[drop] = False
+        dropped_in[drop] = p
+        touch = np.unique(np.concatenate([drop - 1, drop]))
+        touch = touch[(touch >= 0) & (touch < n - 1)]
+        touch = touch[mr_ok[touch]]
+        s_mr -= float(mr[touch].sum())
+        n_mr -= touch.size
+        mr_ok[touch] = False
+
+    x_line, mr_line, _ = lines()
+    data = pd.DataFrame({"X": xi, "MR": np.r_[np.nan, mr], "excluded": ~active, "pass": dropped_in})
+    return Phase1Result(data, x_line, mr_line, pd.DataFrame(history), converged)
+
+
+def phase1_xbar_r(
+    df: pd.DataFrame,
+    value_col: str,
+    subgroup_col: str,
+    spread: str = "R",
+    max_passes: int = 10,
+    min_subgroups: int = 5,
+    stats: pd.DataFrame | None = None,
+) -> tuple[Phase1Result, int]:
+    """
+    Phase I Xbar-R / Xbar-S: drop subgroups whose mean or spread is outside its
+    (per-subgroup) limits, then recompute from running sums of n*Xbar, n and the
+    per-subgroup sigma estimates. Returns the result and the most common subgroup size.
+    """
+    ch = subgroup_chart(df, value_col, subgroup_col, spread=spread, stats=stats)
+    t = ch.table
+    n = t["n"].to_numpy()
+    xb = t["Xbar"].to_numpy(dtype=float)
+    sp = t[spread].to_numpy(dtype=float)
+    units = _sigma_units(t.rename(columns={subgroup_col: "subgroup"}), spread)
+    labels = t[subgroup_col].to_numpy()
+    k = len(t)
+    n_mode = int(pd.Series(n).mode().iloc[0])
+
+    active = np.ones(k, dtype=bool)
+    dropped_in = np.zeros(k, dtype=np.int64)
+    s_nx, s_n = float(np.sum(n * xb)), float(n.sum())
+    s_u, m = float(units.sum()), k
+
+    def limits() -> tuple[float, float, dict[str, np.ndarray]]:
+        center, sigma = s_nx / s_n, s_u / m
+        return center, sigma, _subgroup_limits(n, center, sigma, spread)
+
+    def lines(center: float, sigma: float) -> tuple[ChartLine, ChartLine]:
+        lim = _subgroup_limits(np.array([n_mode]), center, sigma, spread)
+        return (
+            ChartLine(center, float(lim["X_LCL"][0]), float(lim["X_UCL"][0])),
+            ChartLine(float(lim[f"{spread}_CL"][0]), float(lim[f"{spread}_LCL"][0]), float(lim[f"{spread}_UCL"][0])),
+        )
 
+    history: list[dict] = []
+    converged = False
+    for p in range(1, max_passes + 1):
+        center, sigma, lim = limits()
+        x_line, sp_line = lines(center, sigma)
+        flag = active & (
+            (xb > lim["X_UCL"]) | (xb < lim["X_LCL"]) | (sp > lim[f"{spread}_UCL"]) | (sp < lim[f"{spread}_LCL"])
+        )
+        drop = np.flatnonzero(flag)
+        if drop.size == 0:
+            converged = True
+            history.append(_history_row(p, m, x_line, sp_line.center, labels[drop]))
+            break
+        if m - drop.size < min_subgroups:
+            break
+        history.append(_history_row(p, m, x_line, sp_line.center, labels[drop]))
 
+        s_nx -= float(np.sum(n[drop] * xb[drop]))
+        s_n -= float(n[drop].sum())
+        s_u -= float(units[drop].sum())
+        m -= drop.size
+        active[drop] = False
+        dropped_in[drop] = p
 
+    center, sigma, lim = limits()
+    x_line, sp_line = lines(center, sigma)
+    data = t.assign(**lim, excluded=~active, **{"pass": dropped_in})
+    return Phase1Result(data, x_line, sp_line, pd.DataFrame(history), converged), n_mode
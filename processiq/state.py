@@ -2,11 +2,16 @@ from __future__ import annotations
 import streamlit as st
 import pandas as pd
 
+from processiq.columns import tag_dataset
+
 KEY_DF = "processiq_df"
 KEY_NAME = "processiq_source_name"
+KEY_LOADING = "processiq_loading"  # background LoadJob in progress
+KEY_LOADED_FROM = "processiq_loaded_from"  # upload key of the last finished background load
+KEY_LOAD_ABANDONED = "processiq_load_abandoned"  # upload key of the last cancelled / failed background load
 
 def set_df(df: pd.DataFrame, source_name: str = "") -> None:
-    st.session_state[KEY_DF] = df
+    st.session_state[KEY_DF] = tag_dataset(df)
     st.session_state[KEY_NAME] = source_name
 
 def get_df():
@@ -15,3 +20,13 @@ def get_df():
 def clear_df():
     st.session_state.pop(KEY_DF, None)
     st.session_state.pop(KEY_NAME, None)
+    st.session_state.pop(KEY_LOADED_FROM, None)
+
+def set_loading(job) -> None:
+    st.session_state[KEY_LOADING] = job
+
+def get_loading():
+    return st.session_state.get(KEY_LOADING)
+
+def clear_loading():
+    st.session_state.pop(KEY_LOADING, None)
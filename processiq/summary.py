@@ -0,0 +1,240 @@
+# processiq/summary.py
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import reduce
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from processiq.backend import segment_stats
+from processiq.metrics import CapabilityResult, capability_from_stats
+from processiq.nonnormal import PercentileCapability
+from processiq.sketch import QuantileSketch, percentile_capability
+from processiq.spc import ChartLine, imr_lines, imr_sigma_from_mrbar, xbar_r_factors
+
+
+@dataclass
+class Summary:
+    """
+    Mergeable statistics for one ordered stretch of a measurement.
+
+    Partitions are merged in data order: mean / M2 use the pairwise (Chan)
+    update and the moving range that crosses the boundary is rebuilt from the
+    stored first / last values, so the merged MR sum covers every adjacent pair.
+    An optional quantile sketch carries percentiles through the same merges.
+    """
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0  # sum of squared deviations from the mean
+    min: float = float("inf")
+    max: float = float("-inf")
+    mr_sum: float = 0.0
+    mr_n: int = 0
+    first: float = float("nan")
+    last: float = float("nan")
+    sketch: QuantileSketch | None = None
+
+    @classmethod
+    def from_array(cls, x, compression: float | None = None) -> "Summary":
+        x = pd.to_numeric(pd.Series(x), errors="coerce").dropna().to_numpy(dtype=float)
+        n = int(x.size)
+        sketch = QuantileSketch.from_array(x, compression) if compression else None
+        if n == 0:
+            return cls(sketch=sketch)
+        mean = float(np.mean(x))
+        mr = np.abs(np.diff(x))
+        return cls(
+            n=n,
+            mean=mean,
+            m2=float(np.sum((x - mean) ** 2)),
+            min=float(x.min()),
+            max=float(x.max()),
+            mr_sum=float(np.sum(mr)),
+            mr_n=int(mr.size),
+            first=float(x[0]),
+            last=float(x[-1]),
+            sketch=sketch,
+        )
+
+    def merge(self, other: "Summary") -> "Summary":
+        """Combine with the partition that directly follows this one."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        sketch = None
+        if self.sketch is not None and other.sketch is not None:
+            sketch = QuantileSketch(self.sketch.compression).merge(self.sketch).merge(other.sketch)
+        return Summary(
+            n=n,
+            mean=self.mean + delta * other.n / n,
+            m2=self.m2 + other.m2 + delta * delta * self.n * other.n / n,
+            min=min(self.min, other.min),
+            max=max(self.max, other.max),
+            mr_sum=self.mr_sum + other.mr_sum + abs(other.first - self.last),
+            mr_n=self.mr_n + other.mr_n + 1,
+            first=self.first,
+            last=other.last,
+            sketch=sketch,
+        )
+
+    @property
+    def stdev_overall(self) -> float | None:
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else None
+
+    @property
+    def mrbar(self) -> float:
+        return self.mr_sum / self.mr_n if self.mr_n else float("nan")
+
+    @property
+    def stdev_within(self) -> float | None:
+        return imr_sigma_from_mrbar(self.mrbar)
+
+    def capability(self, lsl: float | None, usl: float | None) -> CapabilityResult:
+        if self.n == 0:
+            return CapabilityResult(0, float("nan"), None, None, None, None, None, None)
+        return capability_from_stats(self.n, self.mean, self.stdev_within, self.stdev_overall, lsl, usl)
+
+    def percentile_capability(self, lsl: float | None, usl: float | None) -> PercentileCapability:
+        if self.sketch is None:
+            raise ValueError("Summary was built without a quantile sketch (pass compression=...).")
+        return percentile_capability(self.sketch, lsl, usl)
+
+    def imr_lines(self) -> tuple[ChartLine, ChartLine]:
+        return imr_lines(self.mean if self.n else float("nan"), self.mrbar)
+
+
+@dataclass
+class SubgroupSummary:
+    """Per-subgroup count / sum / M2 / min / max; a subgroup may span partitions."""
+    keys: np.ndarray
+    n: np.ndarray
+    total: np.ndarray
+    m2: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+
+    @classmethod
+    def from_arrays(cls, values, keys) -> "SubgroupSummary":
+        x = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+        codes, uniques = pd.factorize(pd.Series(keys), sort=True)
+        ok = np.isfinite(x) & (codes >= 0)
+        x, codes = x[ok], codes[ok]
+        if x.size == 0:
+            e = np.array([])
+            return cls(np.array([], dtype=object), e, e, e, e, e)
+        order = np.argsort(codes, kind="stable")
+        x, codes = x[order], codes[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        n, total, m2, lo, hi = segment_stats(x, starts)
+        return cls(np.asarray(uniques[codes[starts]]), n.astype(float), total, m2, lo, hi)
+
+    @classmethod
+    def concat(cls, parts: list["SubgroupSummary"]) -> "SubgroupSummary":
+        """Merge any number of partitions; subgroups seen in several are combined exactly."""
+        d = pd.DataFrame(
+            {
+                "key": np.concatenate([p.keys for p in parts]) if parts else [],
+                "n": np.concatenate([p.n for p in parts]) if parts else [],
+                "total": np.concatenate([p.total for p in parts]) if parts else [],
+                "m2": np.concatenate([p.m2 for p in parts]) if parts else [],
+                "min": np.concatenate([p.min for p in parts]) if parts else [],
+                "max": np.concatenate([p.max for p in parts]) if parts else [],
+            }
+        )
+        g = d.groupby("key", sort=True)
+        out = g.agg(n=("n", "sum"), total=("total", "sum"), min=("min", "min"), max=("max", "max"))
+        # Pooled M2: within-part M2 plus each part's offset from the merged mean
+        grand = d["key"].map(out["total"] / out["n"])
+        part_mean = d["total"] / d["n"]
+        out["m2"] = (d["m2"] + d["n"] * (part_mean - grand) ** 2).groupby(d["key"]).sum()
+        return cls(
+            out.index.to_numpy(),
+            out["n"].to_numpy(),
+            out["total"].to_numpy(),
+            out["m2"].to_numpy(),
+            out["min"].to_numpy(),
+            out["max"].to_numpy(),
+        )
+
+    def table(self) -> pd.DataFrame:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame(
+                {
+                    "subgroup": self.keys,
+                    "n": self.n.astype(np.int64),
+                    "Xbar": self.total / self.n,
+                    "R": self.max - self.min,
+                    "S": np.sqrt(self.m2 / (self.n - 1)),
+                }
+            )
+
+    def xbar_r_lines(self) -> tuple[ChartLine, ChartLine, int]:
+        """Same limits as spc.xbar_r (mode subgroup size, table constants)."""
+        t = self.table()
+        n = int(t["n"].mode().iloc[0]) if len(t) else 0
+        if n < 2:
+            raise ValueError("Subgroup size must be at least 2.")
+        A2, D3, D4 = xbar_r_factors(n)
+        xbarbar = float(t["Xbar"].mean())
+        rbar = float(t["R"].mean())
+        return ChartLine(xbarbar, xbarbar - A2 * rbar, xbarbar + A2 * rbar), ChartLine(rbar, D3 * rbar, D4 * rbar), n
+
+
+# ---------------------------------------------------------------------------
+# Map-reduce over files
+# ---------------------------------------------------------------------------
+
+def _read_columns(path: str, columns: list[str]) -> pd.DataFrame:
+    p = Path(path)
+    ext = p.suffix.lower()
+    if ext == ".parquet":
+        return pd.read_parquet(p, columns=columns)
+    if ext in (".xlsx", ".xls"):
+        return pd.read_excel(p, usecols=columns)
+    return pd.read_csv(p, usecols=columns)
+
+
+def summarize_file(
+    path: str, value_col: str, subgroup_col: str | None = None, compression: float | None = None
+) -> tuple[Summary, SubgroupSummary | None]:
+    """Map step: one file (in row order) -> its mergeable summaries."""
+    cols = [value_col] + ([subgroup_col] if subgroup_col else [])
+    d = _read_columns(path, cols)
+    sub = SubgroupSummary.from_arrays(d[value_col], d[subgroup_col]) if subgroup_col else None
+    return Summary.from_array(d[value_col], compression), sub
+
+
+def _summarize_job(args):
+    return summarize_file(*args)
+
+
+def summarize_files(
+    paths: list[str],
+    value_col: str,
+    subgroup_col: str | None = None,
+    workers: int | None = None,
+    parallel_threshold: int = 4,
+    compression: float | None = None,
+) -> tuple[Summary, SubgroupSummary | None]:
+    """
+    Summaries for a measurement spread over many files, merged in the order
+    given (that order defines which values are adjacent for moving ranges).
+    Files are read in a process pool once there are parallel_threshold or more.
+    A compression turns on a quantile sketch for percentile capability.
+    """
+    jobs = [(str(p), value_col, subgroup_col, compression) for p in paths]
+    if workers != 1 and len(jobs) >= parallel_threshold:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parts = list(ex.map(_summarize_job, jobs, chunksize=max(1, len(jobs) // 32)))
+    else:
+        parts = [_summarize_job(j) for j in jobs]
+
+    total = reduce(Summary.merge, (s for s, _ in parts), Summary())
+    subs = SubgroupSummary.concat([g for _, g in parts]) if subgroup_col else None
+    return total, subs
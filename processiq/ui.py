@@ -2,6 +2,8 @@ from __future__ import annotations
 import streamlit as st
 import pandas as pd
 
+from processiq.columns import confirm_column
+
 def set_page(title: str, icon: str = "🧠", layout: str = "wide"):
     st.set_page_config(page_title=title, page_icon=icon, layout=layout)
 
@@ -16,3 +18,11 @@ def df_preview(df: pd.DataFrame, max_rows: int = 25):
 
 def warn_empty(msg: str = "Upload data to begin."):
     st.info(msg)
+
+def require_numeric(df: pd.DataFrame, col: str, min_valid: int = 5):
+    """Full check of a column picked from a sampled list; stops the page if it is not numeric after all."""
+    prof = confirm_column(df, col)
+    if prof.valid < min_valid:
+        st.warning(f"'{col}' has only {prof.valid} numeric values on a full scan (need at least {min_valid}).")
+        st.stop()
+    return prof
@@ -0,0 +1,155 @@
+# processiq/whatif.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from processiq.metrics import _stdev_within_i_mr
+
+
+@dataclass(frozen=True)
+class SpecIndex:
+    """
+    Sorted copy of a measurement column plus its moments.
+
+    Built once per column; every spec-limit edit afterwards is answered from
+    the cached moments and a binary search instead of a pass over the data.
+    """
+    sorted_x: np.ndarray
+    n: int
+    mean: float
+    stdev_overall: float | None
+    stdev_within: float | None
+
+
+@dataclass
+class WhatIfResult:
+    lsl: float | None
+    usl: float | None
+    cp: float | None
+    cpk: float | None
+    pp: float | None
+    ppk: float | None
+    oos: int
+    obs_ppm: float
+    exp_ppm: float | None
+
+
+def build_spec_index(x) -> SpecIndex:
+    x = np.asarray(x, dtype=float)
+    x = x[np.isfinite(x)]  # keep original order for the moving-range sigma
+    n = int(x.size)
+    if n == 0:
+        return SpecIndex(np.empty(0), 0, float("nan"), None, None)
+    mean = float(np.mean(x))
+    st_overall = float(np.std(x, ddof=1)) if n > 1 else None
+    return SpecIndex(
+        sorted_x=np.sort(x),
+        n=n,
+        mean=mean,
+        stdev_overall=st_overall,
+        stdev_within=_stdev_within_i_mr(x),
+    )
+
+
+def _limit_array(v, shape) -> np.ndarray:
+    if v is None:
+        return np.full(shape, np.nan)
+    return np.broadcast_to(np.asarray(v, dtype=float), shape)
+
+
+def count_below(idx: SpecIndex, lsl) -> np.ndarray:
+    """Number of points strictly below lsl (vectorized over lsl)."""
+    return np.searchsorted(idx.sorted_x, lsl, side="left")
+
+
+def count_above(idx: SpecIndex, usl) -> np.ndarray:
+    """Number of points strictly above usl (vectorized over usl)."""
+    return idx.n - np.searchsorted(idx.sorted_x, usl, side="right")
+
+
+def capability_indices(mean, s, lsl: np.ndarray, usl: np.ndarray):
+    """
+    Cp and Cpk for arrays of spec limits (NaN marks a missing limit).
+    mean / s may also be arrays (e.g. bootstrap replicates); unusable sigmas give NaN.
+    One-sided specs give Cpk from the available side, Cp is NaN.
+    """
+    if s is None:
+        s = np.nan
+    s = np.asarray(s, dtype=float)
+    s = np.where(np.isfinite(s) & (s > 0), s, np.nan)
+    mean = np.asarray(mean, dtype=float)
+    shape = np.broadcast(mean, s, lsl, usl).shape
+    cp = (usl - lsl) / (6 * s)
+    cpu = (usl - mean) / (3 * s)
+    cpl = (mean - lsl) / (3 * s)
+    cpk = np.fmin(cpu, cpl)  # fmin ignores the NaN side
+    return np.broadcast_to(cp, shape), np.broadcast_to(cpk, shape)
+
+
+def expected_ppm_normal(mean: float, s: float | None, lsl: np.ndarray, usl: np.ndarray) -> np.ndarray:
+    shape = np.broadcast(lsl, usl).shape
+    if s is None or not np.isfinite(s) or s <= 0:
+        return np.full(shape, np.nan)
+    p_low = np.where(np.isnan(lsl), 0.0, ndtr((lsl - mean) / s))
+    p_high = np.where(np.isnan(usl), 0.0, ndtr((mean - usl) / s))
+    return (p_low + p_high) * 1_000_000
+
+
+def sweep(idx: SpecIndex, lsl=None, usl=None) -> pd.DataFrame:
+    """
+    Evaluate every (lsl, usl) pair in one vectorized pass.
+
+    lsl / usl may be scalars, arrays of equal length, or None (one-sided).
+    Returns one row per candidate with Cp/Cpk/Pp/Ppk and observed/expected PPM.
+    """
+    shape = np.broadcast(np.asarray(0.0 if lsl is None else lsl), np.asarray(0.0 if usl is None else usl)).shape
+    lo = _limit_array(lsl, shape)
+    hi = _limit_array(usl, shape)
+
+    oos = np.zeros(shape, dtype=np.int64)
+    if lsl is not None:
+        oos = oos + count_below(idx, lo)
+    if usl is not None:
+        oos = oos + count_above(idx, hi)
+
+    cp, cpk = capability_indices(idx.mean, idx.stdev_within, lo, hi)
+    pp, ppk = capability_indices(idx.mean, idx.stdev_overall, lo, hi)
+    obs_ppm = oos / idx.n * 1_000_000 if idx.n else np.full(shape, np.nan)
+
+    return pd.DataFrame(
+        {
+            "LSL": np.ravel(lo),
+            "USL": np.ravel(hi),
+            "Cp": np.ravel(cp),
+            "Cpk": np.ravel(cpk),
+            "Pp": np.ravel(pp),
+            "Ppk": np.ravel(ppk),
+            "OOS": np.ravel(oos),
+            "Observed PPM": np.ravel(obs_ppm),
+            "Expected PPM": np.ravel(expected_ppm_normal(idx.mean, idx.stdev_overall, lo, hi)),
+        }
+    )
+
+
+def evaluate(idx: SpecIndex, lsl: float | None, usl: float | None) -> WhatIfResult:
+    row = sweep(idx, lsl, usl).iloc[0]
+
+    def opt(v) -> float | None:
+        v = float(v)
+        return v if np.isfinite(v) else None
+
+    return WhatIfResult(
+        lsl=lsl,
+        usl=usl,
+        cp=opt(row["Cp"]),
+        cpk=opt(row["Cpk"]),
+        pp=opt(row["Pp"]),
+        ppk=opt(row["Ppk"]),
+        oos=int(row["OOS"]),
+        obs_ppm=float(row["Observed PPM"]),
+        exp_ppm=opt(row["Expected PPM"]),
+    )
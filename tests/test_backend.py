@@ -0,0 +1,29 @@
+# tests/test_backend.py
+from __future__ import annotations
+
+import pytest
+
+from processiq import backend
+
+
+@pytest.mark.parametrize("size", [1, 2, 17, 10_000])
+def test_every_kernel_matches_numpy(size):
+    rows = backend.parity(size=size)
+    assert {r["kernel"] for r in rows} == set(backend.kernels())
+    assert {r["backend"] for r in rows} == set(backend.available_backends())
+    failed = [(r["kernel"], r["backend"]) for r in rows if not r["matches_numpy"]]
+    assert not failed, f"kernels that disagree with the NumPy reference: {failed}"
+
+
+def test_every_kernel_has_a_sample():
+    assert set(backend.SAMPLES) == set(backend.kernels())
+
+
+def test_unknown_backend_falls_back_to_numpy():
+    previous = backend.active_backend()
+    try:
+        assert backend.set_backend("numba") in backend.available_backends()
+        for name in backend.kernels():
+            assert backend.implementation(name, "no-such-backend") is backend.implementation(name, "numpy")
+    finally:
+        backend.set_backend(previous)